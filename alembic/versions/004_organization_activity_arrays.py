@@ -0,0 +1,110 @@
+"""organization activity arrays
+
+Revision ID: 7a4b1e9c2d85
+Revises: 5e2d9c4a1b73
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4b1e9c2d85'
+down_revision: Union[str, None] = '5e2d9c4a1b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQL зафиксирован на момент ревизии: app.models.triggers может меняться дальше.
+ACTIVITY_IDS_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION refresh_organization_activity_ids(org_id integer)
+RETURNS void LANGUAGE sql AS $$
+    UPDATE organizations SET
+        activity_ids = COALESCE((
+            SELECT array_agg(activity_id ORDER BY activity_id)
+            FROM organization_activities
+            WHERE organization_id = org_id
+        ), '{}'),
+        ancestor_activity_ids = COALESCE((
+            WITH RECURSIVE up AS (
+                SELECT a.id, a.parent_id
+                FROM activities a
+                JOIN organization_activities oa ON oa.activity_id = a.id
+                WHERE oa.organization_id = org_id
+                UNION
+                SELECT p.id, p.parent_id
+                FROM activities p
+                JOIN up ON p.id = up.parent_id
+            )
+            SELECT array_agg(DISTINCT id ORDER BY id) FROM up
+        ), '{}')
+    WHERE id = org_id;
+$$;
+
+CREATE OR REPLACE FUNCTION organization_activities_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_organization_activity_ids(NEW.organization_id);
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        PERFORM refresh_organization_activity_ids(OLD.organization_id);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION activities_parent_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM refresh_organization_activity_ids(id)
+    FROM organizations
+    WHERE ancestor_activity_ids @> ARRAY[NEW.id];
+    RETURN NULL;
+END;
+$$;
+"""
+
+ACTIVITY_IDS_TRIGGERS = """
+CREATE TRIGGER trg_organization_activities_sync
+AFTER INSERT OR UPDATE OR DELETE ON organization_activities
+FOR EACH ROW EXECUTE FUNCTION organization_activities_sync();
+
+CREATE TRIGGER trg_activities_parent_sync
+AFTER UPDATE OF parent_id ON activities
+FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+EXECUTE FUNCTION activities_parent_sync();
+"""
+
+ACTIVITY_IDS_DROP = """
+DROP TRIGGER IF EXISTS trg_activities_parent_sync ON activities;
+DROP TRIGGER IF EXISTS trg_organization_activities_sync ON organization_activities;
+DROP FUNCTION IF EXISTS activities_parent_sync();
+DROP FUNCTION IF EXISTS organization_activities_sync();
+DROP FUNCTION IF EXISTS refresh_organization_activity_ids(integer);
+"""
+
+ACTIVITY_IDS_BACKFILL = """
+SELECT refresh_organization_activity_ids(id) FROM organizations;
+"""
+
+
+def upgrade() -> None:
+    op.add_column('organizations', sa.Column('activity_ids', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False))
+    op.add_column('organizations', sa.Column('ancestor_activity_ids', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False))
+    op.execute(ACTIVITY_IDS_FUNCTIONS)
+    op.execute(ACTIVITY_IDS_BACKFILL)
+    op.execute(ACTIVITY_IDS_TRIGGERS)
+    op.create_index('ix_organizations_activity_ids', 'organizations', ['activity_ids'], unique=False, postgresql_using='gin')
+    op.create_index('ix_organizations_ancestor_activity_ids', 'organizations', ['ancestor_activity_ids'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_organizations_ancestor_activity_ids', table_name='organizations')
+    op.drop_index('ix_organizations_activity_ids', table_name='organizations')
+    op.execute(ACTIVITY_IDS_DROP)
+    op.drop_column('organizations', 'ancestor_activity_ids')
+    op.drop_column('organizations', 'activity_ids')
@@ -0,0 +1,157 @@
+"""organization documents
+
+Revision ID: 9c6e3f1a4b27
+Revises: 7a4b1e9c2d85
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c6e3f1a4b27'
+down_revision: Union[str, None] = '7a4b1e9c2d85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQL зафиксирован на момент ревизии: app.models.triggers может меняться дальше.
+ORGANIZATION_DOCUMENT_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION refresh_organization_document(org_id integer)
+RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO organization_documents (organization_id, document, updated_at)
+    SELECT o.id,
+        jsonb_build_object(
+            'id', o.id,
+            'name', o.name,
+            'building', jsonb_build_object(
+                'id', b.id,
+                'address', b.address,
+                'latitude', b.latitude,
+                'longitude', b.longitude
+            ),
+            'phones', COALESCE((
+                SELECT jsonb_agg(
+                    jsonb_build_object('id', p.id, 'phone_number', p.phone_number)
+                    ORDER BY p.id
+                )
+                FROM organization_phones p
+                WHERE p.organization_id = o.id
+            ), '[]'::jsonb),
+            'activities', COALESCE((
+                SELECT jsonb_agg(
+                    jsonb_build_object(
+                        'id', a.id, 'name', a.name, 'parent_id', a.parent_id, 'level', a.level
+                    )
+                    ORDER BY a.id
+                )
+                FROM organization_activities oa
+                JOIN activities a ON a.id = oa.activity_id
+                WHERE oa.organization_id = o.id
+            ), '[]'::jsonb)
+        )::text,
+        now()
+    FROM organizations o
+    JOIN buildings b ON b.id = o.building_id
+    WHERE o.id = org_id
+    ON CONFLICT (organization_id) DO UPDATE
+        SET document = EXCLUDED.document, updated_at = EXCLUDED.updated_at;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION organization_document_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'organizations' THEN
+        PERFORM refresh_organization_document(NEW.id);
+    ELSE
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM refresh_organization_document(NEW.organization_id);
+        END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            PERFORM refresh_organization_document(OLD.organization_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION organization_document_building_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM refresh_organization_document(id)
+    FROM organizations
+    WHERE building_id = NEW.id;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION organization_document_activity_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM refresh_organization_document(id)
+    FROM organizations
+    WHERE activity_ids @> ARRAY[NEW.id];
+    RETURN NULL;
+END;
+$$;
+"""
+
+ORGANIZATION_DOCUMENT_TRIGGERS = """
+CREATE TRIGGER trg_organization_document_org
+AFTER INSERT OR UPDATE OF name, building_id ON organizations
+FOR EACH ROW EXECUTE FUNCTION organization_document_sync();
+
+CREATE TRIGGER trg_organization_document_phones
+AFTER INSERT OR UPDATE OR DELETE ON organization_phones
+FOR EACH ROW EXECUTE FUNCTION organization_document_sync();
+
+CREATE TRIGGER trg_organization_document_activities
+AFTER INSERT OR UPDATE OR DELETE ON organization_activities
+FOR EACH ROW EXECUTE FUNCTION organization_document_sync();
+
+CREATE TRIGGER trg_organization_document_building
+AFTER UPDATE OF address, latitude, longitude ON buildings
+FOR EACH ROW EXECUTE FUNCTION organization_document_building_sync();
+
+CREATE TRIGGER trg_organization_document_activity
+AFTER UPDATE OF name, parent_id, level ON activities
+FOR EACH ROW EXECUTE FUNCTION organization_document_activity_sync();
+"""
+
+ORGANIZATION_DOCUMENT_DROP = """
+DROP TRIGGER IF EXISTS trg_organization_document_activity ON activities;
+DROP TRIGGER IF EXISTS trg_organization_document_building ON buildings;
+DROP TRIGGER IF EXISTS trg_organization_document_activities ON organization_activities;
+DROP TRIGGER IF EXISTS trg_organization_document_phones ON organization_phones;
+DROP TRIGGER IF EXISTS trg_organization_document_org ON organizations;
+DROP FUNCTION IF EXISTS organization_document_activity_sync();
+DROP FUNCTION IF EXISTS organization_document_building_sync();
+DROP FUNCTION IF EXISTS organization_document_sync();
+DROP FUNCTION IF EXISTS refresh_organization_document(integer);
+"""
+
+ORGANIZATION_DOCUMENT_BACKFILL = """
+SELECT refresh_organization_document(id) FROM organizations;
+"""
+
+
+def upgrade() -> None:
+    op.create_table('organization_documents',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('document', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('organization_id')
+    )
+    op.execute(ORGANIZATION_DOCUMENT_FUNCTIONS)
+    op.execute(ORGANIZATION_DOCUMENT_BACKFILL)
+    op.execute(ORGANIZATION_DOCUMENT_TRIGGERS)
+
+
+def downgrade() -> None:
+    op.execute(ORGANIZATION_DOCUMENT_DROP)
+    op.drop_table('organization_documents')
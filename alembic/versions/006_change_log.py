@@ -0,0 +1,156 @@
+"""change log
+
+Revision ID: b3d8a5e2c6f1
+Revises: 9c6e3f1a4b27
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8a5e2c6f1'
+down_revision: Union[str, None] = '9c6e3f1a4b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQL зафиксирован на момент ревизии: app.models.triggers может меняться дальше.
+CHANGE_LOG_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION log_change()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO change_log (entity, entity_id, operation)
+    VALUES (
+        TG_ARGV[0],
+        CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+        CASE TG_OP WHEN 'INSERT' THEN 'created' WHEN 'UPDATE' THEN 'updated' ELSE 'deleted' END
+    );
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION touch_organization()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE organizations SET updated_at = now() WHERE id = NEW.organization_id;
+        IF FOUND THEN
+            INSERT INTO change_log (entity, entity_id, operation)
+            VALUES ('organization', NEW.organization_id, 'updated');
+        END IF;
+    END IF;
+    IF TG_OP = 'DELETE'
+        OR (TG_OP = 'UPDATE' AND OLD.organization_id <> NEW.organization_id) THEN
+        UPDATE organizations SET updated_at = now() WHERE id = OLD.organization_id;
+        IF FOUND THEN
+            INSERT INTO change_log (entity, entity_id, operation)
+            VALUES ('organization', OLD.organization_id, 'updated');
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+CHANGE_LOG_TRIGGERS = """
+CREATE TRIGGER trg_organizations_touch BEFORE UPDATE ON organizations
+FOR EACH ROW WHEN (
+    (OLD.name, OLD.building_id, OLD.activity_ids)
+    IS DISTINCT FROM (NEW.name, NEW.building_id, NEW.activity_ids)
+) EXECUTE FUNCTION touch_updated_at();
+CREATE TRIGGER trg_buildings_touch BEFORE UPDATE ON buildings
+FOR EACH ROW WHEN (
+    (OLD.address, OLD.latitude, OLD.longitude)
+    IS DISTINCT FROM (NEW.address, NEW.latitude, NEW.longitude)
+) EXECUTE FUNCTION touch_updated_at();
+CREATE TRIGGER trg_activities_touch BEFORE UPDATE ON activities
+FOR EACH ROW WHEN (
+    (OLD.name, OLD.parent_id, OLD.level)
+    IS DISTINCT FROM (NEW.name, NEW.parent_id, NEW.level)
+) EXECUTE FUNCTION touch_updated_at();
+
+CREATE TRIGGER trg_organizations_log AFTER INSERT OR DELETE ON organizations
+FOR EACH ROW EXECUTE FUNCTION log_change('organization');
+CREATE TRIGGER trg_buildings_log AFTER INSERT OR DELETE ON buildings
+FOR EACH ROW EXECUTE FUNCTION log_change('building');
+CREATE TRIGGER trg_activities_log AFTER INSERT OR DELETE ON activities
+FOR EACH ROW EXECUTE FUNCTION log_change('activity');
+
+CREATE TRIGGER trg_organizations_log_update AFTER UPDATE ON organizations
+FOR EACH ROW WHEN (
+    (OLD.name, OLD.building_id, OLD.activity_ids)
+    IS DISTINCT FROM (NEW.name, NEW.building_id, NEW.activity_ids)
+) EXECUTE FUNCTION log_change('organization');
+CREATE TRIGGER trg_buildings_log_update AFTER UPDATE ON buildings
+FOR EACH ROW WHEN (
+    (OLD.address, OLD.latitude, OLD.longitude)
+    IS DISTINCT FROM (NEW.address, NEW.latitude, NEW.longitude)
+) EXECUTE FUNCTION log_change('building');
+CREATE TRIGGER trg_activities_log_update AFTER UPDATE ON activities
+FOR EACH ROW WHEN (
+    (OLD.name, OLD.parent_id, OLD.level)
+    IS DISTINCT FROM (NEW.name, NEW.parent_id, NEW.level)
+) EXECUTE FUNCTION log_change('activity');
+
+CREATE TRIGGER trg_organization_phones_touch
+AFTER INSERT OR UPDATE OR DELETE ON organization_phones
+FOR EACH ROW EXECUTE FUNCTION touch_organization();
+"""
+
+CHANGE_LOG_DROP = """
+DROP TRIGGER IF EXISTS trg_organization_phones_touch ON organization_phones;
+DROP TRIGGER IF EXISTS trg_activities_log_update ON activities;
+DROP TRIGGER IF EXISTS trg_buildings_log_update ON buildings;
+DROP TRIGGER IF EXISTS trg_organizations_log_update ON organizations;
+DROP TRIGGER IF EXISTS trg_activities_log ON activities;
+DROP TRIGGER IF EXISTS trg_buildings_log ON buildings;
+DROP TRIGGER IF EXISTS trg_organizations_log ON organizations;
+DROP TRIGGER IF EXISTS trg_activities_touch ON activities;
+DROP TRIGGER IF EXISTS trg_buildings_touch ON buildings;
+DROP TRIGGER IF EXISTS trg_organizations_touch ON organizations;
+DROP FUNCTION IF EXISTS touch_organization();
+DROP FUNCTION IF EXISTS log_change();
+DROP FUNCTION IF EXISTS touch_updated_at();
+"""
+
+_TABLES = ('organizations', 'buildings', 'activities')
+
+
+def upgrade() -> None:
+    for table in _TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+        op.execute(f'UPDATE {table} SET updated_at = created_at')
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'], unique=False)
+    op.create_table('change_log',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('txid', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint("operation IN ('created', 'updated', 'deleted')", name='check_change_operation'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_txid_id', 'change_log', ['txid', 'id'], unique=False)
+    op.execute(CHANGE_LOG_FUNCTIONS)
+    op.execute(CHANGE_LOG_TRIGGERS)
+
+
+def downgrade() -> None:
+    op.execute(CHANGE_LOG_DROP)
+    op.drop_index('ix_change_log_txid_id', table_name='change_log')
+    op.drop_table('change_log')
+    for table in reversed(_TABLES):
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,71 @@
+"""building organization count
+
+Revision ID: d5f1c7a3e9b2
+Revises: b3d8a5e2c6f1
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1c7a3e9b2'
+down_revision: Union[str, None] = 'b3d8a5e2c6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQL зафиксирован на момент ревизии: app.models.triggers может меняться дальше.
+ORGANIZATION_COUNT_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION buildings_organization_count_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.building_id = OLD.building_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE buildings SET organization_count = organization_count + 1
+        WHERE id = NEW.building_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE buildings SET organization_count = organization_count - 1
+        WHERE id = OLD.building_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+ORGANIZATION_COUNT_TRIGGERS = """
+CREATE TRIGGER trg_buildings_organization_count
+AFTER INSERT OR DELETE OR UPDATE OF building_id ON organizations
+FOR EACH ROW EXECUTE FUNCTION buildings_organization_count_sync();
+"""
+
+ORGANIZATION_COUNT_DROP = """
+DROP TRIGGER IF EXISTS trg_buildings_organization_count ON organizations;
+DROP FUNCTION IF EXISTS buildings_organization_count_sync();
+"""
+
+ORGANIZATION_COUNT_BACKFILL = """
+UPDATE buildings b SET organization_count = c.n
+FROM (SELECT building_id, count(*) AS n FROM organizations GROUP BY building_id) c
+WHERE c.building_id = b.id;
+"""
+
+
+def upgrade() -> None:
+    op.add_column('buildings', sa.Column('organization_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(ORGANIZATION_COUNT_FUNCTIONS)
+    # Триггер блокирует запись в organizations до конца миграции — бэкфилл ничего не пропустит.
+    op.execute(ORGANIZATION_COUNT_TRIGGERS)
+    op.execute(ORGANIZATION_COUNT_BACKFILL)
+    op.create_index('ix_buildings_organization_count', 'buildings', ['organization_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_buildings_organization_count', table_name='buildings')
+    op.execute(ORGANIZATION_COUNT_DROP)
+    op.drop_column('buildings', 'organization_count')
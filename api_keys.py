@@ -0,0 +1,43 @@
+"""Управление API-ключами: python api_keys.py create|revoke|list."""
+
+import argparse
+
+from app.database import SessionLocal
+from app.services.api_key import ApiKeyService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Управление API-ключами клиентов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", help="Выпустить новый ключ")
+    create.add_argument("name", help="Имя клиента")
+    create.add_argument(
+        "--scope", action="append", default=[], dest="scopes",
+        help="Scope ключа (можно указать несколько раз)",
+    )
+
+    revoke = commands.add_parser("revoke", help="Отозвать ключ")
+    revoke.add_argument("key_id", type=int)
+
+    commands.add_parser("list", help="Список ключей")
+
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        service = ApiKeyService(db)
+        if args.command == "create":
+            api_key, raw_key = service.issue(args.name, args.scopes or ["read"])
+            print(f"Key #{api_key.id} for {api_key.name}: {raw_key}")
+            print("Store it now: only its hash is kept in the database.")
+        elif args.command == "revoke":
+            if not service.revoke(args.key_id):
+                parser.exit(1, f"Key #{args.key_id} not found\n")
+            print(f"Key #{args.key_id} revoked")
+        else:
+            for api_key in service.get_all():
+                scopes = ",".join(api_key.scopes)
+                print(f"#{api_key.id}\t{api_key.status}\t{api_key.name}\t{scopes}")
+
+
+if __name__ == "__main__":
+    main()
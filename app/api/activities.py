@@ -1,24 +1,95 @@
 """Эндпоинты видов деятельности."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 
-from app.dependencies import get_db
-from app.schemas.activity import ActivityTree
+from app.config import settings
+from app.dependencies import default_timeout, get_db
+from app.schemas.activity import ActivityRead, ActivityTree, ActivityWithPath
 from app.services.activity import ActivityService
 
 router = APIRouter(prefix="/activities", tags=["Activities"])
 
 
+def _set_cache_headers(response: Response, age: float, etag: str | None) -> None:
+    """Age и ETag записи кэша индекса деятельностей."""
+    response.headers["Age"] = str(int(age))
+    if etag is not None:
+        response.headers["ETag"] = etag
+
+
 @router.get(
     "/",
     response_model=list[ActivityTree],
     summary="Дерево деятельностей",
     description=(
         "Возвращает все виды деятельности в древовидной структуре. "
-        "Максимальная вложенность — 3 уровня."
+        "Максимальная вложенность — 3 уровня. Данные могут отставать "
+        "на несколько секунд, возраст — в заголовке Age."
+    ),
+    dependencies=[Depends(default_timeout)],
+)
+def get_activities(response: Response, db: Session = Depends(get_db)):
+    service = ActivityService(db)
+    tree, age, etag = service.get_tree_cached()
+    _set_cache_headers(response, age, etag)
+    return tree
+
+
+@router.get(
+    "/lookup",
+    response_model=list[ActivityWithPath],
+    summary="Поиск деятельности по названию",
+    description=(
+        "Виды деятельности с названием name (без учёта регистра, ё/е и кавычек) "
+        "и путём от корня до каждого — чтобы различить одноимённые ветки."
+    ),
+    dependencies=[Depends(default_timeout)],
+)
+def lookup_activities(
+    response: Response,
+    name: str = Query(..., min_length=1, description="Название вида деятельности"),
+    limit: int = Query(
+        default=settings.activity_lookup_limit_default,
+        ge=1,
+        le=settings.activity_lookup_limit_max,
+        description="Максимум совпадений",
     ),
+    db: Session = Depends(get_db),
+):
+    service = ActivityService(db)
+    matches, age, etag = service.lookup_cached(name, limit=limit)
+    _set_cache_headers(response, age, etag)
+    return matches
+
+
+@router.get(
+    "/{activity_id}/subtree",
+    response_model=ActivityTree,
+    summary="Ветка дерева деятельностей",
+    description="Вид деятельности со всеми вложенными подкатегориями.",
+    dependencies=[Depends(default_timeout)],
+)
+def get_activity_subtree(
+    activity_id: int, response: Response, db: Session = Depends(get_db)
+):
+    service = ActivityService(db)
+    node, age, etag = service.get_subtree_cached(activity_id)
+    _set_cache_headers(response, age, etag)
+    return node
+
+
+@router.get(
+    "/{activity_id}/path",
+    response_model=list[ActivityRead],
+    summary="Путь к виду деятельности",
+    description="Цепочка от корня дерева до вида деятельности включительно (хлебные крошки).",
+    dependencies=[Depends(default_timeout)],
 )
-def get_activities(db: Session = Depends(get_db)):
+def get_activity_path(
+    activity_id: int, response: Response, db: Session = Depends(get_db)
+):
     service = ActivityService(db)
-    return service.get_tree()
+    path, age, etag = service.get_path_cached(activity_id)
+    _set_cache_headers(response, age, etag)
+    return path
@@ -0,0 +1,53 @@
+"""Административные эндпоинты: выгрузка справочника."""
+
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+
+from app.dependencies import export_timeout, get_db, require_scope
+from app.services.export import PARQUET_MEDIA_TYPE, ExportService, ExportTable
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_scope("export"))],
+)
+
+
+@router.get(
+    "/export/{table}",
+    response_class=FileResponse,
+    summary="Выгрузка таблицы в Parquet",
+    description=(
+        "Таблица справочника целиком или, с since, строки с created_at >= since. "
+        "Требует scope export. Число строк — в заголовке X-Row-Count."
+    ),
+    responses={200: {"content": {PARQUET_MEDIA_TYPE: {}}}},
+    dependencies=[Depends(export_timeout)],
+)
+def export_table(
+    table: ExportTable,
+    since: datetime | None = Query(default=None, description="Инкрементальная выгрузка: created_at >= since"),
+    db: Session = Depends(get_db),
+):
+    fd, name = tempfile.mkstemp(suffix=".parquet")
+    os.close(fd)
+    path = Path(name)
+    try:
+        rows = ExportService(db).write_table(table, path, since=since)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return FileResponse(
+        path,
+        media_type=PARQUET_MEDIA_TYPE,
+        filename=f"{table}.parquet",
+        headers={"X-Row-Count": str(rows)},
+        background=BackgroundTask(path.unlink, missing_ok=True),
+    )
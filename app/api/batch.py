@@ -0,0 +1,41 @@
+"""Пакетный эндпоинт: несколько GET-запросов к API одним вызовом."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.dependencies import get_db, verify_api_key
+from app.schemas.batch import BatchRequest, BatchResponse
+from app.services.api_key import ApiPrincipal
+from app.services.batch import BatchService
+
+router = APIRouter(tags=["Batch"])
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
+    summary="Пакет GET-запросов",
+    description=(
+        "Выполняет GET-подзапросы к /api/v1/* параллельно и возвращает их ответы "
+        "одним JSON в порядке запроса, у каждого — свой статус. Ключ проверяется "
+        "один раз, rate limit списывается за каждый подзапрос."
+    ),
+)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    principal: ApiPrincipal = Depends(verify_api_key),
+    db: Session = Depends(get_db),
+):
+    # Сессия нужна только для проверки ключа: соединение возвращается в пул
+    # до подзапросов, каждый из которых берёт свою сессию.
+    await run_in_threadpool(db.close)
+    if len(batch.requests) > settings.batch_max_requests:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Не больше {settings.batch_max_requests} подзапросов в пакете",
+        )
+    body = await BatchService(request.app, request.scope, principal).run(batch.requests)
+    return Response(content=body, media_type="application/json")
@@ -1,12 +1,21 @@
 """Эндпоинты зданий."""
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import Pagination, get_db, get_pagination
-from app.schemas.building import BuildingRead
+from app.config import settings
+from app.dependencies import (
+    Pagination,
+    default_timeout,
+    get_db,
+    get_pagination,
+    get_response_format,
+    search_timeout,
+)
+from app.schemas.building import BuildingCluster, BuildingOrder, BuildingRead, BuildingWithCount
 from app.schemas.pagination import PaginatedResponse
 from app.services.building import BuildingService
+from app.utils.formats import BINARY_LIST_RESPONSES, ResponseFormat
 from app.utils.pagination import build_paginated_response
 
 router = APIRouter(prefix="/buildings", tags=["Buildings"])
@@ -14,15 +23,72 @@ router = APIRouter(prefix="/buildings", tags=["Buildings"])
 
 @router.get(
     "/",
-    response_model=PaginatedResponse[BuildingRead],
+    response_model=PaginatedResponse[BuildingWithCount],
+    responses=BINARY_LIST_RESPONSES,
     summary="Список всех зданий",
-    description="Возвращает список всех зданий справочника с адресами и координатами.",
+    description=(
+        "Возвращает список всех зданий справочника с адресами и координатами. "
+        "with_counts=true добавляет organization_count; order=-organization_count — "
+        "сначала здания с наибольшим числом организаций. "
+        "Первые страницы могут отставать на несколько секунд, возраст — в заголовке Age."
+    ),
+    response_model_exclude_unset=True,
+    dependencies=[Depends(default_timeout)],
 )
 def get_buildings(
     request: Request,
+    response: Response,
+    with_counts: bool = Query(default=False, description="Добавить organization_count"),
+    order: BuildingOrder = Query(default="id", description="Порядок списка"),
     pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
     db: Session = Depends(get_db),
 ):
     service = BuildingService(db)
-    items, total = service.get_all(limit=pagination.limit, offset=pagination.offset)
-    return build_paginated_response(items, total, pagination.limit, pagination.offset, request)
+    items, total, age, etag = service.get_all_cached(
+        limit=pagination.limit, offset=pagination.offset,
+        order=order, with_counts=with_counts,
+    )
+    if age is not None:
+        response.headers["Age"] = str(int(age))
+    if etag is not None:
+        response.headers["ETag"] = etag
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request,
+        fmt=fmt, schema=BuildingWithCount if with_counts else BuildingRead,
+        headers=response.headers,
+    )
+
+
+@router.get(
+    "/clusters",
+    response_model=list[BuildingCluster],
+    summary="Кластеры зданий для карты",
+    description=(
+        "Здания видимой области, сгруппированные по ячейкам сетки тайлов Web Mercator "
+        "масштаба zoom: центроид, число зданий и организаций. Сетка зависит только "
+        "от zoom, поэтому ячейки не меняются при сдвиге карты."
+    ),
+    dependencies=[Depends(search_timeout)],
+)
+def get_building_clusters(
+    response: Response,
+    lat_min: float = Query(..., ge=-90, le=90, description="Мин. широта"),
+    lat_max: float = Query(..., ge=-90, le=90, description="Макс. широта"),
+    lng_min: float = Query(..., ge=-180, le=180, description="Мин. долгота"),
+    lng_max: float = Query(..., ge=-180, le=180, description="Макс. долгота"),
+    zoom: int = Query(..., ge=0, le=settings.cluster_zoom_max, description="Масштаб карты"),
+    db: Session = Depends(get_db),
+):
+    if lat_min >= lat_max:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="lat_min должен быть меньше lat_max",
+        )
+    if lng_min >= lng_max:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="lng_min должен быть меньше lng_max",
+        )
+    response.headers["Cache-Control"] = f"public, max-age={settings.cluster_cache_max_age}"
+    return BuildingService(db).get_clusters(lat_min, lat_max, lng_min, lng_max, zoom=zoom)
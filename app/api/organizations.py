@@ -1,12 +1,39 @@
 """Эндпоинты организаций: чтение, поиск по имени, активности, геопоиск."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.dependencies import Pagination, get_db, get_pagination
-from app.schemas.organization import OrganizationList, OrganizationRead
+from app.config import settings
+from app.dependencies import (
+    Pagination,
+    default_timeout,
+    get_db,
+    get_facet_request,
+    get_pagination,
+    get_response_format,
+    get_search_params,
+    list_projection,
+    search_projection,
+    search_timeout,
+)
+from app.schemas.change import ChangeFeed
+from app.schemas.facet import FacetedPaginatedResponse, FacetRequest
+from app.schemas.organization import (
+    OrganizationItem,
+    OrganizationList,
+    OrganizationProjection,
+    OrganizationRead,
+    OrganizationSearchItem,
+    OrganizationSearchParams,
+    OrganizationSearchResult,
+    OrganizationSuggestion,
+)
 from app.schemas.pagination import PaginatedResponse
+from app.services.change_feed import ChangeFeedService
 from app.services.organization import OrganizationService
+from app.utils.formats import BINARY_LIST_RESPONSES, ResponseFormat, sparse_schema
 from app.utils.pagination import build_paginated_response
 
 router = APIRouter(prefix="/organizations", tags=["Organizations"])
@@ -14,92 +41,180 @@ router = APIRouter(prefix="/organizations", tags=["Organizations"])
 
 @router.get(
     "/by-building/{building_id}",
-    response_model=PaginatedResponse[OrganizationList],
+    response_model=PaginatedResponse[OrganizationItem],
+    response_model_exclude_unset=True,
+    responses=BINARY_LIST_RESPONSES,
     summary="Организации в здании",
     description="Возвращает список всех организаций, находящихся в указанном здании.",
+    dependencies=[Depends(default_timeout)],
 )
 def get_organizations_by_building(
     building_id: int,
     request: Request,
     pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
+    projection: OrganizationProjection = Depends(list_projection),
     db: Session = Depends(get_db),
 ):
     service = OrganizationService(db)
     items, total = service.get_by_building(
-        building_id, limit=pagination.limit, offset=pagination.offset
+        building_id, limit=pagination.limit, offset=pagination.offset,
+        projection=projection,
+    )
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request,
+        fmt=fmt, schema=sparse_schema(OrganizationList, projection.fields),
     )
-    return build_paginated_response(items, total, pagination.limit, pagination.offset, request)
 
 
 @router.get(
     "/by-activity/{activity_id}",
-    response_model=PaginatedResponse[OrganizationList],
+    response_model=PaginatedResponse[OrganizationItem],
+    response_model_exclude_unset=True,
+    responses=BINARY_LIST_RESPONSES,
     summary="Организации по виду деятельности",
     description=(
         "Возвращает список организаций, которые относятся к указанному "
         "виду деятельности (без учёта вложенных)."
     ),
+    dependencies=[Depends(default_timeout)],
 )
 def get_organizations_by_activity(
     activity_id: int,
     request: Request,
     pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
+    projection: OrganizationProjection = Depends(list_projection),
     db: Session = Depends(get_db),
 ):
     service = OrganizationService(db)
     items, total = service.get_by_activity(
-        activity_id, limit=pagination.limit, offset=pagination.offset
+        activity_id, limit=pagination.limit, offset=pagination.offset,
+        projection=projection,
+    )
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request,
+        fmt=fmt, schema=sparse_schema(OrganizationList, projection.fields),
+    )
+
+
+@router.get(
+    "/search/activity",
+    response_model=PaginatedResponse[OrganizationItem],
+    response_model_exclude_unset=True,
+    responses=BINARY_LIST_RESPONSES,
+    summary="Поиск организаций по нескольким видам деятельности",
+    description=(
+        "Каждый activity_id учитывается вместе с вложенными подкатегориями. "
+        "mode=any — организации хотя бы с одним из видов (например, «Еда» ИЛИ "
+        "«Автомобили»), mode=all — со всеми сразу («Мясная» И «Молочная продукция»)."
+    ),
+    dependencies=[Depends(search_timeout)],
+)
+def search_organizations_by_activities(
+    request: Request,
+    activity_id: list[int] = Query(
+        ...,
+        min_length=1,
+        max_length=settings.activity_filter_max_ids,
+        description="ID видов деятельности (параметр повторяется)",
+    ),
+    mode: Literal["any", "all"] = Query(default="any", description="any — ИЛИ, all — И"),
+    pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
+    projection: OrganizationProjection = Depends(list_projection),
+    db: Session = Depends(get_db),
+):
+    service = OrganizationService(db)
+    items, total = service.search_by_activities(
+        activity_id, match_all=mode == "all",
+        limit=pagination.limit, offset=pagination.offset,
+        projection=projection,
+    )
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request,
+        fmt=fmt, schema=sparse_schema(OrganizationList, projection.fields),
     )
-    return build_paginated_response(items, total, pagination.limit, pagination.offset, request)
 
 
 @router.get(
     "/search/activity/{activity_id}",
-    response_model=PaginatedResponse[OrganizationList],
+    response_model=FacetedPaginatedResponse[OrganizationItem],
+    responses=BINARY_LIST_RESPONSES,
     summary="Поиск организаций по деятельности (с вложенными)",
     description=(
         "Ищет организации по виду деятельности с учётом всех вложенных "
         "подкатегорий. Например, поиск по «Еда» вернёт организации "
         "с деятельностями «Мясная продукция», «Молочная продукция» и т.д."
     ),
+    response_model_exclude_unset=True,
+    dependencies=[Depends(search_timeout)],
 )
 def search_organizations_by_activity(
     activity_id: int,
     request: Request,
     pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
+    projection: OrganizationProjection = Depends(list_projection),
+    facets: FacetRequest | None = Depends(get_facet_request),
     db: Session = Depends(get_db),
 ):
     service = OrganizationService(db)
     items, total = service.search_by_activity_recursive(
-        activity_id, limit=pagination.limit, offset=pagination.offset
+        activity_id, limit=pagination.limit, offset=pagination.offset,
+        projection=projection,
+    )
+    facet_counts = None
+    if facets is not None:
+        facet_counts = service.get_facets(
+            OrganizationSearchParams(activity_id=activity_id), facets
+        )
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request, facet_counts,
+        fmt=fmt, schema=sparse_schema(OrganizationList, projection.fields),
     )
-    return build_paginated_response(items, total, pagination.limit, pagination.offset, request)
 
 
 @router.get(
     "/search/name",
-    response_model=PaginatedResponse[OrganizationList],
+    response_model=FacetedPaginatedResponse[OrganizationItem],
+    responses=BINARY_LIST_RESPONSES,
     summary="Поиск организаций по названию",
     description="Ищет организации по частичному совпадению названия (без учёта регистра).",
+    response_model_exclude_unset=True,
+    dependencies=[Depends(search_timeout)],
 )
 def search_organizations_by_name(
     request: Request,
     q: str = Query(..., min_length=1, description="Строка для поиска в названии"),
     pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
+    projection: OrganizationProjection = Depends(list_projection),
+    facets: FacetRequest | None = Depends(get_facet_request),
     db: Session = Depends(get_db),
 ):
     service = OrganizationService(db)
     items, total = service.search_by_name(
-        q, limit=pagination.limit, offset=pagination.offset
+        q, limit=pagination.limit, offset=pagination.offset,
+        projection=projection,
+    )
+    facet_counts = None
+    if facets is not None:
+        facet_counts = service.get_facets(OrganizationSearchParams(q=q), facets)
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request, facet_counts,
+        fmt=fmt, schema=sparse_schema(OrganizationList, projection.fields),
     )
-    return build_paginated_response(items, total, pagination.limit, pagination.offset, request)
 
 
 @router.get(
     "/search/radius",
-    response_model=PaginatedResponse[OrganizationList],
+    response_model=FacetedPaginatedResponse[OrganizationItem],
+    responses=BINARY_LIST_RESPONSES,
     summary="Поиск организаций в радиусе",
     description="Ищет организации в заданном радиусе от указанной точки (в метрах).",
+    response_model_exclude_unset=True,
+    dependencies=[Depends(search_timeout)],
 )
 def search_organizations_in_radius(
     request: Request,
@@ -107,20 +222,35 @@ def search_organizations_in_radius(
     lng: float = Query(..., ge=-180, le=180, description="Долгота центра"),
     radius: float = Query(..., gt=0, le=40_075_000, description="Радиус поиска в метрах"),
     pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
+    projection: OrganizationProjection = Depends(list_projection),
+    facets: FacetRequest | None = Depends(get_facet_request),
     db: Session = Depends(get_db),
 ):
     service = OrganizationService(db)
     items, total = service.search_in_radius(
-        lat, lng, radius, limit=pagination.limit, offset=pagination.offset
+        lat, lng, radius, limit=pagination.limit, offset=pagination.offset,
+        projection=projection,
+    )
+    facet_counts = None
+    if facets is not None:
+        facet_counts = service.get_facets(
+            OrganizationSearchParams(lat=lat, lng=lng, radius=radius), facets
+        )
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request, facet_counts,
+        fmt=fmt, schema=sparse_schema(OrganizationList, projection.fields),
     )
-    return build_paginated_response(items, total, pagination.limit, pagination.offset, request)
 
 
 @router.get(
     "/search/rectangle",
-    response_model=PaginatedResponse[OrganizationList],
+    response_model=FacetedPaginatedResponse[OrganizationItem],
+    responses=BINARY_LIST_RESPONSES,
     summary="Поиск организаций в прямоугольнике",
     description="Ищет организации внутри заданной прямоугольной области по координатам.",
+    response_model_exclude_unset=True,
+    dependencies=[Depends(search_timeout)],
 )
 def search_organizations_in_rectangle(
     request: Request,
@@ -129,6 +259,9 @@ def search_organizations_in_rectangle(
     lng_min: float = Query(..., ge=-180, le=180, description="Мин. долгота"),
     lng_max: float = Query(..., ge=-180, le=180, description="Макс. долгота"),
     pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
+    projection: OrganizationProjection = Depends(list_projection),
+    facets: FacetRequest | None = Depends(get_facet_request),
     db: Session = Depends(get_db),
 ):
     if lat_min >= lat_max:
@@ -145,16 +278,116 @@ def search_organizations_in_rectangle(
     items, total = service.search_in_rectangle(
         lat_min, lat_max, lng_min, lng_max,
         limit=pagination.limit, offset=pagination.offset,
+        projection=projection,
+    )
+    facet_counts = None
+    if facets is not None:
+        facet_counts = service.get_facets(
+            OrganizationSearchParams(rectangle=(lat_min, lat_max, lng_min, lng_max)),
+            facets,
+        )
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request, facet_counts,
+        fmt=fmt, schema=sparse_schema(OrganizationList, projection.fields),
     )
-    return build_paginated_response(items, total, pagination.limit, pagination.offset, request)
+
+
+@router.get(
+    "/search",
+    response_model=FacetedPaginatedResponse[OrganizationSearchItem],
+    responses=BINARY_LIST_RESPONSES,
+    summary="Комбинированный поиск организаций",
+    description=(
+        "Объединяет фильтры по названию, виду деятельности (с вложенными), "
+        "зданию, радиусу и прямоугольнику в одном запросе (логическое И). "
+        "Если заданы lat/lng, в ответе есть distance в метрах; "
+        "order=distance сортирует по удалённости."
+    ),
+    response_model_exclude_unset=True,
+    dependencies=[Depends(search_timeout)],
+)
+def search_organizations(
+    request: Request,
+    params: OrganizationSearchParams = Depends(get_search_params),
+    pagination: Pagination = Depends(get_pagination),
+    fmt: ResponseFormat = Depends(get_response_format),
+    projection: OrganizationProjection = Depends(search_projection),
+    facets: FacetRequest | None = Depends(get_facet_request),
+    db: Session = Depends(get_db),
+):
+    service = OrganizationService(db)
+    items, total = service.search(
+        params, limit=pagination.limit, offset=pagination.offset,
+        projection=projection,
+    )
+    facet_counts = None
+    if facets is not None:
+        facet_counts = service.get_facets(params, facets)
+    return build_paginated_response(
+        items, total, pagination.limit, pagination.offset, request, facet_counts,
+        fmt=fmt, schema=sparse_schema(OrganizationSearchResult, projection.fields),
+    )
+
+
+@router.get(
+    "/changes",
+    response_model=ChangeFeed,
+    summary="Лента изменений справочника",
+    description=(
+        "Созданные, изменённые и удалённые организации, здания и виды деятельности "
+        "после курсора since (значение next_since из прошлого ответа; без since — с начала). "
+        "Изменение телефонов или видов деятельности организации — updated организации."
+    ),
+    dependencies=[Depends(default_timeout)],
+)
+def get_changes(
+    since: str | None = Query(default=None, description="Курсор next_since"),
+    limit: int = Query(
+        default=settings.change_feed_page_default,
+        ge=1,
+        le=settings.change_feed_page_max,
+        description="Максимум изменений в ответе",
+    ),
+    db: Session = Depends(get_db),
+):
+    return ChangeFeedService(db).get_changes(since, limit=limit)
+
+
+@router.get(
+    "/autocomplete",
+    response_model=list[OrganizationSuggestion],
+    summary="Автодополнение названий организаций",
+    description=(
+        "Подсказки для поля ввода: организации, название которых или одно из слов "
+        "в нём начинается с prefix (без учёта регистра, ё/е и кавычек). "
+        "Отвечает из индекса в памяти, без подсчёта общего количества."
+    ),
+    dependencies=[Depends(default_timeout)],
+)
+def autocomplete_organizations(
+    prefix: str = Query(..., min_length=1, description="Начало названия"),
+    limit: int = Query(
+        default=settings.autocomplete_limit_default,
+        ge=1,
+        le=settings.autocomplete_limit_max,
+        description="Максимум подсказок",
+    ),
+    db: Session = Depends(get_db),
+):
+    service = OrganizationService(db)
+    return service.autocomplete(prefix, limit=limit)
 
 
 @router.get(
     "/{org_id}",
     response_model=OrganizationRead,
     summary="Информация об организации",
-    description="Возвращает полную информацию об организации по её идентификатору.",
+    description=(
+        "Возвращает полную информацию об организации по её идентификатору. "
+        "Ответ — готовый документ из organization_documents, без сборки из связей."
+    ),
+    dependencies=[Depends(default_timeout)],
 )
 def get_organization(org_id: int, db: Session = Depends(get_db)):
     service = OrganizationService(db)
-    return service.get_by_id(org_id)
+    return Response(content=service.get_document(org_id), media_type="application/json")
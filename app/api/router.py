@@ -1,17 +1,29 @@
-"""Корневой роутер /api/v1 с авторизацией по API-ключу."""
+"""Корневой роутер /api/v1 с авторизацией и rate limiting по API-ключу."""
 
 from fastapi import APIRouter, Depends
 
 from app.api.activities import router as activities_router
+from app.api.admin import router as admin_router
+from app.api.batch import router as batch_router
 from app.api.buildings import router as buildings_router
 from app.api.organizations import router as organizations_router
-from app.dependencies import verify_api_key
+from app.api.snapshots import router as snapshots_router
+from app.api.tiles import router as tiles_router
+from app.dependencies import enforce_rate_limit, require_scope, verify_api_key
 
 api_router = APIRouter(
     prefix="/api/v1",
-    dependencies=[Depends(verify_api_key)],
+    dependencies=[Depends(verify_api_key), Depends(enforce_rate_limit)],
 )
 
-api_router.include_router(organizations_router)
-api_router.include_router(buildings_router)
-api_router.include_router(activities_router)
+# Чтение справочника — scope read; выгрузка проверяет export в своём роутере,
+# подзапросы batch проходят проверку scope своих эндпоинтов.
+read_scope = [Depends(require_scope("read"))]
+
+api_router.include_router(organizations_router, dependencies=read_scope)
+api_router.include_router(buildings_router, dependencies=read_scope)
+api_router.include_router(activities_router, dependencies=read_scope)
+api_router.include_router(snapshots_router, dependencies=read_scope)
+api_router.include_router(admin_router)
+api_router.include_router(tiles_router, dependencies=read_scope)
+api_router.include_router(batch_router)
@@ -0,0 +1,51 @@
+"""Эндпоинты снимков справочника."""
+
+from fastapi import APIRouter, HTTPException, Path, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.schemas.snapshot import SnapshotManifest
+from app.services.snapshot import VERSION_PATTERN, latest_manifest, snapshot_path
+
+router = APIRouter(prefix="/snapshots", tags=["Snapshots"])
+
+
+@router.get(
+    "/latest",
+    response_model=SnapshotManifest,
+    summary="Манифест последнего снимка",
+    description=(
+        "Версия, размер и SHA-256 последнего полного снимка справочника и курсор "
+        "since для /organizations/changes — изменений после снимка."
+    ),
+)
+def get_latest_snapshot():
+    manifest = latest_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Снимок ещё не собран")
+    return manifest
+
+
+@router.get(
+    "/{version}",
+    response_class=FileResponse,
+    summary="Файл снимка",
+    description=(
+        "Сжатый gzip JSON: здания, дерево видов деятельности, организации. "
+        "Версия неизменяема: ETag — номер версии; поддерживается Range для докачки."
+    ),
+    responses={200: {"content": {"application/gzip": {}}}, 304: {}, 404: {}},
+)
+def get_snapshot(
+    request: Request,
+    version: str = Path(pattern=VERSION_PATTERN, description="Версия из манифеста"),
+):
+    path = snapshot_path(version)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Снимок не найден")
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(
+        path, media_type="application/gzip", filename=path.name, headers=headers
+    )
@@ -0,0 +1,39 @@
+"""Эндпоинты тайлов карты."""
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.dependencies import default_timeout, get_db
+from app.services.tile import TileService
+from app.utils.tiles import MEDIA_TYPE
+
+router = APIRouter(prefix="/tiles", tags=["Tiles"])
+
+
+@router.get(
+    "/{z}/{x}/{y}",
+    response_class=Response,
+    summary="Тайл точек зданий",
+    description=(
+        "Здания тайла Web Mercator z/x/y с числом организаций в компактном бинарном "
+        "формате: квантованные координаты внутри тайла, разностное кодирование, varint "
+        "(см. app/utils/tiles.py). Для мелких масштабов — /buildings/clusters."
+    ),
+    responses={200: {"content": {MEDIA_TYPE: {}}}, 304: {}, 404: {}},
+    dependencies=[Depends(default_timeout)],
+)
+def get_tile(
+    request: Request,
+    z: int = Path(ge=settings.tile_zoom_min, le=settings.tile_zoom_max, description="Масштаб"),
+    x: int = Path(ge=0, description="Номер тайла по долготе"),
+    y: int = Path(ge=0, description="Номер тайла по широте (растёт к югу)"),
+    db: Session = Depends(get_db),
+):
+    if x >= 2**z or y >= 2**z:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Тайл вне сетки масштаба")
+    tile, etag = TileService(db).get_tile(z, x, y)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.tile_cache_max_age}"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=tile, media_type=MEDIA_TYPE, headers=headers)
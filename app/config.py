@@ -1,5 +1,7 @@
 """Настройки приложения. Значения берутся из переменных окружения / .env файла."""
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -8,8 +10,101 @@ class Settings(BaseSettings):
 
     database_url: str = "postgresql://postgres:postgres@db:5432/directory_db"
     api_key: str = "my-secret-api-key"
+    api_key_pepper: str = ""
+    api_key_cache_ttl: float = 30
+    api_key_negative_cache_ttl: float = 5
+    api_key_cache_size: int = 10_000
+    api_key_negative_cache_size: int = 1_000
+
+    # Rate limiting по API-ключу: token bucket, стоимость эндпоинта (по имени) в токенах.
+    rate_limit_enabled: bool = True
+    rate_limit_backend: Literal["memory", "postgres"] = "memory"
+    rate_limit_capacity: int = 120
+    rate_limit_refill_per_second: float = 20
+    rate_limit_default_cost: int = 1
+    rate_limit_route_costs: dict[str, int] = {
+        "search_organizations_by_name": 3,
+        "search_organizations_by_activity": 3,
+        "search_organizations_by_activities": 3,
+        "search_organizations_in_radius": 5,
+        "search_organizations_in_rectangle": 5,
+        "search_organizations": 5,
+        "export_table": 20,
+        "get_building_clusters": 3,
+    }
     page_size_default: int = 20
     page_size_max: int = 100
+    facet_size_default: int = 10
+    facet_size_max: int = 50
+    activity_filter_max_ids: int = 20
+    change_feed_page_default: int = 100
+    change_feed_page_max: int = 1000
+    # Кластеры зданий: ячеек на сторону тайла, максимальный масштаб, Cache-Control max-age (сек).
+    cluster_cells_per_tile: int = 4
+    cluster_zoom_max: int = 20
+    cluster_cache_max_age: int = 60
+    # Тайлы точек: допустимые масштабы, сетка квантования, кэш отрендеренных тайлов.
+    tile_zoom_min: int = 10
+    tile_zoom_max: int = 22
+    tile_extent: int = 4096
+    tile_cache_ttl: float = 600
+    tile_cache_size: int = 4096
+    tile_cache_max_age: int = 60
+
+    # Бюджеты времени на SQL (мс). X-Request-Timeout может переопределить, но не выше max.
+    statement_timeout_ms: int = 3000
+    statement_timeout_search_ms: int = 5000
+    statement_timeout_max_ms: int = 15000
+    statement_timeout_retry_after: int = 2
+
+    # Защита от дорогих запросов: пороги площади геопоиска (км²) и длины строки поиска.
+    cost_guard_exact_area_km2: float = 50_000
+    cost_guard_estimate_area_km2: float = 2_000_000
+    cost_guard_reject_area_km2: float = 60_000_000
+    cost_guard_candidate_cap: int = 1000
+    cost_guard_name_exact_min_length: int = 3
+
+    # Объединение одинаковых конкурентных запросов к сервисам (single-flight).
+    singleflight_enabled: bool = True
+
+    # Stale-while-revalidate кэш (сек): индекс дерева деятельностей и первые страницы зданий.
+    activity_tree_cache_ttl: float = 5
+    activity_tree_cache_max_stale: float = 60
+    building_list_cache_ttl: float = 5
+    building_list_cache_max_stale: float = 60
+    building_list_cache_pages: int = 3
+
+    # Сжатие ответов (zstd / br / gzip): порог размера в байтах, уровни, кэш сжатых тел.
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    compression_zstd_level: int = 3
+    compression_cache_size: int = 512
+    compression_cache_ttl: float = 300
+
+    # Индексы в памяти процесса: период сверки с БД (сек), размер подсказок и поиска деятельностей.
+    index_refresh_interval: float = 5
+    name_search_engine: Literal["database", "ngram"] = "database"
+    bitmap_index_enabled: bool = False
+    autocomplete_limit_default: int = 10
+    autocomplete_limit_max: int = 50
+    activity_lookup_limit_default: int = 10
+    activity_lookup_limit_max: int = 50
+
+    # Снимки справочника: каталог файлов, период сборки (сек), сколько версий хранить.
+    snapshot_dir: str = "snapshots"
+    snapshot_interval: float = 3600
+    snapshot_keep: int = 3
+    snapshot_batch_size: int = 1000
+
+    # POST /batch: подзапросов в пакете и одновременно выполняемых подзапросов на процесс
+    # (каждый держит свою сессию БД — не больше размера пула соединений).
+    batch_max_requests: int = 20
+    batch_concurrency: int = 4
+
+    # Выгрузка в Parquet: строк в порции серверного курсора (= row group) и кодек сжатия.
+    export_batch_size: int = 50_000
+    export_compression: str = "zstd"
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
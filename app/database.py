@@ -1,7 +1,7 @@
 """Подключение к БД: engine, фабрика сессий, базовый класс моделей."""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy import Connection, create_engine, event
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.config import settings
 
@@ -11,3 +11,29 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 class Base(DeclarativeBase):
     """Базовый класс для всех ORM-моделей."""
+
+
+STATEMENT_TIMEOUT_KEY = "statement_timeout_ms"
+
+
+def apply_statement_timeout(session: Session, timeout_ms: int) -> None:
+    """Ограничить время SQL-запросов сессии (SET LOCAL, действует до конца транзакции).
+
+    Если транзакция ещё не начата, таймаут применится при её старте —
+    лишнего round trip для запросов, которые не дойдут до БД, не будет.
+    """
+    session.info[STATEMENT_TIMEOUT_KEY] = timeout_ms
+    if session.in_transaction():
+        _set_local_timeout(session.connection(), timeout_ms)
+
+
+def _set_local_timeout(connection: Connection, timeout_ms: int) -> None:
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_timeout_on_begin(session, transaction, connection) -> None:  # noqa: ANN001
+    """Применить отложенный statement_timeout в начале каждой транзакции."""
+    timeout_ms = session.info.get(STATEMENT_TIMEOUT_KEY)
+    if timeout_ms is not None:
+        _set_local_timeout(connection, timeout_ms)
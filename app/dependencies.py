@@ -1,12 +1,29 @@
-"""FastAPI-зависимости: сессия БД, авторизация, параметры пагинации."""
+"""FastAPI-зависимости: сессия БД, авторизация, rate limit, бюджет времени, пагинация."""
 
+import math
+from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Literal
 
-from fastapi import HTTPException, Query, Security, status
+from fastapi import Depends, Header, HTTPException, Query, Request, Response, Security, status
 from fastapi.security import APIKeyHeader
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import SessionLocal
+from app.database import SessionLocal, apply_statement_timeout
+from app.middleware.rate_limit import STATE_KEY as RATE_LIMIT_STATE_KEY
+from app.schemas.facet import FacetRequest
+from app.schemas.organization import (
+    OrganizationList,
+    OrganizationProjection,
+    OrganizationSearchParams,
+    OrganizationSearchResult,
+)
+from app.services.api_key import ApiKeyService, ApiPrincipal
+from app.utils.formats import ResponseFormat, negotiate_format
+from app.utils.metrics import metrics
+from app.utils.ratelimit import get_rate_limit_store
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -20,19 +37,104 @@ def get_db():
         db.close()
 
 
-def verify_api_key(api_key: str = Security(api_key_header)) -> str:
-    """Проверка заголовка X-API-Key. 401 — нет ключа, 403 — неверный."""
+def verify_api_key(
+    request: Request,
+    api_key: str = Security(api_key_header),
+    db: Session = Depends(get_db),
+) -> ApiPrincipal:
+    """Проверка заголовка X-API-Key. 401 — нет ключа, 403 — неверный или отозван.
+
+    Подзапросы POST /batch приходят с уже проверенным клиентом в request.state.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
     if api_key is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="API key is missing",
         )
-    if api_key != settings.api_key:
+    principal = ApiKeyService(db).authenticate(api_key)
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API key",
         )
-    return api_key
+    return principal
+
+
+def require_scope(scope: str) -> Callable[..., ApiPrincipal]:
+    """Фабрика зависимости: 403, если у ключа нет scope."""
+
+    def dependency(principal: ApiPrincipal = Depends(verify_api_key)) -> ApiPrincipal:
+        if not principal.has_scope(scope):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"API key lacks scope '{scope}'",
+            )
+        return principal
+
+    return dependency
+
+
+def enforce_rate_limit(
+    request: Request,
+    principal: ApiPrincipal = Depends(verify_api_key),
+) -> None:
+    """Списать токены эндпоинта из бакета ключа. 429 с Retry-After, если не хватает.
+
+    Заголовки RateLimit-* добавляет к ответу RateLimitHeadersMiddleware.
+    """
+    if not settings.rate_limit_enabled:
+        return
+    endpoint = getattr(request.scope.get("route"), "name", request.url.path)
+    cost = settings.rate_limit_route_costs.get(endpoint, settings.rate_limit_default_cost)
+    key = f"key:{principal.key_id if principal.key_id is not None else principal.name}"
+
+    result = get_rate_limit_store().consume(
+        key,
+        cost,
+        capacity=settings.rate_limit_capacity,
+        refill_rate=settings.rate_limit_refill_per_second,
+    )
+    if not result.allowed:
+        metrics.inc("rate_limit_rejected_total", endpoint=endpoint)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={
+                **result.headers(),
+                "Retry-After": str(math.ceil(result.retry_after(cost))),
+            },
+        )
+    setattr(request.state, RATE_LIMIT_STATE_KEY, result.headers())
+
+
+def statement_timeout(default_ms: int) -> Callable[..., int]:
+    """Фабрика зависимости: бюджет времени на SQL-запросы маршрута (мс).
+
+    Клиент может переопределить бюджет заголовком X-Request-Timeout,
+    но не выше settings.statement_timeout_max_ms.
+    """
+
+    def dependency(
+        db: Session = Depends(get_db),
+        x_request_timeout: int | None = Header(
+            default=None,
+            ge=1,
+            description="Бюджет времени на запрос в миллисекундах",
+        ),
+    ) -> int:
+        budget = min(x_request_timeout or default_ms, settings.statement_timeout_max_ms)
+        apply_statement_timeout(db, budget)
+        return budget
+
+    return dependency
+
+
+default_timeout = statement_timeout(settings.statement_timeout_ms)
+search_timeout = statement_timeout(settings.statement_timeout_search_ms)
+export_timeout = statement_timeout(settings.statement_timeout_max_ms)
 
 
 @dataclass
@@ -58,3 +160,132 @@ def get_pagination(
 ) -> Pagination:
     """Извлечь и провалидировать limit/offset из query-параметров."""
     return Pagination(limit=limit, offset=offset)
+
+
+def get_facet_request(
+    facets: str | None = Query(
+        default=None, description="Фасеты через запятую: activity, building"
+    ),
+    facet_size: int = Query(
+        default=settings.facet_size_default,
+        ge=1,
+        le=settings.facet_size_max,
+        description="Максимум групп в каждом фасете",
+    ),
+) -> FacetRequest | None:
+    """Разобрать параметр facets. None — фасеты не запрошены."""
+    if not facets:
+        return None
+    kinds = _split_list(facets)
+    unknown = kinds - {"activity", "building"}
+    if unknown:
+        raise _unprocessable(f"Неизвестные фасеты: {', '.join(sorted(unknown))}")
+    return FacetRequest(kinds=frozenset(kinds), size=facet_size)
+
+
+def _split_list(value: str) -> set[str]:
+    """Значения параметра через запятую без пустых и пробелов."""
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+def _unprocessable(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=detail)
+
+
+def get_search_params(
+    q: str | None = Query(default=None, min_length=1, description="Подстрока названия"),
+    activity_id: int | None = Query(
+        default=None, description="Вид деятельности (с учётом вложенных)"
+    ),
+    building_id: int | None = Query(default=None, description="ID здания"),
+    lat: float | None = Query(default=None, ge=-90, le=90, description="Широта центра"),
+    lng: float | None = Query(default=None, ge=-180, le=180, description="Долгота центра"),
+    radius: float | None = Query(
+        default=None, gt=0, le=40_075_000, description="Радиус поиска в метрах"
+    ),
+    lat_min: float | None = Query(default=None, ge=-90, le=90, description="Мин. широта"),
+    lat_max: float | None = Query(default=None, ge=-90, le=90, description="Макс. широта"),
+    lng_min: float | None = Query(default=None, ge=-180, le=180, description="Мин. долгота"),
+    lng_max: float | None = Query(default=None, ge=-180, le=180, description="Макс. долгота"),
+    order: Literal["id", "distance"] = Query(
+        default="id", description="Сортировка: id или distance (нужны lat/lng)"
+    ),
+) -> OrganizationSearchParams:
+    """Извлечь и провалидировать сочетание фильтров поиска."""
+    if (lat is None) != (lng is None):
+        raise _unprocessable("lat и lng задаются вместе")
+    if radius is not None and lat is None:
+        raise _unprocessable("Для radius нужны lat и lng")
+    if order == "distance" and lat is None:
+        raise _unprocessable("Сортировка по distance требует lat и lng")
+
+    bounds = (lat_min, lat_max, lng_min, lng_max)
+    rectangle = None
+    if any(b is not None for b in bounds):
+        if any(b is None for b in bounds):
+            raise _unprocessable("Прямоугольник задаётся всеми lat_min, lat_max, lng_min, lng_max")
+        if lat_min >= lat_max:
+            raise _unprocessable("lat_min должен быть меньше lat_max")
+        if lng_min >= lng_max:
+            raise _unprocessable("lng_min должен быть меньше lng_max")
+        rectangle = (lat_min, lat_max, lng_min, lng_max)
+
+    if q is None and activity_id is None and building_id is None and radius is None and rectangle is None:
+        raise _unprocessable("Нужен хотя бы один фильтр: q, activity_id, building_id, radius или прямоугольник")
+
+    return OrganizationSearchParams(
+        q=q, activity_id=activity_id, building_id=building_id,
+        lat=lat, lng=lng, radius=radius, rectangle=rectangle, order=order,
+    )
+
+
+def get_response_format(request: Request, response: Response) -> ResponseFormat:
+    """Формат спискового ответа по заголовку Accept (JSON, MessagePack, Arrow)."""
+    response.headers["Vary"] = "Accept"
+    return negotiate_format(request.headers.get("accept", ""))
+
+
+_EXPANDABLE = ("building", "phones", "activities")
+
+
+def organization_projection(schema: type[BaseModel]) -> Callable[..., OrganizationProjection]:
+    """Фабрика зависимости: поля (fields) и связи (expand) элементов списка организаций.
+
+    Без fields — все поля schema, id выводится всегда. Связи встраиваются
+    только в JSON: бинарные форматы плоские и строятся без Pydantic-моделей.
+    """
+    allowed = tuple(schema.model_fields)
+
+    def dependency(
+        fields: str | None = Query(
+            default=None, description=f"Поля через запятую: {', '.join(allowed)}"
+        ),
+        expand: str | None = Query(
+            default=None, description=f"Связи через запятую: {', '.join(_EXPANDABLE)}"
+        ),
+        fmt: ResponseFormat = Depends(get_response_format),
+    ) -> OrganizationProjection:
+        selected = _split_list(fields) if fields else set(allowed)
+        unknown = selected - set(allowed)
+        if unknown:
+            raise _unprocessable(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+        expanded = _split_list(expand) if expand else set()
+        unknown = expanded - set(_EXPANDABLE)
+        if unknown:
+            raise _unprocessable(f"Неизвестные связи: {', '.join(sorted(unknown))}")
+        if expanded and fmt != "json":
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail="expand доступен только в JSON",
+            )
+        return OrganizationProjection(
+            fields=frozenset(selected | {"id"}),
+            expand=frozenset(expanded),
+            flat=fmt != "json",
+        )
+
+    return dependency
+
+
+list_projection = organization_projection(OrganizationList)
+search_projection = organization_projection(OrganizationSearchResult)
@@ -0,0 +1 @@
+"""Поисковые индексы в памяти процесса, синхронизируемые с БД."""
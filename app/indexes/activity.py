@@ -0,0 +1,87 @@
+"""Индекс дерева видов деятельности: узлы, пути от корня и поиск по названию.
+
+Строится один раз из плоского списка (ActivityRepository.get_all) и дальше
+не меняется — ActivityService хранит его в SWR-кэше и при обновлении
+подменяет целиком. Все ответы (дерево, поддерево, путь, поиск) — из словарей,
+без обращения к БД.
+"""
+
+from collections.abc import Iterable
+
+from app.indexes.autocomplete import normalize
+from app.models.activity import Activity
+from app.schemas.activity import ActivityRead, ActivityTree, ActivityWithPath
+
+
+class ActivityIndex:
+    """Неизменяемый индекс: id → узел дерева, id → путь от корня, название → id."""
+
+    def __init__(self, activities: Iterable[Activity]) -> None:
+        activities = sorted(activities, key=lambda act: act.id)
+        self._flat: dict[int, ActivityRead] = {
+            act.id: ActivityRead.model_validate(act) for act in activities
+        }
+        self._nodes: dict[int, ActivityTree] = {
+            act.id: ActivityTree(id=act.id, name=act.name, level=act.level, children=[])
+            for act in activities
+        }
+        self._roots: list[ActivityTree] = []
+        for act in activities:
+            node = self._nodes[act.id]
+            if act.parent_id is None:
+                self._roots.append(node)
+            elif act.parent_id in self._nodes:
+                self._nodes[act.parent_id].children.append(node)
+
+        self._paths: dict[int, tuple[int, ...]] = {}
+        for root in self._roots:
+            self._index_paths(root, ())
+
+        self._by_name: dict[str, list[int]] = {}
+        for act in activities:
+            self._by_name.setdefault(normalize(act.name), []).append(act.id)
+
+    def _index_paths(self, node: ActivityTree, parent_path: tuple[int, ...]) -> None:
+        path = (*parent_path, node.id)
+        self._paths[node.id] = path
+        for child in node.children:
+            self._index_paths(child, path)
+
+    def __contains__(self, activity_id: int) -> bool:
+        return activity_id in self._paths
+
+    def tree(self) -> list[ActivityTree]:
+        """Корневые узлы с вложенными children."""
+        return self._roots
+
+    def subtree(self, activity_id: int) -> ActivityTree | None:
+        """Узел с потомками или None."""
+        return self._nodes.get(activity_id) if activity_id in self else None
+
+    def path(self, activity_id: int) -> list[ActivityRead] | None:
+        """Путь от корня до активности включительно или None."""
+        ids = self._paths.get(activity_id)
+        if ids is None:
+            return None
+        return [self._flat[node_id] for node_id in ids]
+
+    def descendant_ids(self, activity_id: int, *, include_self: bool = True) -> list[int]:
+        """ID потомков в порядке обхода в глубину. Неизвестный ID — пустой список."""
+        node = self.subtree(activity_id)
+        if node is None:
+            return []
+        result: list[int] = [activity_id] if include_self else []
+        stack = list(reversed(node.children))
+        while stack:
+            current = stack.pop()
+            result.append(current.id)
+            stack.extend(reversed(current.children))
+        return result
+
+    def lookup(self, name: str, *, limit: int) -> list[ActivityWithPath]:
+        """До limit активностей с таким названием (без учёта регистра, ё/е, кавычек) с путями."""
+        ids = [act_id for act_id in self._by_name.get(normalize(name), []) if act_id in self]
+        return [
+            ActivityWithPath(**self._flat[act_id].model_dump(), path=self.path(act_id))
+            for act_id in ids[:limit]
+        ]
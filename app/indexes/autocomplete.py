@@ -0,0 +1,119 @@
+"""Автодополнение названий организаций: отсортированный массив ключей + bisect.
+
+Ключи — нормализованное название и все его суффиксы по словам, поэтому
+'ООО "Молочный мир"' находится и по «ооо мол», и по «мол», и по «мир».
+Нормализация: casefold, ё → е, удаление кавычек, схлопывание пробелов.
+"""
+
+import heapq
+import sys
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from app.indexes.base import RefreshableIndex
+from app.repositories.organization import OrganizationRepository
+
+_QUOTES = str.maketrans("", "", "\"'«»“”„‟`")
+
+
+def normalize(text: str) -> str:
+    """Нормализованная форма строки для сравнения по префиксу."""
+    return " ".join(text.casefold().replace("ё", "е").translate(_QUOTES).split())
+
+
+def index_keys(name: str) -> list[str]:
+    """Ключи названия: нормализованная строка, начиная с каждого слова."""
+    words = normalize(name).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    keys: list[str] = field(default_factory=list)
+    ids: list[int] = field(default_factory=list)
+    names: dict[int, str] = field(default_factory=dict)
+    max_id: int = 0
+
+
+def _entries(rows: list[tuple[int, str]]) -> list[tuple[str, int]]:
+    return sorted((key, org_id) for org_id, name in rows for key in index_keys(name))
+
+
+class AutocompleteIndex(RefreshableIndex):
+    """Префиксный индекс названий организаций.
+
+    Сигнатура — (count, max(id), контрольная сумма id и названий). Если
+    организации только добавлялись, новые строки (id > прежнего max)
+    вливаются слиянием; переименование или удаление ведёт к полной пересборке.
+    """
+
+    name = "autocomplete"
+
+    def __init__(self, *, refresh_interval: float | None = None) -> None:
+        super().__init__(refresh_interval=refresh_interval)
+        self._snapshot = _Snapshot()
+
+    def lookup(self, prefix: str, *, limit: int) -> list[tuple[int, str]]:
+        """До limit организаций, у которых название или слово в нём начинается с prefix."""
+        needle = normalize(prefix)
+        if not needle:
+            return []
+        snapshot = self._snapshot
+        found: dict[int, None] = {}
+        for i in range(bisect_left(snapshot.keys, needle), len(snapshot.keys)):
+            if not snapshot.keys[i].startswith(needle):
+                break
+            found.setdefault(snapshot.ids[i])
+            if len(found) == limit:
+                break
+        return [(org_id, snapshot.names[org_id]) for org_id in found]
+
+    def memory_usage(self) -> int:
+        snapshot = self._snapshot
+        return (
+            sys.getsizeof(snapshot.keys)
+            + sum(sys.getsizeof(key) for key in snapshot.keys)
+            + sys.getsizeof(snapshot.ids)
+            + sys.getsizeof(snapshot.names)
+            + sum(sys.getsizeof(name) for name in snapshot.names.values())
+        )
+
+    def _read_signature(self, db: Session) -> tuple[int, int, int]:
+        return OrganizationRepository(db).get_signature()
+
+    def _rebuild(self, db: Session) -> None:
+        rows = OrganizationRepository(db).get_names()
+        entries = _entries(rows)
+        self._snapshot = _Snapshot(
+            keys=[key for key, _ in entries],
+            ids=[org_id for _, org_id in entries],
+            names=dict(rows),
+            max_id=max((org_id for org_id, _ in rows), default=0),
+        )
+
+    def _apply_delta(
+        self, db: Session, old: tuple[int, int, int], new: tuple[int, int, int]
+    ) -> bool:
+        snapshot = self._snapshot
+        repo = OrganizationRepository(db)
+        if not repo.only_appended(old, new):
+            return False
+        rows = repo.get_names(after_id=snapshot.max_id)
+        if len(rows) != new[0] - old[0]:
+            return False
+        merged = list(heapq.merge(zip(snapshot.keys, snapshot.ids), _entries(rows)))
+        self._snapshot = _Snapshot(
+            keys=[key for key, _ in merged],
+            ids=[org_id for _, org_id in merged],
+            names={**snapshot.names, **dict(rows)},
+            max_id=new[1],
+        )
+        return True
+
+    def _reset(self) -> None:
+        self._snapshot = _Snapshot()
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,89 @@
+"""Базовый класс индекса в памяти процесса с инкрементальной сверкой с БД."""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Hashable
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.cache import register_cache
+from app.utils.metrics import metrics
+
+
+class RefreshableIndex(ABC):
+    """Индекс, который сверяется с БД не чаще refresh_interval секунд.
+
+    Сверка сравнивает дешёвую сигнатуру данных (_read_signature). При
+    изменении сначала пробуется дельта (_apply_delta), иначе индекс
+    перестраивается целиком. Первая сборка синхронная; последующие
+    выполняет один поток, остальные в это время читают текущую версию.
+    Читатели не блокируются: реализации подменяют снимок данных целиком.
+    """
+
+    name: str
+
+    def __init__(self, *, refresh_interval: float | None = None) -> None:
+        self.refresh_interval = (
+            settings.index_refresh_interval if refresh_interval is None else refresh_interval
+        )
+        self._lock = threading.Lock()
+        self._signature: Hashable | None = None
+        self._checked_at = -math.inf
+        register_cache(self)
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Сверить индекс с БД, если с прошлой сверки прошло больше refresh_interval."""
+        if self._signature is not None and not self._check_due():
+            return
+        if not self._lock.acquire(blocking=self._signature is None):
+            return
+        try:
+            if self._signature is not None and not self._check_due():
+                return
+            signature = self._read_signature(db)
+            if signature != self._signature:
+                if self._signature is not None and self._apply_delta(
+                    db, self._signature, signature
+                ):
+                    metrics.inc("index_refresh_total", index=self.name, kind="delta")
+                else:
+                    self._rebuild(db)
+                    metrics.inc("index_refresh_total", index=self.name, kind="rebuild")
+                self._signature = signature
+                metrics.set_gauge("index_memory_bytes", self.memory_usage(), index=self.name)
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def clear(self) -> None:
+        """Сбросить индекс: следующий запрос соберёт его заново."""
+        with self._lock:
+            self._signature = None
+            self._checked_at = -math.inf
+            self._reset()
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.refresh_interval
+
+    @abstractmethod
+    def _read_signature(self, db: Session) -> Hashable:
+        """Дешёвая сигнатура исходных данных: изменилась — индекс надо обновить."""
+
+    @abstractmethod
+    def _rebuild(self, db: Session) -> None:
+        """Полностью пересобрать индекс."""
+
+    def _apply_delta(self, db: Session, old: Hashable, new: Hashable) -> bool:
+        """Применить изменения между сигнатурами. False — дельта невозможна."""
+        return False
+
+    @abstractmethod
+    def _reset(self) -> None:
+        """Освободить данные индекса."""
+
+    @abstractmethod
+    def memory_usage(self) -> int:
+        """Оценка занимаемой памяти в байтах."""
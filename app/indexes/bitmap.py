@@ -0,0 +1,114 @@
+"""Битмап-индекс принадлежности организаций видам деятельности и зданиям.
+
+Для каждого вида деятельности хранится сжатый битмап (Roaring) ID
+организаций всего его поддерева, для каждого здания — битмап его
+организаций. Фильтры комбинируются AND/OR над битмапами, общее
+количество — мощность результата, страница — срез отсортированных ID.
+Источник — organizations.building_id и ancestor_activity_ids
+(денормализация organization_activities с предками).
+
+pyroaring — опциональная зависимость: без неё движок недоступен.
+"""
+
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from app.indexes.base import RefreshableIndex
+from app.repositories.organization import OrganizationRepository
+
+try:
+    from pyroaring import BitMap, FrozenBitMap
+except ImportError:  # pragma: no cover - опциональная зависимость
+    BitMap = FrozenBitMap = None
+
+
+def bitmaps_available() -> bool:
+    """Установлен ли pyroaring."""
+    return BitMap is not None
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    by_activity: dict = field(default_factory=dict)
+    by_building: dict = field(default_factory=dict)
+
+
+class BitmapIndex(RefreshableIndex):
+    """Битмапы по поддеревьям деятельности и по зданиям.
+
+    Сигнатура — число, max ID и контрольная сумма (здание, ancestor_activity_ids)
+    организаций; любое изменение ведёт к пересборке одним запросом.
+    """
+
+    name = "bitmap"
+
+    def __init__(self, *, refresh_interval: float | None = None) -> None:
+        super().__init__(refresh_interval=refresh_interval)
+        self._snapshot = _Snapshot()
+
+    def select(
+        self,
+        *,
+        activity_ids: list[int] | None = None,
+        match_all: bool = False,
+        building_id: int | None = None,
+    ) -> "FrozenBitMap":
+        """ID организаций по фильтрам. activity_ids — корни поддеревьев (OR или AND)."""
+        snapshot = self._snapshot
+        empty = FrozenBitMap()
+        parts = []
+        if activity_ids is not None:
+            bitmaps = [snapshot.by_activity.get(i, empty) for i in activity_ids]
+            if not bitmaps:
+                return empty
+            combine = FrozenBitMap.intersection if match_all else FrozenBitMap.union
+            parts.append(combine(*bitmaps))
+        if building_id is not None:
+            parts.append(snapshot.by_building.get(building_id, empty))
+        if not parts:
+            return empty
+        return FrozenBitMap.intersection(*parts)
+
+    def memory_usage(self) -> int:
+        snapshot = self._snapshot
+        return sum(
+            _container_bytes(bitmap)
+            for bitmaps in (snapshot.by_activity, snapshot.by_building)
+            for bitmap in bitmaps.values()
+        )
+
+    def _read_signature(self, db: Session) -> tuple[int, int, int]:
+        return OrganizationRepository(db).get_membership_signature()
+
+    def _rebuild(self, db: Session) -> None:
+        by_activity: dict[int, BitMap] = {}
+        by_building: dict[int, BitMap] = {}
+        for org_id, building_id, activity_ids in OrganizationRepository(db).get_memberships():
+            by_building.setdefault(building_id, BitMap()).add(org_id)
+            for activity_id in activity_ids:
+                by_activity.setdefault(activity_id, BitMap()).add(org_id)
+        self._snapshot = _Snapshot(
+            by_activity={key: _freeze(bitmap) for key, bitmap in by_activity.items()},
+            by_building={key: _freeze(bitmap) for key, bitmap in by_building.items()},
+        )
+
+    def _reset(self) -> None:
+        self._snapshot = _Snapshot()
+
+
+def _container_bytes(bitmap: "FrozenBitMap") -> int:
+    stats = bitmap.get_statistics()
+    return (
+        stats["n_bytes_array_containers"]
+        + stats["n_bytes_run_containers"]
+        + stats["n_bytes_bitset_containers"]
+    )
+
+
+def _freeze(bitmap: "BitMap") -> "FrozenBitMap":
+    bitmap.run_optimize()
+    return FrozenBitMap(bitmap)
+
+
+bitmap_index = BitmapIndex()
@@ -0,0 +1,130 @@
+"""Инвертированный индекс символьных n-грамм названий организаций.
+
+Для каждой триграммы хранится отсортированный массив ID организаций
+(array('I'), 4 байта на ID). Поиск подстроки: пересечение списков
+триграмм запроса (от самого короткого, через bisect), затем проверка
+кандидатов по самому названию — совпадение триграмм не гарантирует
+совпадение подстроки. Запросы короче n проверяются по всем названиям.
+Сравнение без учёта регистра (casefold), как у ILIKE.
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from app.indexes.base import RefreshableIndex
+from app.repositories.organization import OrganizationRepository
+
+N = 3
+
+
+def ngrams(text: str) -> set[str]:
+    """Множество n-грамм строки (без дополнения по краям)."""
+    return {text[i : i + N] for i in range(len(text) - N + 1)}
+
+
+def _contains(postings: array, value: int) -> bool:
+    i = bisect_left(postings, value)
+    return i < len(postings) and postings[i] == value
+
+
+def _intersect(lists: list[array]) -> list[int]:
+    """Пересечение отсортированных списков: перебор самого короткого, поиск в остальных."""
+    shortest, *rest = sorted(lists, key=len)
+    return [value for value in shortest if all(_contains(other, value) for other in rest)]
+
+
+@dataclass
+class _Snapshot:
+    postings: dict[str, array] = field(default_factory=dict)
+    folded: dict[int, str] = field(default_factory=dict)
+    ids: array = field(default_factory=lambda: array("I"))
+
+
+class NgramIndex(RefreshableIndex):
+    """Триграммный индекс названий. Сигнатура и дельта — как у автодополнения:
+    добавленные организации (id > прежнего max) дописываются в конец списков,
+    остальные изменения ведут к пересборке.
+    """
+
+    name = "ngram"
+
+    def __init__(self, *, refresh_interval: float | None = None) -> None:
+        super().__init__(refresh_interval=refresh_interval)
+        self._snapshot = _Snapshot()
+
+    def search(self, query: str) -> list[int]:
+        """Отсортированные ID организаций, название которых содержит query."""
+        needle = query.casefold()
+        snapshot = self._snapshot
+        grams = ngrams(needle)
+        if grams:
+            lists = [snapshot.postings.get(gram) for gram in grams]
+            if any(postings is None for postings in lists):
+                return []
+            candidates = _intersect(lists)
+        else:
+            candidates = snapshot.ids
+        return [org_id for org_id in candidates if needle in snapshot.folded[org_id]]
+
+    def memory_usage(self) -> int:
+        snapshot = self._snapshot
+        postings = sum(
+            sys.getsizeof(gram) + sys.getsizeof(ids) for gram, ids in snapshot.postings.items()
+        )
+        names = sum(sys.getsizeof(name) for name in snapshot.folded.values())
+        return (
+            sys.getsizeof(snapshot.postings)
+            + postings
+            + sys.getsizeof(snapshot.folded)
+            + names
+            + sys.getsizeof(snapshot.ids)
+        )
+
+    def _read_signature(self, db: Session) -> tuple[int, int, int]:
+        return OrganizationRepository(db).get_signature()
+
+    def _rebuild(self, db: Session) -> None:
+        self._snapshot = self._extend(_Snapshot(), OrganizationRepository(db).get_names())
+
+    def _apply_delta(
+        self, db: Session, old: tuple[int, int, int], new: tuple[int, int, int]
+    ) -> bool:
+        snapshot = self._snapshot
+        repo = OrganizationRepository(db)
+        if not repo.only_appended(old, new):
+            return False
+        after_id = snapshot.ids[-1] if snapshot.ids else 0
+        rows = repo.get_names(after_id=after_id)
+        if len(rows) != new[0] - old[0]:
+            return False
+        self._snapshot = self._extend(snapshot, rows)
+        return True
+
+    @staticmethod
+    def _extend(snapshot: _Snapshot, rows: list[tuple[int, str]]) -> _Snapshot:
+        """Новый снимок: snapshot и организации rows с ID больше уже проиндексированных.
+
+        Исходный снимок не меняется — изменённые списки копируются, остальные общие.
+        """
+        folded = {**snapshot.folded, **{org_id: name.casefold() for org_id, name in rows}}
+        postings = dict(snapshot.postings)
+        copied: set[str] = set()
+        for org_id, _ in rows:
+            for gram in ngrams(folded[org_id]):
+                if gram not in copied:
+                    postings[gram] = array("I", postings.get(gram, ()))
+                    copied.add(gram)
+                postings[gram].append(org_id)
+        ids = array("I", snapshot.ids)
+        ids.extend(org_id for org_id, _ in rows)
+        return _Snapshot(postings=postings, folded=folded, ids=ids)
+
+    def _reset(self) -> None:
+        self._snapshot = _Snapshot()
+
+
+ngram_index = NgramIndex()
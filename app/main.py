@@ -1,8 +1,19 @@
 """Точка входа FastAPI-приложения."""
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from app.api.router import api_router
+from app.config import settings
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.rate_limit import RateLimitHeadersMiddleware
+from app.utils.metrics import metrics
+from app.utils.singleflight import SingleFlightTimeout
+
+# SQLSTATE query_canceled: сработал statement_timeout
+QUERY_CANCELED = "57014"
 
 app = FastAPI(
     title="Organization Directory API",
@@ -15,10 +26,45 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RateLimitHeadersMiddleware)
 app.include_router(api_router)
 
 
+@app.exception_handler(OperationalError)
+@app.exception_handler(PoolTimeoutError)
+async def database_unavailable_handler(request: Request, exc: Exception) -> JSONResponse:
+    """504 — запрос превысил бюджет времени, 503 — БД недоступна. Оба с Retry-After."""
+    if getattr(getattr(exc, "orig", None), "pgcode", None) == QUERY_CANCELED:
+        status_code = status.HTTP_504_GATEWAY_TIMEOUT
+        detail = "Query time budget exceeded"
+    else:
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        detail = "Database is temporarily unavailable"
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(settings.statement_timeout_retry_after)},
+    )
+
+
+@app.exception_handler(SingleFlightTimeout)
+async def coalesced_timeout_handler(request: Request, exc: SingleFlightTimeout) -> JSONResponse:
+    """504 — объединённый запрос не дождался общего результата за свой бюджет."""
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "Query time budget exceeded"},
+        headers={"Retry-After": str(settings.statement_timeout_retry_after)},
+    )
+
+
 @app.get("/health", tags=["Health"])
 def health_check():
     """Проверка доступности сервиса."""
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def get_metrics():
+    """Метрики процесса в текстовом формате Prometheus."""
+    return metrics.render()
@@ -0,0 +1,185 @@
+"""Сжатие ответов: согласование zstd / br / gzip, порог размера, кэш сжатых тел.
+
+brotli и zstandard — опциональные зависимости: без них доступен только gzip.
+Ответы с ETag (из кэша сервиса) сжимаются один раз: сжатое тело хранится
+по ключу (ETag, кодировка, URL) и переиспользуется на следующих запросах.
+"""
+
+import gzip
+from collections.abc import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - опциональная зависимость
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - опциональная зависимость
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "application/msgpack",
+    "application/vnd.apache.arrow.stream",
+    "text/",
+)
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=settings.compression_brotli_quality)
+
+
+def _zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=settings.compression_zstd_level).compress(body)
+
+
+def available_encoders() -> dict[str, Callable[[bytes], bytes]]:
+    """Доступные кодировки в порядке предпочтения сервера."""
+    encoders: dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = _zstd
+    if brotli is not None:
+        encoders["br"] = _brotli
+    encoders["gzip"] = _gzip
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, encoders: dict) -> str | None:
+    """Выбрать кодировку по Accept-Encoding: максимальный q, при равенстве — порядок сервера."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for name in encoders:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+_compressed_cache: TTLCache[bytes] = TTLCache(
+    "compressed_bodies",
+    ttl=settings.compression_cache_ttl,
+    maxsize=settings.compression_cache_size,
+)
+
+
+class CompressionMiddleware:
+    """ASGI-middleware сжатия. Потоковые ответы (несколько чанков) не трогает."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encoders
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, scope, encoding, self.encoders[encoding])
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, send: Send, scope: Scope, encoding: str, encoder: Callable[[bytes], bytes]
+    ) -> None:
+        self._send = send
+        self._scope = scope
+        self._encoding = encoding
+        self._encoder = encoder
+        self._start: Message | None = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        start, self._start = self._start, None
+        if start is None:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        if message.get("more_body", False) or not self._should_compress(start, body):
+            self._passthrough = True
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(scope=start)
+        compressed = self._compress(body, headers.get("etag"), headers.get("content-type"))
+        headers["Content-Encoding"] = self._encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        metrics.inc("compression_responses_total", encoding=self._encoding)
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _should_compress(self, start: Message, body: bytes) -> bool:
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        return len(body) >= settings.compression_min_size
+
+    def _compress(self, body: bytes, etag: str | None, content_type: str | None) -> bytes:
+        if etag is None:
+            return self._encoder(body)
+        # Тело зависит и от URL (ссылки next/previous) и формата, поэтому они входят в ключ.
+        key = (
+            etag,
+            self._encoding,
+            content_type,
+            Headers(scope=self._scope).get("host"),
+            self._scope.get("path"),
+            self._scope.get("query_string"),
+        )
+        found, compressed = _compressed_cache.get(key)
+        if found:
+            metrics.inc("compression_cache_total", result="hit")
+            return compressed
+        metrics.inc("compression_cache_total", result="miss")
+        compressed = self._encoder(body)
+        _compressed_cache.set(key, compressed)
+        return compressed
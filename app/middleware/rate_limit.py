@@ -0,0 +1,33 @@
+"""Заголовки RateLimit-* на всех ответах, включая готовые Response эндпоинтов.
+
+enforce_rate_limit кладёт заголовки в request.state, а middleware добавляет
+их в начало ответа — заголовки не теряются, если эндпоинт возвращает свой
+Response (бинарные форматы, тайлы, готовый JSON организации).
+"""
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+STATE_KEY = "rate_limit_headers"
+
+
+class RateLimitHeadersMiddleware:
+    """ASGI-middleware: заголовки лимита из scope["state"] в http.response.start."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in state.get(STATE_KEY, {}).items():
+                    headers.setdefault(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,13 +1,22 @@
 """ORM-модели: регистрация всех таблиц для Alembic и Base.metadata."""
 
+from app.models.api_key import ApiKey
 from app.models.building import Building
+from app.models.change_log import ChangeLog
 from app.models.activity import Activity
 from app.models.organization import Organization, OrganizationPhone, organization_activities
+from app.models.organization_document import OrganizationDocument
+from app.models.rate_limit import RateLimitBucket
+from app.models import triggers  # noqa: F401 — DDL-события для create_all
 
 __all__ = [
+    "ApiKey",
     "Building",
+    "ChangeLog",
     "Activity",
     "Organization",
     "OrganizationPhone",
     "organization_activities",
+    "OrganizationDocument",
+    "RateLimitBucket",
 ]
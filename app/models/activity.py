@@ -29,6 +29,7 @@ class Activity(Base):
         UniqueConstraint("name", "parent_id", name="uq_activity_name_parent"),
         Index("ix_activities_parent_id", "parent_id"),
         Index("ix_activities_parent_level", "parent_id", "level"),
+        Index("ix_activities_updated_at", "updated_at"),
     )
 
     id = Column(Integer, primary_key=True)
@@ -38,6 +39,9 @@ class Activity(Base):
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
 
     parent = relationship("Activity", remote_side=[id], back_populates="children")
     children = relationship("Activity", back_populates="parent")
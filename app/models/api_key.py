@@ -0,0 +1,27 @@
+"""Модель API-ключа клиента. Хранится только хэш ключа."""
+
+from sqlalchemy import CheckConstraint, Column, DateTime, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.database import Base
+
+
+class ApiKey(Base):
+    """API-ключ клиента: HMAC-SHA256 хэш, набор scope и статус (active/revoked)."""
+
+    __tablename__ = "api_keys"
+    __table_args__ = (
+        CheckConstraint("status IN ('active', 'revoked')", name="check_api_key_status"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    key_hash = Column(String(64), nullable=False, unique=True, index=True)
+    scopes = Column(
+        ARRAY(String(50)), nullable=False, server_default=text("'{}'::varchar[]")
+    )
+    status = Column(String(20), nullable=False, server_default="active")
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -14,16 +14,25 @@ class Building(Base):
         CheckConstraint("latitude BETWEEN -90 AND 90", name="check_latitude_range"),
         CheckConstraint("longitude BETWEEN -180 AND 180", name="check_longitude_range"),
         Index("ix_buildings_lat_lng", "latitude", "longitude"),
+        Index("ix_buildings_updated_at", "updated_at"),
+        Index("ix_buildings_organization_count", "organization_count", "id"),
     )
 
     id = Column(Integer, primary_key=True)
     address = Column(String(500), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    # Счётчик организаций, поддерживается триггером (app.models.triggers).
+    organization_count = Column(Integer, server_default="0", nullable=False)
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
         nullable=False,
     )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
 
     organizations = relationship("Organization", back_populates="building")
@@ -0,0 +1,34 @@
+"""Журнал изменений организаций, зданий и видов деятельности для change feed."""
+
+from sqlalchemy import BigInteger, CheckConstraint, Column, DateTime, Index, Integer, String, func, text
+
+from app.database import Base
+
+
+class ChangeLog(Base):
+    """Запись об изменении сущности. Заполняется триггерами (app.models.triggers).
+
+    txid — ID транзакции (pg_current_xact_id): записи выдаются в порядке
+    (txid, id) и только после завершения всех транзакций с меньшим txid.
+    """
+
+    __tablename__ = "change_log"
+    __table_args__ = (
+        CheckConstraint(
+            "operation IN ('created', 'updated', 'deleted')", name="check_change_operation"
+        ),
+        Index("ix_change_log_txid_id", "txid", "id"),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    txid = Column(
+        BigInteger,
+        server_default=text("pg_current_xact_id()::text::bigint"),
+        nullable=False,
+    )
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)
+    changed_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -1,7 +1,8 @@
 """Модели организации, телефонов и связующей таблицы организация↔активность."""
 
 from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Table, UniqueConstraint, func
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 
@@ -32,14 +33,32 @@ class Organization(Base):
     __table_args__ = (
         Index("ix_organizations_building_id", "building_id"),
         Index("ix_organizations_name", "name"),
+        Index("ix_organizations_updated_at", "updated_at"),
+        Index(
+            "ix_organizations_activity_ids", "activity_ids", postgresql_using="gin"
+        ),
+        Index(
+            "ix_organizations_ancestor_activity_ids",
+            "ancestor_activity_ids",
+            postgresql_using="gin",
+        ),
     )
 
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     building_id = Column(Integer, ForeignKey("buildings.id"), nullable=False)
+    # Денормализация organization_activities, поддерживается триггерами (app.models.triggers).
+    # Не загружаются с объектом (deferred): нужны только в фильтрах.
+    activity_ids = deferred(Column(ARRAY(Integer), server_default="{}", nullable=False))
+    ancestor_activity_ids = deferred(
+        Column(ARRAY(Integer), server_default="{}", nullable=False)
+    )
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
 
     building = relationship("Building", back_populates="organizations")
     phones = relationship(
@@ -0,0 +1,19 @@
+"""Материализованное представление организации для detail-эндпоинта."""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text, func
+
+from app.database import Base
+
+
+class OrganizationDocument(Base):
+    """Готовый JSON организации в форме OrganizationRead. Поддерживается триггерами."""
+
+    __tablename__ = "organization_documents"
+
+    organization_id = Column(
+        Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
+    )
+    document = Column(Text, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,19 @@
+"""Состояние token bucket для rate limiting, общее для всех воркеров."""
+
+from sqlalchemy import Boolean, Column, DateTime, Float, String, func
+
+from app.database import Base
+
+
+class RateLimitBucket(Base):
+    """Бакет токенов клиента. UNLOGGED: потеря при сбое БД допустима."""
+
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    key = Column(String(200), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    allowed = Column(Boolean, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
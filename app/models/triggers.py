@@ -0,0 +1,331 @@
+"""Триггеры PostgreSQL, поддерживающие денормализованные данные.
+
+SQL устанавливается при Base.metadata.create_all (через DDL-события
+after_create). Миграции Alembic хранят собственные копии SQL на момент
+ревизии — изменение триггеров здесь требует новой миграции.
+"""
+
+from sqlalchemy import DDL, event
+
+from app.database import Base
+from app.models.organization import organization_activities
+
+# organizations.activity_ids — прямые виды деятельности организации,
+# organizations.ancestor_activity_ids — они же вместе со всеми предками.
+ACTIVITY_IDS_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION refresh_organization_activity_ids(org_id integer)
+RETURNS void LANGUAGE sql AS $$
+    UPDATE organizations SET
+        activity_ids = COALESCE((
+            SELECT array_agg(activity_id ORDER BY activity_id)
+            FROM organization_activities
+            WHERE organization_id = org_id
+        ), '{}'),
+        ancestor_activity_ids = COALESCE((
+            WITH RECURSIVE up AS (
+                SELECT a.id, a.parent_id
+                FROM activities a
+                JOIN organization_activities oa ON oa.activity_id = a.id
+                WHERE oa.organization_id = org_id
+                UNION
+                SELECT p.id, p.parent_id
+                FROM activities p
+                JOIN up ON p.id = up.parent_id
+            )
+            SELECT array_agg(DISTINCT id ORDER BY id) FROM up
+        ), '{}')
+    WHERE id = org_id;
+$$;
+
+CREATE OR REPLACE FUNCTION organization_activities_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_organization_activity_ids(NEW.organization_id);
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        PERFORM refresh_organization_activity_ids(OLD.organization_id);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION activities_parent_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM refresh_organization_activity_ids(id)
+    FROM organizations
+    WHERE ancestor_activity_ids @> ARRAY[NEW.id];
+    RETURN NULL;
+END;
+$$;
+"""
+
+ACTIVITY_IDS_TRIGGERS = """
+CREATE TRIGGER trg_organization_activities_sync
+AFTER INSERT OR UPDATE OR DELETE ON organization_activities
+FOR EACH ROW EXECUTE FUNCTION organization_activities_sync();
+
+CREATE TRIGGER trg_activities_parent_sync
+AFTER UPDATE OF parent_id ON activities
+FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+EXECUTE FUNCTION activities_parent_sync();
+"""
+
+# organization_activities создаётся последней из трёх таблиц, на которые ссылаются функции.
+event.listen(
+    organization_activities,
+    "after_create",
+    DDL(ACTIVITY_IDS_FUNCTIONS + ACTIVITY_IDS_TRIGGERS),
+)
+
+
+# organization_documents — JSON организации в форме OrganizationRead, собранный в БД.
+# jsonb_build_object(...)::text даёт компактный JSON без переводов строк.
+ORGANIZATION_DOCUMENT_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION refresh_organization_document(org_id integer)
+RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO organization_documents (organization_id, document, updated_at)
+    SELECT o.id,
+        jsonb_build_object(
+            'id', o.id,
+            'name', o.name,
+            'building', jsonb_build_object(
+                'id', b.id,
+                'address', b.address,
+                'latitude', b.latitude,
+                'longitude', b.longitude
+            ),
+            'phones', COALESCE((
+                SELECT jsonb_agg(
+                    jsonb_build_object('id', p.id, 'phone_number', p.phone_number)
+                    ORDER BY p.id
+                )
+                FROM organization_phones p
+                WHERE p.organization_id = o.id
+            ), '[]'::jsonb),
+            'activities', COALESCE((
+                SELECT jsonb_agg(
+                    jsonb_build_object(
+                        'id', a.id, 'name', a.name, 'parent_id', a.parent_id, 'level', a.level
+                    )
+                    ORDER BY a.id
+                )
+                FROM organization_activities oa
+                JOIN activities a ON a.id = oa.activity_id
+                WHERE oa.organization_id = o.id
+            ), '[]'::jsonb)
+        )::text,
+        now()
+    FROM organizations o
+    JOIN buildings b ON b.id = o.building_id
+    WHERE o.id = org_id
+    ON CONFLICT (organization_id) DO UPDATE
+        SET document = EXCLUDED.document, updated_at = EXCLUDED.updated_at;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION organization_document_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'organizations' THEN
+        PERFORM refresh_organization_document(NEW.id);
+    ELSE
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM refresh_organization_document(NEW.organization_id);
+        END IF;
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            PERFORM refresh_organization_document(OLD.organization_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION organization_document_building_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM refresh_organization_document(id)
+    FROM organizations
+    WHERE building_id = NEW.id;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION organization_document_activity_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM refresh_organization_document(id)
+    FROM organizations
+    WHERE activity_ids @> ARRAY[NEW.id];
+    RETURN NULL;
+END;
+$$;
+"""
+
+ORGANIZATION_DOCUMENT_TRIGGERS = """
+CREATE TRIGGER trg_organization_document_org
+AFTER INSERT OR UPDATE OF name, building_id ON organizations
+FOR EACH ROW EXECUTE FUNCTION organization_document_sync();
+
+CREATE TRIGGER trg_organization_document_phones
+AFTER INSERT OR UPDATE OR DELETE ON organization_phones
+FOR EACH ROW EXECUTE FUNCTION organization_document_sync();
+
+CREATE TRIGGER trg_organization_document_activities
+AFTER INSERT OR UPDATE OR DELETE ON organization_activities
+FOR EACH ROW EXECUTE FUNCTION organization_document_sync();
+
+CREATE TRIGGER trg_organization_document_building
+AFTER UPDATE OF address, latitude, longitude ON buildings
+FOR EACH ROW EXECUTE FUNCTION organization_document_building_sync();
+
+CREATE TRIGGER trg_organization_document_activity
+AFTER UPDATE OF name, parent_id, level ON activities
+FOR EACH ROW EXECUTE FUNCTION organization_document_activity_sync();
+"""
+
+# Триггеры висят на пяти таблицах — создаются после всех таблиц metadata.
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(ORGANIZATION_DOCUMENT_FUNCTIONS + ORGANIZATION_DOCUMENT_TRIGGERS),
+)
+
+
+# updated_at и change_log. Изменение телефонов организации «касается» её строки
+# и пишется в журнал как updated организации; смена видов деятельности — через
+# обновление activity_ids. UPDATE учитываются только при изменении собственных
+# колонок: триггерные пересчёты (organization_count, ancestor_activity_ids) не
+# двигают updated_at и не попадают в журнал.
+CHANGE_LOG_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION log_change()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO change_log (entity, entity_id, operation)
+    VALUES (
+        TG_ARGV[0],
+        CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+        CASE TG_OP WHEN 'INSERT' THEN 'created' WHEN 'UPDATE' THEN 'updated' ELSE 'deleted' END
+    );
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION touch_organization()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE organizations SET updated_at = now() WHERE id = NEW.organization_id;
+        IF FOUND THEN
+            INSERT INTO change_log (entity, entity_id, operation)
+            VALUES ('organization', NEW.organization_id, 'updated');
+        END IF;
+    END IF;
+    IF TG_OP = 'DELETE'
+        OR (TG_OP = 'UPDATE' AND OLD.organization_id <> NEW.organization_id) THEN
+        UPDATE organizations SET updated_at = now() WHERE id = OLD.organization_id;
+        IF FOUND THEN
+            INSERT INTO change_log (entity, entity_id, operation)
+            VALUES ('organization', OLD.organization_id, 'updated');
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+CHANGE_LOG_TRIGGERS = """
+CREATE TRIGGER trg_organizations_touch BEFORE UPDATE ON organizations
+FOR EACH ROW WHEN (
+    (OLD.name, OLD.building_id, OLD.activity_ids)
+    IS DISTINCT FROM (NEW.name, NEW.building_id, NEW.activity_ids)
+) EXECUTE FUNCTION touch_updated_at();
+CREATE TRIGGER trg_buildings_touch BEFORE UPDATE ON buildings
+FOR EACH ROW WHEN (
+    (OLD.address, OLD.latitude, OLD.longitude)
+    IS DISTINCT FROM (NEW.address, NEW.latitude, NEW.longitude)
+) EXECUTE FUNCTION touch_updated_at();
+CREATE TRIGGER trg_activities_touch BEFORE UPDATE ON activities
+FOR EACH ROW WHEN (
+    (OLD.name, OLD.parent_id, OLD.level)
+    IS DISTINCT FROM (NEW.name, NEW.parent_id, NEW.level)
+) EXECUTE FUNCTION touch_updated_at();
+
+CREATE TRIGGER trg_organizations_log AFTER INSERT OR DELETE ON organizations
+FOR EACH ROW EXECUTE FUNCTION log_change('organization');
+CREATE TRIGGER trg_buildings_log AFTER INSERT OR DELETE ON buildings
+FOR EACH ROW EXECUTE FUNCTION log_change('building');
+CREATE TRIGGER trg_activities_log AFTER INSERT OR DELETE ON activities
+FOR EACH ROW EXECUTE FUNCTION log_change('activity');
+
+CREATE TRIGGER trg_organizations_log_update AFTER UPDATE ON organizations
+FOR EACH ROW WHEN (
+    (OLD.name, OLD.building_id, OLD.activity_ids)
+    IS DISTINCT FROM (NEW.name, NEW.building_id, NEW.activity_ids)
+) EXECUTE FUNCTION log_change('organization');
+CREATE TRIGGER trg_buildings_log_update AFTER UPDATE ON buildings
+FOR EACH ROW WHEN (
+    (OLD.address, OLD.latitude, OLD.longitude)
+    IS DISTINCT FROM (NEW.address, NEW.latitude, NEW.longitude)
+) EXECUTE FUNCTION log_change('building');
+CREATE TRIGGER trg_activities_log_update AFTER UPDATE ON activities
+FOR EACH ROW WHEN (
+    (OLD.name, OLD.parent_id, OLD.level)
+    IS DISTINCT FROM (NEW.name, NEW.parent_id, NEW.level)
+) EXECUTE FUNCTION log_change('activity');
+
+CREATE TRIGGER trg_organization_phones_touch
+AFTER INSERT OR UPDATE OR DELETE ON organization_phones
+FOR EACH ROW EXECUTE FUNCTION touch_organization();
+"""
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(CHANGE_LOG_FUNCTIONS + CHANGE_LOG_TRIGGERS),
+)
+
+
+# buildings.organization_count — счётчик организаций в здании. Обновляется
+# на каждую вставку, удаление и переезд организации, без пересчёта count().
+ORGANIZATION_COUNT_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION buildings_organization_count_sync()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.building_id = OLD.building_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE buildings SET organization_count = organization_count + 1
+        WHERE id = NEW.building_id;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE buildings SET organization_count = organization_count - 1
+        WHERE id = OLD.building_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+ORGANIZATION_COUNT_TRIGGERS = """
+CREATE TRIGGER trg_buildings_organization_count
+AFTER INSERT OR DELETE OR UPDATE OF building_id ON organizations
+FOR EACH ROW EXECUTE FUNCTION buildings_organization_count_sync();
+"""
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(ORGANIZATION_COUNT_FUNCTIONS + ORGANIZATION_COUNT_TRIGGERS),
+)
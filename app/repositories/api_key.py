@@ -0,0 +1,42 @@
+"""Репозиторий API-ключей."""
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.api_key import ApiKey
+
+
+class ApiKeyRepository:
+    """Доступ к данным API-ключей."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_active_by_hash(self, key_hash: str) -> ApiKey | None:
+        """Активный ключ по хэшу или None."""
+        return (
+            self.db.query(ApiKey)
+            .filter(ApiKey.key_hash == key_hash, ApiKey.status == "active")
+            .first()
+        )
+
+    def get_by_id(self, key_id: int) -> ApiKey | None:
+        """Ключ по ID или None."""
+        return self.db.query(ApiKey).filter(ApiKey.id == key_id).first()
+
+    def get_all(self) -> list[ApiKey]:
+        """Все ключи (для администрирования)."""
+        return self.db.query(ApiKey).order_by(ApiKey.id).all()
+
+    def create(self, *, name: str, key_hash: str, scopes: list[str]) -> ApiKey:
+        """Добавить ключ в сессию (без commit)."""
+        api_key = ApiKey(name=name, key_hash=key_hash, scopes=scopes, status="active")
+        self.db.add(api_key)
+        self.db.flush()
+        return api_key
+
+    def revoke(self, api_key: ApiKey) -> None:
+        """Пометить ключ отозванным (без commit)."""
+        api_key.status = "revoked"
+        api_key.revoked_at = func.now()
+        self.db.flush()
@@ -1,10 +1,73 @@
 """Общие утилиты репозиториев."""
 
+from enum import Enum
+
+from sqlalchemy import func, inspect
 from sqlalchemy.orm import Query
 
 
-def paginate(query: Query, *, limit: int, offset: int) -> tuple[list, int]:
-    """Применить пагинацию к запросу. Возвращает (элементы, общее_количество)."""
-    total = query.count()
-    items = query.offset(offset).limit(limit).all()
+class CountMode(str, Enum):
+    """Способ подсчёта общего количества для пагинации."""
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+
+
+def paginate(
+    query: Query,
+    *,
+    limit: int,
+    offset: int,
+    count_mode: CountMode = CountMode.EXACT,
+    max_rows: int | None = None,
+) -> tuple[list, int]:
+    """Применить пагинацию к запросу. Возвращает (элементы, общее_количество).
+
+    max_rows ограничивает набор кандидатов: count не превышает max_rows,
+    страницы за пределами лимита пусты. Первичный ключ дописывается в конец
+    ORDER BY: без него порядок строк не определён, страницы могут пересекаться,
+    а «первые max_rows» — не совпадать с посчитанными. count — без сортировки.
+    """
+    entity = query.column_descriptions[0]["entity"]
+    ordered = query.order_by(*inspect(entity).primary_key)
+    if max_rows is not None:
+        return _paginate_capped(ordered, limit=limit, offset=offset, max_rows=max_rows)
+
+    items = ordered.offset(offset).limit(limit).all()
+    if count_mode is CountMode.ESTIMATED:
+        total = _consistent_total(estimate_count(query), items, limit=limit, offset=offset)
+    else:
+        total = query.count()
     return items, total
+
+
+def estimate_count(query: Query) -> int:
+    """Оценка количества строк по плану PostgreSQL (EXPLAIN), без выполнения запроса."""
+    statement = query.statement
+    compiled = statement.compile(dialect=query.session.get_bind().dialect)
+    plan = (
+        query.session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _paginate_capped(
+    query: Query, *, limit: int, offset: int, max_rows: int
+) -> tuple[list, int]:
+    """Пагинация по первым max_rows кандидатам."""
+    if offset >= max_rows:
+        items: list = []
+    else:
+        items = query.offset(offset).limit(min(limit, max_rows - offset)).all()
+    capped = query.limit(max_rows).subquery()
+    total = query.session.query(func.count()).select_from(capped).scalar()
+    return items, total
+
+
+def _consistent_total(estimate: int, items: list, *, limit: int, offset: int) -> int:
+    """Согласовать оценку с фактической страницей: неполная страница — точный конец."""
+    if len(items) < limit and (items or offset == 0):
+        return offset + len(items)
+    return max(estimate, offset + len(items))
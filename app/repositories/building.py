@@ -1,9 +1,22 @@
 """Репозиторий зданий."""
 
+from collections.abc import Iterator
+
+from sqlalchemy import Row, func, select
 from sqlalchemy.orm import Session
 
 from app.models.building import Building
 from app.repositories.base import paginate
+from app.schemas.building import BuildingOrder
+from app.utils.geo import mercator_cell_expr, rectangle_filter
+
+
+_ORDERINGS = {
+    "id": (Building.id,),
+    "organization_count": (Building.organization_count, Building.id),
+    # Обратный проход по индексу (organization_count, id)
+    "-organization_count": (Building.organization_count.desc(), Building.id.desc()),
+}
 
 
 class BuildingRepository:
@@ -13,11 +26,64 @@ class BuildingRepository:
         self.db = db
 
     def get_all(
-        self, *, limit: int, offset: int
+        self, *, limit: int, offset: int, order: BuildingOrder = "id"
     ) -> tuple[list[Building], int]:
-        """Все здания с пагинацией."""
-        return paginate(self.db.query(Building), limit=limit, offset=offset)
+        """Все здания с пагинацией в порядке order.
+
+        populate_existing: organization_count меняет триггер в БД, поэтому
+        уже загруженные в сессию объекты перечитываются.
+        """
+        query = (
+            self.db.query(Building)
+            .order_by(*_ORDERINGS[order])
+            .populate_existing()
+        )
+        return paginate(query, limit=limit, offset=offset)
 
     def get_by_id(self, building_id: int) -> Building | None:
         """Здание по ID или None."""
         return self.db.query(Building).filter(Building.id == building_id).first()
+
+    def iter_all(self, *, batch_size: int) -> Iterator[Building]:
+        """Все здания по ID, выборка порциями по batch_size."""
+        stmt = select(Building).order_by(Building.id).execution_options(yield_per=batch_size)
+        return iter(self.db.scalars(stmt))
+
+    def get_clusters(
+        self, lat_min: float, lat_max: float, lng_min: float, lng_max: float, *, cells: int
+    ) -> list[Row]:
+        """Здания прямоугольника по ячейкам сетки cells × cells (см. mercator_cell).
+
+        Строки: x, y, building_count, organization_count, latitude, longitude (центроид).
+        """
+        x, y = (expr.label(name) for expr, name in zip(mercator_cell_expr(cells), "xy"))
+        stmt = (
+            select(
+                x,
+                y,
+                func.count().label("building_count"),
+                func.sum(Building.organization_count).label("organization_count"),
+                func.avg(Building.latitude).label("latitude"),
+                func.avg(Building.longitude).label("longitude"),
+            )
+            .where(rectangle_filter(lat_min, lat_max, lng_min, lng_max))
+            .group_by(x, y)
+            .order_by(y, x)
+        )
+        return list(self.db.execute(stmt))
+
+    def get_points_in_rectangle(
+        self, lat_min: float, lat_max: float, lng_min: float, lng_max: float
+    ) -> list[Row]:
+        """Здания прямоугольника с числом организаций: id, latitude, longitude, organization_count."""
+        stmt = (
+            select(
+                Building.id,
+                Building.latitude,
+                Building.longitude,
+                Building.organization_count,
+            )
+            .where(rectangle_filter(lat_min, lat_max, lng_min, lng_max))
+            .order_by(Building.id)
+        )
+        return list(self.db.execute(stmt))
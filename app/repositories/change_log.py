@@ -0,0 +1,62 @@
+"""Репозиторий журнала изменений."""
+
+from sqlalchemy import BigInteger, ColumnElement, Text, cast, func, or_, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.change_log import ChangeLog
+
+
+def _as_bigint(xid8: ColumnElement) -> ColumnElement[int]:
+    """xid8 → bigint (прямого приведения в PostgreSQL нет)."""
+    return cast(cast(xid8, Text), BigInteger)
+
+
+class ChangeLogRepository:
+    """Чтение журнала изменений по ключу (txid, id)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_since(self, txid: int, change_id: int, *, limit: int) -> list[ChangeLog]:
+        """Записи после (txid, change_id) из завершённых транзакций, по возрастанию ключа.
+
+        Транзакции с txid >= xmin текущего снимка ещё могут дописать записи,
+        поэтому отдаются только txid < xmin: до этой границы набор уже не
+        изменится, и ключ продолжения не пропустит записей. Изменения
+        собственной транзакции видны.
+        """
+        xmin = _as_bigint(func.pg_snapshot_xmin(func.pg_current_snapshot()))
+        own = _as_bigint(func.pg_current_xact_id_if_assigned())
+        stmt = (
+            select(ChangeLog)
+            .where(tuple_(ChangeLog.txid, ChangeLog.id) > tuple_(txid, change_id))
+            .where(or_(ChangeLog.txid < xmin, ChangeLog.txid == own))
+            .order_by(ChangeLog.txid, ChangeLog.id)
+            .limit(limit)
+        )
+        return list(self.db.scalars(stmt))
+
+    def get_snapshot_xmin(self) -> int:
+        """xmin снимка текущей транзакции: все транзакции с меньшим txid ему видны."""
+        return self.db.scalar(
+            select(_as_bigint(func.pg_snapshot_xmin(func.pg_current_snapshot())))
+        )
+
+    def get_watermark(self) -> tuple[int, int]:
+        """(max txid завершённых записей, число записей «хвоста»): версия данных.
+
+        Граница — xmin снимка: записи с txid < xmin уже не изменятся, с txid >= xmin
+        ещё могут дописываться. Сам xmin в версию не входит — он сдвигается любой
+        пишущей транзакцией кластера. Версия меняется только с журналом: новый
+        коммит либо попадает в хвост (растёт число), либо хвост «оседает» и растёт
+        max txid — в том числе когда запись с меньшим id коммитится позже.
+        Оба значения считаются по индексу (txid, id).
+        """
+        xmin = _as_bigint(func.pg_snapshot_xmin(func.pg_current_snapshot()))
+        settled = select(func.coalesce(func.max(ChangeLog.txid), 0)).where(ChangeLog.txid < xmin)
+        unsettled = select(func.count()).select_from(ChangeLog).where(ChangeLog.txid >= xmin)
+        return tuple(
+            self.db.execute(
+                select(settled.scalar_subquery(), unsettled.scalar_subquery())
+            ).one()
+        )
@@ -0,0 +1,93 @@
+"""Репозиторий выгрузки: запросы таблиц справочника для экспорта."""
+
+from collections.abc import Iterator, Sequence
+from datetime import datetime
+
+from sqlalchemy import Row, Select, func, literal_column, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.orm import Session, aliased
+
+from app.models.activity import Activity
+from app.models.building import Building
+from app.models.organization import Organization, OrganizationPhone, organization_activities
+
+
+class ExportRepository:
+    """Выборки таблиц для выгрузки. Колонки — в порядке схем app.services.export."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def select_table(self, table: str, *, since: datetime | None = None) -> Select:
+        """Запрос таблицы по ID. since — только строки с created_at >= since.
+
+        У связей организация↔деятельность нет created_at: выгружаются связи
+        организаций, созданных после since.
+        """
+        return getattr(self, f"_select_{table}")(since)
+
+    def stream(self, stmt: Select, *, batch_size: int) -> Iterator[Sequence[Row]]:
+        """Строки запроса порциями через серверный курсор."""
+        result = self.db.execute(
+            stmt.execution_options(stream_results=True, yield_per=batch_size)
+        )
+        return result.partitions()
+
+    @staticmethod
+    def _select_buildings(since: datetime | None) -> Select:
+        stmt = select(
+            Building.id, Building.address, Building.latitude, Building.longitude,
+            Building.created_at,
+        ).order_by(Building.id)
+        return stmt if since is None else stmt.where(Building.created_at >= since)
+
+    @staticmethod
+    def _select_organizations(since: datetime | None) -> Select:
+        stmt = select(
+            Organization.id, Organization.name, Organization.building_id,
+            Organization.created_at,
+        ).order_by(Organization.id)
+        return stmt if since is None else stmt.where(Organization.created_at >= since)
+
+    @staticmethod
+    def _select_organization_phones(since: datetime | None) -> Select:
+        stmt = select(
+            OrganizationPhone.id, OrganizationPhone.organization_id,
+            OrganizationPhone.phone_number, OrganizationPhone.created_at,
+        ).order_by(OrganizationPhone.id)
+        return stmt if since is None else stmt.where(OrganizationPhone.created_at >= since)
+
+    @staticmethod
+    def _select_organization_activities(since: datetime | None) -> Select:
+        links = organization_activities.c
+        stmt = select(links.organization_id, links.activity_id).order_by(
+            links.organization_id, links.activity_id
+        )
+        if since is None:
+            return stmt
+        return stmt.join(Organization, Organization.id == links.organization_id).where(
+            Organization.created_at >= since
+        )
+
+    @staticmethod
+    def _select_activity_paths(since: datetime | None) -> Select:
+        """Вид деятельности с путём от корня. Глубина дерева <= 3 — два self-join."""
+        parent = aliased(Activity)
+        grandparent = aliased(Activity)
+        null = literal_column("NULL")
+        stmt = (
+            select(
+                Activity.id,
+                Activity.name,
+                Activity.level,
+                Activity.parent_id,
+                func.coalesce(grandparent.id, parent.id, Activity.id),
+                func.array_remove(array([grandparent.id, parent.id, Activity.id]), null),
+                func.array_remove(array([grandparent.name, parent.name, Activity.name]), null),
+                Activity.created_at,
+            )
+            .outerjoin(parent, parent.id == Activity.parent_id)
+            .outerjoin(grandparent, grandparent.id == parent.parent_id)
+            .order_by(Activity.id)
+        )
+        return stmt if since is None else stmt.where(Activity.created_at >= since)
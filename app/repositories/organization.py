@@ -1,19 +1,82 @@
 """Репозиторий организаций."""
 
-from sqlalchemy.orm import Session, joinedload
+import copy
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Self
 
+from sqlalchemy import BigInteger, Row, Text, cast, func, literal, select, true, union_all
+from sqlalchemy.orm import Query, Session, joinedload, load_only, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+
+from app.models.activity import Activity
 from app.models.building import Building
-from app.models.organization import Organization, organization_activities
-from app.repositories.base import paginate
-from app.utils.geo import bbox_filter, haversine_distance
+from app.models.organization import Organization
+from app.models.organization_document import OrganizationDocument
+from app.repositories.base import CountMode, paginate
+from app.utils.geo import bbox_filter, haversine_distance, rectangle_filter
+
+
+@dataclass(frozen=True)
+class OrganizationFilters:
+    """Набор фильтров комбинированного поиска. None — фильтр не задан.
+
+    activity_ids — корни поддеревьев деятельности: подходит организация из любого.
+    """
+
+    name: str | None = None
+    activity_ids: tuple[int, ...] | None = None
+    building_id: int | None = None
+    point: tuple[float, float] | None = None
+    radius: float | None = None
+    rectangle: tuple[float, float, float, float] | None = None
+
+    @property
+    def needs_building(self) -> bool:
+        return self.point is not None or self.rectangle is not None
+
+
+# Связи, которые можно встроить в элементы списка (expand)
+_EXPANDABLE = {
+    "building": Organization.building,
+    "phones": Organization.phones,
+    "activities": Organization.activities,
+}
 
 
 class OrganizationRepository:
     """Доступ к данным организаций."""
 
+    # Опции загрузки списков организаций (with_projection)
+    options: tuple[ORMOption, ...] = ()
+
     def __init__(self, db: Session):
         self.db = db
 
+    def with_projection(self, columns: Iterable[str], expand: Iterable[str]) -> Self:
+        """Копия репозитория, загружающая в списках только нужное.
+
+        В SELECT попадают id и колонки columns (имена, не являющиеся колонками,
+        пропускаются), связи expand догружаются отдельным пакетным запросом
+        на страницу (selectinload). Обращение к незагруженной колонке — ошибка.
+        """
+        expand = sorted(expand)
+        names = {"id", *columns}
+        if "building" in expand:
+            names.add("building_id")  # ключ для загрузки зданий
+        table_columns = Organization.__table__.c
+        attributes = [getattr(Organization, name) for name in sorted(names) if name in table_columns]
+        repo = copy.copy(self)
+        repo.options = (
+            load_only(*attributes, raiseload=True),
+            *(selectinload(_EXPANDABLE[name]) for name in expand),
+        )
+        return repo
+
+    def _query(self) -> Query:
+        """Запрос организаций с опциями загрузки репозитория."""
+        return self.db.query(Organization).options(*self.options)
+
     def get_by_id(self, org_id: int) -> Organization | None:
         """Организация со всеми связями (здание, телефоны, активности)."""
         return (
@@ -27,11 +90,101 @@ class OrganizationRepository:
             .first()
         )
 
+    def get_document(self, org_id: int) -> str | None:
+        """Готовый JSON организации из organization_documents или None."""
+        return self.db.scalar(
+            select(OrganizationDocument.document).where(
+                OrganizationDocument.organization_id == org_id
+            )
+        )
+
+    def iter_documents(self, *, batch_size: int) -> Iterator[str]:
+        """Готовые JSON всех организаций по ID, выборка порциями по batch_size."""
+        stmt = (
+            select(OrganizationDocument.document)
+            .order_by(OrganizationDocument.organization_id)
+            .execution_options(yield_per=batch_size)
+        )
+        return iter(self.db.scalars(stmt))
+
+    def get_by_ids(self, org_ids: list[int]) -> list[Organization]:
+        """Организации по списку ID в порядке списка. Отсутствующие пропускаются."""
+        if not org_ids:
+            return []
+        by_id = {
+            org.id: org
+            for org in self._query().filter(Organization.id.in_(org_ids))
+        }
+        return [by_id[org_id] for org_id in org_ids if org_id in by_id]
+
+    def get_signature(self, *, after_id: int = 0) -> tuple[int, int, int]:
+        """(число, max ID, контрольная сумма ID и названий) организаций с ID больше after_id.
+
+        Сигнатура для индексов названий: переименование меняет контрольную сумму.
+        """
+        checksum = func.hashtext(func.concat(Organization.id, ":", Organization.name))
+        count, max_id, total = self.db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.max(Organization.id), 0),
+                func.coalesce(func.sum(cast(checksum, BigInteger)), 0),
+            )
+            .select_from(Organization)
+            .where(Organization.id > after_id)
+        ).one()
+        return count, max_id, int(total)
+
+    def only_appended(self, old: tuple[int, int, int], new: tuple[int, int, int]) -> bool:
+        """Сигнатуры get_signature различаются только организациями с ID больше прежнего max."""
+        count, _, checksum = self.get_signature(after_id=old[1])
+        return (old[0] + count, old[2] + checksum) == (new[0], new[2])
+
+    def get_names(self, *, after_id: int = 0) -> list[tuple[int, str]]:
+        """Пары (ID, название) организаций с ID больше after_id, по возрастанию ID."""
+        return list(
+            self.db.execute(
+                select(Organization.id, Organization.name)
+                .where(Organization.id > after_id)
+                .order_by(Organization.id)
+            ).tuples()
+        )
+
+    def get_membership_signature(self) -> tuple[int, int, int]:
+        """(число, max ID, контрольная сумма ID, здания и поддеревьев деятельности) организаций.
+
+        ID входит в хэш: обмен зданиями или видами деятельности между организациями
+        меняет сумму.
+        """
+        checksum = func.hashtext(
+            func.concat(
+                Organization.id, ":", Organization.building_id, ":",
+                cast(Organization.ancestor_activity_ids, Text),
+            )
+        )
+        count, max_id, total = self.db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.max(Organization.id), 0),
+                func.coalesce(func.sum(cast(checksum, BigInteger)), 0),
+            ).select_from(Organization)
+        ).one()
+        return count, max_id, int(total)
+
+    def get_memberships(self) -> list[tuple[int, int, list[int]]]:
+        """Тройки (ID, здание, виды деятельности с предками) всех организаций."""
+        return list(
+            self.db.execute(
+                select(
+                    Organization.id, Organization.building_id, Organization.ancestor_activity_ids
+                )
+            ).tuples()
+        )
+
     def get_by_building_id(
         self, building_id: int, *, limit: int, offset: int
     ) -> tuple[list[Organization], int]:
         """Организации в указанном здании."""
-        query = self.db.query(Organization).filter(
+        query = self._query().filter(
             Organization.building_id == building_id
         )
         return paginate(query, limit=limit, offset=offset)
@@ -39,61 +192,201 @@ class OrganizationRepository:
     def get_by_activity_id(
         self, activity_id: int, *, limit: int, offset: int
     ) -> tuple[list[Organization], int]:
-        """Организации с конкретной активностью (без учёта дочерних)."""
-        query = (
-            self.db.query(Organization)
-            .join(organization_activities)
-            .filter(organization_activities.c.activity_id == activity_id)
+        """Организации с конкретной активностью (без учёта дочерних). GIN по activity_ids."""
+        query = self._query().filter(
+            Organization.activity_ids.contains([activity_id])
         )
         return paginate(query, limit=limit, offset=offset)
 
     def get_by_activity_ids(
         self, activity_ids: list[int], *, limit: int, offset: int
     ) -> tuple[list[Organization], int]:
-        """Организации по списку ID активностей. Дубли исключены через DISTINCT."""
-        query = (
-            self.db.query(Organization)
-            .join(organization_activities)
-            .filter(organization_activities.c.activity_id.in_(activity_ids))
-            .distinct()
+        """Организации, связанные хотя бы с одной из активностей (activity_ids && ...)."""
+        query = self._query().filter(
+            Organization.activity_ids.overlap(activity_ids)
         )
         return paginate(query, limit=limit, offset=offset)
 
+    def get_by_activity_subtrees(
+        self, activity_ids: list[int], *, match_all: bool, limit: int, offset: int
+    ) -> tuple[list[Organization], int]:
+        """Организации по поддеревьям активностей — одна проба GIN по ancestor_activity_ids.
+
+        match_all=False — хотя бы в одном поддереве (&&), True — во всех (@>).
+        """
+        ancestors = Organization.ancestor_activity_ids
+        condition = (
+            ancestors.contains(activity_ids) if match_all else ancestors.overlap(activity_ids)
+        )
+        query = self._query().filter(condition).order_by(Organization.id)
+        return paginate(query, limit=limit, offset=offset)
+
     def search_by_name(
-        self, query_str: str, *, limit: int, offset: int
+        self, query_str: str, *, limit: int, offset: int,
+        count_mode: CountMode = CountMode.EXACT, max_rows: int | None = None,
     ) -> tuple[list[Organization], int]:
         """Поиск по частичному совпадению имени (ILIKE)."""
-        query = self.db.query(Organization).filter(
+        query = self._query().filter(
             Organization.name.ilike(f"%{query_str}%")
         )
-        return paginate(query, limit=limit, offset=offset)
+        return paginate(
+            query, limit=limit, offset=offset, count_mode=count_mode, max_rows=max_rows
+        )
 
     def search_in_radius(
         self, lat: float, lng: float, radius_meters: float,
         *, limit: int, offset: int,
+        count_mode: CountMode = CountMode.EXACT, max_rows: int | None = None,
     ) -> tuple[list[Organization], int]:
         """Поиск в радиусе: bbox-префильтр (по индексу) + точный Haversine."""
         query = (
-            self.db.query(Organization)
+            self._query()
             .join(Building)
             .filter(bbox_filter(lat, lng, radius_meters))
             .filter(haversine_distance(lat, lng) <= radius_meters)
         )
-        return paginate(query, limit=limit, offset=offset)
+        return paginate(
+            query, limit=limit, offset=offset, count_mode=count_mode, max_rows=max_rows
+        )
 
     def search_in_rectangle(
         self,
         lat_min: float, lat_max: float,
         lng_min: float, lng_max: float,
         *, limit: int, offset: int,
+        count_mode: CountMode = CountMode.EXACT, max_rows: int | None = None,
     ) -> tuple[list[Organization], int]:
         """Поиск в прямоугольной области по координатам."""
         query = (
-            self.db.query(Organization)
+            self._query()
             .join(Building)
-            .filter(
-                Building.latitude.between(lat_min, lat_max),
-                Building.longitude.between(lng_min, lng_max),
+            .filter(rectangle_filter(lat_min, lat_max, lng_min, lng_max))
+        )
+        return paginate(
+            query, limit=limit, offset=offset, count_mode=count_mode, max_rows=max_rows
+        )
+
+    def search(
+        self,
+        filters: OrganizationFilters,
+        *, limit: int, offset: int,
+        order_by_distance: bool = False,
+        count_mode: CountMode = CountMode.EXACT, max_rows: int | None = None,
+    ) -> tuple[list[tuple[Organization, float | None]], int]:
+        """Комбинированный поиск одним SQL-запросом. Элементы — (организация, дистанция).
+
+        Дистанция (метры) считается, только если задана точка.
+        """
+        query = self.filtered_query(filters).options(*self.options)
+        if filters.point is not None:
+            distance = haversine_distance(*filters.point).label("distance")
+            query = query.add_columns(distance)
+            if order_by_distance:
+                query = query.order_by(distance)
+        query = query.order_by(Organization.id)
+
+        rows, total = paginate(
+            query, limit=limit, offset=offset, count_mode=count_mode, max_rows=max_rows
+        )
+        if filters.point is None:
+            return [(org, None) for org in rows], total
+        return [(row[0], row[1]) for row in rows], total
+
+    def facet_counts(
+        self,
+        filters: OrganizationFilters,
+        *, kinds: frozenset[str], size: int,
+        order_by_distance: bool = False, max_rows: int | None = None,
+    ) -> list[Row]:
+        """Счётчики фасетов одним запросом: строки (facet, id, name, count).
+
+        Отфильтрованный набор вычисляется один раз (CTE). Счётчик активности
+        включает организации всех её потомков — разворачивается
+        ancestor_activity_ids. В каждом фасете не более size групп с
+        наибольшим count. При max_rows кандидаты отбираются в порядке search().
+        """
+        matched = self.filtered_query(filters).with_entities(
+            Organization.id.label("organization_id"),
+            Organization.building_id.label("building_id"),
+            Organization.ancestor_activity_ids.label("ancestor_activity_ids"),
+        )
+        if max_rows is not None:
+            if order_by_distance and filters.point is not None:
+                matched = matched.order_by(haversine_distance(*filters.point))
+            matched = matched.order_by(Organization.id).limit(max_rows)
+        matched = matched.cte("matched")
+
+        branches = []
+        if "activity" in kinds:
+            ancestor = (
+                func.unnest(matched.c.ancestor_activity_ids)
+                .table_valued("activity_id")
+                .render_derived(name="ancestor")
+                .lateral()
             )
+            branches.append(
+                select(
+                    literal("activity").label("facet"),
+                    Activity.id.label("id"),
+                    Activity.name.label("name"),
+                    func.count().label("count"),
+                )
+                .select_from(matched)
+                .join(ancestor, true())
+                .join(Activity, Activity.id == ancestor.c.activity_id)
+                .group_by(Activity.id, Activity.name)
+            )
+        if "building" in kinds:
+            branches.append(
+                select(
+                    literal("building").label("facet"),
+                    Building.id.label("id"),
+                    Building.address.label("name"),
+                    func.count().label("count"),
+                )
+                .select_from(matched)
+                .join(Building, Building.id == matched.c.building_id)
+                .group_by(Building.id, Building.address)
+            )
+        if not branches:
+            return []
+
+        grouped = union_all(*branches).subquery("grouped")
+        ranked = select(
+            grouped,
+            func.row_number()
+            .over(
+                partition_by=grouped.c.facet,
+                order_by=(grouped.c.count.desc(), grouped.c.id),
+            )
+            .label("rank"),
+        ).subquery("ranked")
+        stmt = (
+            select(ranked.c.facet, ranked.c.id, ranked.c.name, ranked.c.count)
+            .where(ranked.c.rank <= size)
+            .order_by(ranked.c.facet, ranked.c.rank)
         )
-        return paginate(query, limit=limit, offset=offset)
+        return list(self.db.execute(stmt).all())
+
+    def filtered_query(self, filters: OrganizationFilters) -> Query:
+        """Запрос организаций с применёнными фильтрами (без сортировки и пагинации)."""
+        query = self.db.query(Organization)
+        if filters.needs_building:
+            query = query.join(Building)
+        if filters.name is not None:
+            query = query.filter(Organization.name.ilike(f"%{filters.name}%"))
+        if filters.activity_ids is not None:
+            query = query.filter(
+                Organization.ancestor_activity_ids.overlap(list(filters.activity_ids))
+            )
+        if filters.building_id is not None:
+            query = query.filter(Organization.building_id == filters.building_id)
+        if filters.radius is not None and filters.point is not None:
+            lat, lng = filters.point
+            query = query.filter(
+                bbox_filter(lat, lng, filters.radius),
+                haversine_distance(lat, lng) <= filters.radius,
+            )
+        if filters.rectangle is not None:
+            query = query.filter(rectangle_filter(*filters.rectangle))
+        return query
@@ -0,0 +1,62 @@
+"""Репозиторий организаций с фильтрами по зданию и деятельности через битмап-индекс."""
+
+from app.indexes.bitmap import FrozenBitMap, bitmap_index
+from app.models.organization import Organization
+from app.repositories.base import CountMode
+from app.repositories.organization import OrganizationFilters, OrganizationRepository
+
+
+class BitmapOrganizationRepository(OrganizationRepository):
+    """OrganizationRepository, отвечающий на фильтры принадлежности из bitmap_index.
+
+    Здание, поддеревья деятельности и их сочетания считаются AND/OR над
+    битмапами; count — мощность результата. БД запрашивается только за
+    страницей (порядок по ID). Остальные фильтры — как у базового класса.
+    """
+
+    def get_by_building_id(
+        self, building_id: int, *, limit: int, offset: int
+    ) -> tuple[list[Organization], int]:
+        """Организации в здании из битмапа здания."""
+        bitmap_index.ensure_fresh(self.db)
+        return self._page(bitmap_index.select(building_id=building_id), limit, offset)
+
+    def get_by_activity_subtrees(
+        self, activity_ids: list[int], *, match_all: bool, limit: int, offset: int
+    ) -> tuple[list[Organization], int]:
+        """Объединение (any) или пересечение (all) битмапов поддеревьев."""
+        bitmap_index.ensure_fresh(self.db)
+        ids = bitmap_index.select(activity_ids=activity_ids, match_all=match_all)
+        return self._page(ids, limit, offset)
+
+    def search(
+        self,
+        filters: OrganizationFilters,
+        *, limit: int, offset: int,
+        order_by_distance: bool = False,
+        count_mode: CountMode = CountMode.EXACT, max_rows: int | None = None,
+    ) -> tuple[list[tuple[Organization, float | None]], int]:
+        """Комбинированный поиск только по зданию и деятельности — из битмапов."""
+        if (
+            filters.name is not None
+            or filters.point is not None
+            or filters.rectangle is not None
+        ):
+            return super().search(
+                filters, limit=limit, offset=offset, order_by_distance=order_by_distance,
+                count_mode=count_mode, max_rows=max_rows,
+            )
+        bitmap_index.ensure_fresh(self.db)
+        ids = bitmap_index.select(
+            activity_ids=(
+                list(filters.activity_ids) if filters.activity_ids is not None else None
+            ),
+            building_id=filters.building_id,
+        )
+        items, total = self._page(ids, limit, offset)
+        return [(org, None) for org in items], total
+
+    def _page(
+        self, ids: FrozenBitMap, limit: int, offset: int
+    ) -> tuple[list[Organization], int]:
+        return self.get_by_ids(list(ids[offset : offset + limit])), len(ids)
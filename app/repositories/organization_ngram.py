@@ -0,0 +1,24 @@
+"""Репозиторий организаций с поиском по имени через n-граммный индекс в памяти."""
+
+from app.indexes.ngram import ngram_index
+from app.models.organization import Organization
+from app.repositories.base import CountMode
+from app.repositories.organization import OrganizationRepository
+
+
+class NgramOrganizationRepository(OrganizationRepository):
+    """OrganizationRepository, отвечающий на search_by_name из ngram_index.
+
+    Общее количество точное и бесплатное (длина списка совпадений), поэтому
+    count_mode и max_rows игнорируются. БД запрашивается только за страницей.
+    Порядок результатов — по ID.
+    """
+
+    def search_by_name(
+        self, query_str: str, *, limit: int, offset: int,
+        count_mode: CountMode = CountMode.EXACT, max_rows: int | None = None,
+    ) -> tuple[list[Organization], int]:
+        """Поиск подстроки в названии по индексу; страница загружается из БД по ID."""
+        ngram_index.ensure_fresh(self.db)
+        ids = ngram_index.search(query_str)
+        return self.get_by_ids(ids[offset : offset + limit]), len(ids)
@@ -16,6 +16,12 @@ class ActivityRead(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ActivityWithPath(ActivityRead):
+    """Активность с путём от корня до неё самой включительно (хлебные крошки)."""
+
+    path: list[ActivityRead]
+
+
 class ActivityTree(BaseModel):
     """Активность — древовидное представление с вложенными children."""
 
@@ -0,0 +1,35 @@
+"""Pydantic-схемы пакетного запроса: несколько GET-подзапросов в одном."""
+
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+
+class BatchRequestItem(BaseModel):
+    """GET-подзапрос к API. id — метка клиента для сопоставления ответов."""
+
+    id: str | None = Field(default=None, max_length=100, examples=["tree"])
+    method: Literal["GET"] = "GET"
+    url: str = Field(
+        pattern=r"^/api/v1/", max_length=2048, examples=["/api/v1/activities/"]
+    )
+
+
+class BatchRequest(BaseModel):
+    """Подзапросы пакета. Выполняются параллельно, ответы — в том же порядке."""
+
+    requests: list[BatchRequestItem] = Field(min_length=1)
+
+
+class BatchResult(BaseModel):
+    """Ответ на подзапрос: HTTP-статус и JSON-тело, как при отдельном вызове."""
+
+    id: str | None = Field(default=None, examples=["tree"])
+    status: int = Field(examples=[200])
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    """Ответы на подзапросы в порядке запроса."""
+
+    responses: list[BatchResult]
@@ -1,7 +1,12 @@
 """Pydantic-схемы зданий."""
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+# Порядок списка зданий: по ID или по числу организаций (с «-» — по убыванию).
+BuildingOrder = Literal["id", "organization_count", "-organization_count"]
+
 
 class BuildingRead(BaseModel):
     """Здание — ответ API."""
@@ -12,3 +17,25 @@ class BuildingRead(BaseModel):
     longitude: float = Field(examples=[37.6173])
 
     model_config = {"from_attributes": True}
+
+
+class BuildingWithCount(BuildingRead):
+    """Здание с числом организаций (счётчик поддерживается триггером)."""
+
+    organization_count: int | None = Field(default=None, examples=[2])
+
+
+class BuildingCluster(BaseModel):
+    """Ячейка сетки кластеров: центроид зданий и число зданий и организаций в ней.
+
+    x, y — номер ячейки в сетке масштаба (Web Mercator, y растёт к югу).
+    """
+
+    x: int = Field(examples=[1238])
+    y: int = Field(examples=[640])
+    latitude: float = Field(examples=[55.7558])
+    longitude: float = Field(examples=[37.6173])
+    building_count: int = Field(examples=[12])
+    organization_count: int = Field(examples=[40])
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,25 @@
+"""Pydantic-схемы ленты изменений."""
+
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class ChangeRead(BaseModel):
+    """Изменение сущности. Для deleted сущность больше не существует."""
+
+    entity: Literal["organization", "building", "activity"] = Field(examples=["organization"])
+    id: int = Field(validation_alias="entity_id", examples=[1])
+    operation: Literal["created", "updated", "deleted"] = Field(examples=["updated"])
+    changed_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ChangeFeed(BaseModel):
+    """Страница ленты изменений. next_since передаётся в since следующего запроса."""
+
+    changes: list[ChangeRead]
+    next_since: str = Field(examples=["1042.58113"])
+    has_more: bool = Field(examples=[False])
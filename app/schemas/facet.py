@@ -0,0 +1,41 @@
+"""Pydantic-схемы фасетов поиска: счётчики результатов по группам."""
+
+from typing import Generic, Literal, TypeVar
+
+from pydantic import BaseModel, Field
+
+from app.schemas.pagination import PaginatedResponse
+
+T = TypeVar("T")
+
+FacetKind = Literal["activity", "building"]
+
+
+class FacetRequest(BaseModel):
+    """Запрошенные фасеты и максимальное число групп в каждом."""
+
+    kinds: frozenset[FacetKind]
+    size: int
+
+    model_config = {"frozen": True}
+
+
+class FacetBucket(BaseModel):
+    """Группа фасета: вид деятельности или здание и число организаций в ней."""
+
+    id: int = Field(examples=[1])
+    name: str = Field(examples=["Еда"])
+    count: int = Field(examples=[3])
+
+
+class SearchFacets(BaseModel):
+    """Фасеты по запрошенным группировкам, по убыванию count."""
+
+    activity: list[FacetBucket] | None = None
+    building: list[FacetBucket] | None = None
+
+
+class FacetedPaginatedResponse(PaginatedResponse[T], Generic[T]):
+    """Пагинированный ответ с фасетами. facets присутствует, только если запрошен."""
+
+    facets: SearchFacets | None = None
@@ -1,5 +1,7 @@
 """Pydantic-схемы организаций."""
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 from app.schemas.activity import ActivityRead
@@ -59,3 +61,67 @@ class OrganizationList(BaseModel):
     building_id: int = Field(examples=[1])
 
     model_config = {"from_attributes": True}
+
+
+class OrganizationSearchResult(OrganizationList):
+    """Результат комбинированного поиска. distance — метры до точки поиска, если она задана."""
+
+    distance: float | None = Field(default=None, examples=[412.7])
+
+
+OrganizationExpand = Literal["building", "phones", "activities"]
+
+
+class OrganizationProjection(BaseModel):
+    """Запрошенные поля (fields) и встраиваемые связи (expand) элементов списка.
+
+    flat — элементы отдаются плоскими строками без Pydantic (бинарные форматы).
+    """
+
+    fields: frozenset[str]
+    expand: frozenset[OrganizationExpand] = frozenset()
+    flat: bool = False
+
+    model_config = {"frozen": True}
+
+
+class OrganizationItem(BaseModel):
+    """Организация в списке: только запрошенные поля и связи, id — всегда.
+
+    Незаданные поля в ответ не выводятся (response_model_exclude_unset).
+    """
+
+    id: int = Field(examples=[1])
+    name: str | None = Field(default=None, examples=['ООО "Рога и Копыта"'])
+    building_id: int | None = Field(default=None, examples=[1])
+    building: BuildingRead | None = None
+    phones: list[PhoneRead] | None = None
+    activities: list[ActivityRead] | None = None
+
+
+class OrganizationSearchItem(OrganizationItem):
+    """Элемент комбинированного поиска с выбранными полями."""
+
+    distance: float | None = Field(default=None, examples=[412.7])
+
+
+class OrganizationSuggestion(BaseModel):
+    """Подсказка автодополнения: организация, название которой совпало по префиксу."""
+
+    id: int = Field(examples=[2])
+    name: str = Field(examples=['ООО "Молочный мир"'])
+
+
+class OrganizationSearchParams(BaseModel):
+    """Провалидированные фильтры комбинированного поиска. None — фильтр не задан."""
+
+    q: str | None = None
+    activity_id: int | None = None
+    building_id: int | None = None
+    lat: float | None = None
+    lng: float | None = None
+    radius: float | None = None
+    rectangle: tuple[float, float, float, float] | None = None
+    order: Literal["id", "distance"] = "id"
+
+    model_config = {"frozen": True}
@@ -0,0 +1,22 @@
+"""Pydantic-схемы снимков справочника."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class SnapshotManifest(BaseModel):
+    """Описание последнего снимка: версия, размер, контрольная сумма и курсор ленты."""
+
+    version: str = Field(examples=["20261019140000123456"])
+    generated_at: datetime
+    url: str = Field(examples=["/api/v1/snapshots/20261019140000123456"])
+    size: int = Field(description="Размер сжатого файла в байтах", examples=[48213])
+    sha256: str = Field(description="SHA-256 сжатого файла")
+    since: str = Field(
+        description="Курсор /organizations/changes: изменения после снимка",
+        examples=["1042.0"],
+    )
+    buildings: int = Field(examples=[3])
+    activities: int = Field(examples=[7])
+    organizations: int = Field(examples=[4])
@@ -1,47 +1,83 @@
 """Сервис видов деятельности."""
 
+from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.models.activity import Activity
+from app.config import settings
+from app.indexes.activity import ActivityIndex
 from app.repositories.activity import ActivityRepository
-from app.schemas.activity import ActivityTree
+from app.schemas.activity import ActivityRead, ActivityTree, ActivityWithPath
+from app.utils.cache import SWRCache
+from app.utils.singleflight import coalesce
+
+# Дерево, поддеревья, пути и поиск по названию отвечают из одной записи кэша
+_index_cache: SWRCache[ActivityIndex] = SWRCache(
+    "activity_tree",
+    ttl=settings.activity_tree_cache_ttl,
+    max_stale=settings.activity_tree_cache_max_stale,
+)
 
 
 class ActivityService:
     """Бизнес-логика видов деятельности."""
 
     def __init__(self, db: Session):
+        self.db = db
         self.repo = ActivityRepository(db)
 
+    @coalesce("activities.build_index")
+    def build_index(self) -> ActivityIndex:
+        """Индекс дерева по всем активностям из БД."""
+        return ActivityIndex(self.repo.get_all())
+
     def get_tree(self) -> list[ActivityTree]:
-        """Дерево активностей — корневые узлы с вложенными children."""
-        all_activities = self.repo.get_all()
-        return self._build_tree(all_activities)
+        """Дерево активностей — корневые узлы с вложенными children. Без кэша."""
+        return self.build_index().tree()
+
+    def get_index_cached(self) -> tuple[ActivityIndex, float, str | None]:
+        """Индекс из SWR-кэша. Возвращает (индекс, возраст_в_секундах, ETag)."""
+        return _index_cache.get(
+            "index", lambda db: ActivityService(db).build_index(), self.repo.db
+        )
+
+    def get_tree_cached(self) -> tuple[list[ActivityTree], float, str | None]:
+        """Дерево из SWR-кэша. Возвращает (дерево, возраст_в_секундах, ETag)."""
+        index, age, etag = self.get_index_cached()
+        return index.tree(), age, etag
+
+    def get_subtree_cached(self, activity_id: int) -> tuple[ActivityTree, float, str | None]:
+        """Поддерево активности из кэшированного индекса. Поднимает 404."""
+        index, age, etag = self.get_index_cached()
+        node = index.subtree(activity_id)
+        if node is None:
+            raise _not_found(activity_id)
+        return node, age, etag
+
+    def get_path_cached(self, activity_id: int) -> tuple[list[ActivityRead], float, str | None]:
+        """Путь от корня до активности из кэшированного индекса. Поднимает 404."""
+        index, age, etag = self.get_index_cached()
+        path = index.path(activity_id)
+        if path is None:
+            raise _not_found(activity_id)
+        return path, age, etag
+
+    def lookup_cached(
+        self, name: str, *, limit: int
+    ) -> tuple[list[ActivityWithPath], float, str | None]:
+        """Активности с названием name (нормализованным) и их пути из кэшированного индекса."""
+        index, age, etag = self.get_index_cached()
+        return index.lookup(name, limit=limit), age, etag
 
     def get_descendant_ids(
         self, activity_id: int, *, include_self: bool = True
     ) -> list[int]:
         """ID активности и всех её потомков."""
-        return self.repo.get_descendant_ids(activity_id, include_self=include_self)
-
-    def _build_tree(self, activities: list[Activity]) -> list[ActivityTree]:
-        """Собрать плоский список в дерево через словарь id→node."""
-        activity_map: dict[int, ActivityTree] = {}
-        roots: list[ActivityTree] = []
-
-        for act in activities:
-            activity_map[act.id] = ActivityTree(
-                id=act.id,
-                name=act.name,
-                level=act.level,
-                children=[],
-            )
-
-        for act in activities:
-            node = activity_map[act.id]
-            if act.parent_id is None:
-                roots.append(node)
-            elif act.parent_id in activity_map:
-                activity_map[act.parent_id].children.append(node)
-
-        return roots
+        index, _, _ = self.get_index_cached()
+        return index.descendant_ids(activity_id, include_self=include_self)
+
+
+def _not_found(activity_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Activity with id {activity_id} not found",
+    )
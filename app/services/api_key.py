@@ -0,0 +1,106 @@
+"""Сервис API-ключей: проверка с кэшем в памяти, выпуск и отзыв ключей."""
+
+import hashlib
+import hmac
+import secrets
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.api_key import ApiKey
+from app.repositories.api_key import ApiKeyRepository
+from app.utils.cache import TTLCache
+from app.utils.metrics import metrics
+
+KEY_PREFIX = "dk_"
+
+
+@dataclass(frozen=True)
+class ApiPrincipal:
+    """Аутентифицированный клиент. key_id None — статический ключ из настроек."""
+
+    key_id: int | None
+    name: str
+    scopes: frozenset[str]
+
+    def has_scope(self, scope: str) -> bool:
+        return "*" in self.scopes or scope in self.scopes
+
+
+STATIC_PRINCIPAL = ApiPrincipal(key_id=None, name="static", scopes=frozenset({"*"}))
+
+# key_hash → ApiPrincipal активного ключа
+_principal_cache: TTLCache[ApiPrincipal] = TTLCache(
+    "api_keys", ttl=settings.api_key_cache_ttl, maxsize=settings.api_key_cache_size
+)
+# key_hash неизвестных и отозванных ключей. Отдельный кэш: перебор случайных
+# ключей не вытесняет действующие.
+_unknown_key_cache: TTLCache[bool] = TTLCache(
+    "api_keys_unknown",
+    ttl=settings.api_key_negative_cache_ttl,
+    maxsize=settings.api_key_negative_cache_size,
+)
+
+
+def hash_api_key(raw_key: str) -> str:
+    """HMAC-SHA256 ключа с pepper из настроек. В БД хранится только он."""
+    return hmac.new(
+        settings.api_key_pepper.encode(), raw_key.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+class ApiKeyService:
+    """Бизнес-логика API-ключей."""
+
+    def __init__(self, db: Session):
+        self.repo = ApiKeyRepository(db)
+
+    def authenticate(self, raw_key: str) -> ApiPrincipal | None:
+        """Клиент по ключу или None. БД опрашивается только при промахе кэша."""
+        if settings.api_key and hmac.compare_digest(
+            raw_key.encode(), settings.api_key.encode()
+        ):
+            return STATIC_PRINCIPAL
+
+        key_hash = hash_api_key(raw_key)
+        found, principal = _principal_cache.get(key_hash)
+        if found:
+            metrics.inc("api_key_cache_total", result="hit")
+            return principal
+        if _unknown_key_cache.get(key_hash)[0]:
+            metrics.inc("api_key_cache_total", result="hit")
+            return None
+
+        metrics.inc("api_key_cache_total", result="miss")
+        api_key = self.repo.get_active_by_hash(key_hash)
+        if api_key is not None and hmac.compare_digest(api_key.key_hash, key_hash):
+            principal = ApiPrincipal(
+                key_id=api_key.id, name=api_key.name, scopes=frozenset(api_key.scopes)
+            )
+            _principal_cache.set(key_hash, principal)
+        else:
+            principal = None
+            _unknown_key_cache.set(key_hash, True)
+        return principal
+
+    def issue(self, name: str, scopes: list[str]) -> tuple[ApiKey, str]:
+        """Выпустить ключ. Возвращает (запись, ключ в открытом виде — показывается один раз)."""
+        raw_key = KEY_PREFIX + secrets.token_urlsafe(32)
+        api_key = self.repo.create(name=name, key_hash=hash_api_key(raw_key), scopes=scopes)
+        self.repo.db.commit()
+        return api_key, raw_key
+
+    def revoke(self, key_id: int) -> bool:
+        """Отозвать ключ. В других процессах вступает в силу через api_key_cache_ttl."""
+        api_key = self.repo.get_by_id(key_id)
+        if api_key is None:
+            return False
+        self.repo.revoke(api_key)
+        self.repo.db.commit()
+        _principal_cache.discard(api_key.key_hash)
+        return True
+
+    def get_all(self) -> list[ApiKey]:
+        """Все ключи."""
+        return self.repo.get_all()
@@ -0,0 +1,141 @@
+"""Пакетные запросы: GET-подзапросы выполняются внутри процесса через ASGI-приложение.
+
+Подзапрос проходит тот же путь, что и отдельный запрос (маршрут, зависимости,
+rate limit, бюджет времени, обработчики ошибок), но без HTTP round trip и без
+повторной проверки ключа — клиент передаётся в request.state. Каждый подзапрос
+берёт свою сессию БД из пула; одновременно выполняется не более
+settings.batch_concurrency подзапросов на процесс.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+from urllib.parse import urlsplit
+
+from starlette.types import ASGIApp, Message, Scope
+
+from app.config import settings
+from app.schemas.batch import BatchRequestItem
+from app.services.api_key import ApiPrincipal
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = "/api/v1/batch"
+
+# Заголовки пакета, которые не передаются подзапросам: у них нет тела, ответ — JSON без сжатия
+_DROPPED_HEADERS = {
+    b"accept",
+    b"accept-encoding",
+    b"content-length",
+    b"content-type",
+    b"transfer-encoding",
+}
+
+_limiters: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limiter() -> asyncio.Semaphore:
+    """Общий лимит подзапросов процесса (семафор привязан к своему event loop)."""
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = _limiters[loop] = asyncio.Semaphore(settings.batch_concurrency)
+    return limiter
+
+
+def _detail(message: str) -> bytes:
+    return json.dumps({"detail": message}, ensure_ascii=False).encode()
+
+
+class BatchService:
+    """Выполнение пакета GET-подзапросов от имени уже проверенного клиента."""
+
+    def __init__(self, app: ASGIApp, scope: Scope, principal: ApiPrincipal):
+        self.app = app
+        self.scope = scope
+        self.principal = principal
+
+    async def run(self, items: list[BatchRequestItem]) -> bytes:
+        """JSON пакета (форма BatchResponse). Тела подзапросов вставляются как есть."""
+        results = await asyncio.gather(*(self._run_limited(item) for item in items))
+        parts = [
+            b'{"id":%s,"status":%d,"body":%s}'
+            % (json.dumps(item.id, ensure_ascii=False).encode(), status, body)
+            for item, (status, body) in zip(items, results, strict=True)
+        ]
+        return b'{"responses":[' + b",".join(parts) + b"]}"
+
+    async def _run_limited(self, item: BatchRequestItem) -> tuple[int, bytes]:
+        async with _limiter():
+            status, body = await self.dispatch(item)
+        metrics.inc("batch_subrequests_total", status=str(status))
+        return status, body
+
+    async def dispatch(self, item: BatchRequestItem) -> tuple[int, bytes]:
+        """(HTTP-статус, JSON-тело) подзапроса."""
+        url = urlsplit(item.url)
+        if url.path.rstrip("/") == BATCH_PATH:
+            return 422, _detail("Вложенные пакеты не поддерживаются")
+
+        headers = [
+            (name, value)
+            for name, value in self.scope["headers"]
+            if name not in _DROPPED_HEADERS
+        ]
+        headers.append((b"accept", b"application/json"))
+        # Соединение — как у пакета; метод, путь, заголовки — подзапроса
+        scope = {
+            key: self.scope[key]
+            for key in ("asgi", "http_version", "scheme", "server", "client", "root_path")
+            if key in self.scope
+        }
+        scope |= {
+            "type": "http",
+            "method": item.method,
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "headers": headers,
+            "state": {"principal": self.principal},
+        }
+
+        status = 500
+        content_type = b""
+        chunks: list[bytes] = []
+        request_sent = False
+        finished = asyncio.Event()
+
+        async def receive() -> Message:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            nonlocal status, content_type
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            logger.exception("Batch sub-request %s failed", url.path)
+            return 500, _detail("Internal Server Error")
+        finally:
+            finished.set()
+
+        body = b"".join(chunks)
+        if not body:
+            return status, b"null"
+        if not content_type.startswith(b"application/json"):
+            return 406, _detail("Подзапрос вернул ответ не в JSON")
+        return status, body
@@ -2,8 +2,18 @@
 
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models.building import Building
 from app.repositories.building import BuildingRepository
+from app.schemas.building import BuildingCluster, BuildingOrder, BuildingRead, BuildingWithCount
+from app.utils.cache import SWRCache
+from app.utils.geo import mercator_cell, mercator_cell_bounds
+
+_list_cache: SWRCache[tuple[list[BuildingRead], int]] = SWRCache(
+    "building_list",
+    ttl=settings.building_list_cache_ttl,
+    max_stale=settings.building_list_cache_max_stale,
+)
 
 
 class BuildingService:
@@ -13,7 +23,61 @@ class BuildingService:
         self.repo = BuildingRepository(db)
 
     def get_all(
-        self, *, limit: int, offset: int
+        self, *, limit: int, offset: int, order: BuildingOrder = "id"
     ) -> tuple[list[Building], int]:
         """Все здания с пагинацией."""
-        return self.repo.get_all(limit=limit, offset=offset)
+        return self.repo.get_all(limit=limit, offset=offset, order=order)
+
+    def get_all_cached(
+        self,
+        *,
+        limit: int,
+        offset: int,
+        order: BuildingOrder = "id",
+        with_counts: bool = False,
+    ) -> tuple[list[BuildingRead], int, float | None, str | None]:
+        """Здания с пагинацией; первые страницы — из SWR-кэша.
+
+        Возвращает (элементы, общее_количество, возраст_кэша, ETag). Возраст
+        None — страница прочитана из БД мимо кэша. with_counts — элементы
+        BuildingWithCount с organization_count.
+        """
+        if offset >= limit * settings.building_list_cache_pages:
+            items, total = self._load_page(
+                limit=limit, offset=offset, order=order, with_counts=with_counts
+            )
+            return items, total, None, None
+
+        (items, total), age, etag = _list_cache.get(
+            (limit, offset, order, with_counts),
+            lambda db: BuildingService(db)._load_page(
+                limit=limit, offset=offset, order=order, with_counts=with_counts
+            ),
+            self.repo.db,
+        )
+        return items, total, age, etag
+
+    def _load_page(
+        self, *, limit: int, offset: int, order: BuildingOrder, with_counts: bool
+    ) -> tuple[list[BuildingRead], int]:
+        """Страница зданий как Pydantic-модели — безопасно хранить вне сессии."""
+        schema = BuildingWithCount if with_counts else BuildingRead
+        items, total = self.get_all(limit=limit, offset=offset, order=order)
+        return [schema.model_validate(b) for b in items], total
+
+    def get_clusters(
+        self, lat_min: float, lat_max: float, lng_min: float, lng_max: float, *, zoom: int
+    ) -> list[BuildingCluster]:
+        """Кластеры зданий видимой области на масштабе zoom.
+
+        Область расширяется до границ целых ячеек: счётчики ячейки не зависят
+        от того, какая её часть попала в видимую область.
+        """
+        cells = 2**zoom * settings.cluster_cells_per_tile
+        x_min, y_min = mercator_cell(lat_max, lng_min, cells)
+        x_max, y_max = mercator_cell(lat_min, lng_max, cells)
+        bounds = mercator_cell_bounds(x_min, y_min, x_max, y_max, cells)
+        return [
+            BuildingCluster.model_validate(row)
+            for row in self.repo.get_clusters(*bounds, cells=cells)
+        ]
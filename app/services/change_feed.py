@@ -0,0 +1,46 @@
+"""Сервис ленты изменений: курсор since и постраничное чтение журнала."""
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.repositories.change_log import ChangeLogRepository
+from app.schemas.change import ChangeFeed, ChangeRead
+
+
+def encode_token(txid: int, change_id: int) -> str:
+    """Курсор ленты: «txid.id» последней выданной записи."""
+    return f"{txid}.{change_id}"
+
+
+def decode_token(token: str | None) -> tuple[int, int]:
+    """(txid, id) из курсора. Пустой курсор — начало журнала. Некорректный — 422."""
+    if not token:
+        return 0, 0
+    try:
+        txid, change_id = (int(part) for part in token.split("."))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Некорректный since: ожидается значение next_since из прошлого ответа",
+        ) from None
+    return txid, change_id
+
+
+class ChangeFeedService:
+    """Бизнес-логика ленты изменений."""
+
+    def __init__(self, db: Session):
+        self.repo = ChangeLogRepository(db)
+
+    def get_changes(self, since: str | None, *, limit: int) -> ChangeFeed:
+        """Изменения после курсора since, не более limit записей."""
+        txid, change_id = decode_token(since)
+        rows = self.repo.get_since(txid, change_id, limit=limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_since = encode_token(rows[-1].txid, rows[-1].id) if rows else (since or "0.0")
+        return ChangeFeed(
+            changes=[ChangeRead.model_validate(row) for row in rows],
+            next_since=next_since,
+            has_more=has_more,
+        )
@@ -0,0 +1,71 @@
+"""Оценка стоимости поисковых запросов: выбор стратегии выполнения или отказ."""
+
+from dataclasses import dataclass
+from enum import Enum
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.repositories.base import CountMode
+from app.utils.metrics import metrics
+
+
+class Decision(str, Enum):
+    """Решение cost guard для конкретного запроса."""
+
+    EXACT = "exact"
+    ESTIMATED_COUNT = "estimated_count"
+    CAPPED = "capped"
+    REJECTED = "rejected"
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """Параметры выполнения запроса, выбранные cost guard."""
+
+    decision: Decision
+    count_mode: CountMode = CountMode.EXACT
+    max_rows: int | None = None
+
+
+def plan_geo_query(kind: str, area_km2: float, *, record: bool = True) -> QueryPlan:
+    """Стратегия геопоиска по площади области. Слишком большая область — 422.
+
+    record=False — без метрики: план того же запроса, уже учтённого основным поиском.
+    """
+    if area_km2 <= settings.cost_guard_exact_area_km2:
+        plan = QueryPlan(Decision.EXACT)
+    elif area_km2 <= settings.cost_guard_estimate_area_km2:
+        plan = QueryPlan(Decision.ESTIMATED_COUNT, count_mode=CountMode.ESTIMATED)
+    elif area_km2 <= settings.cost_guard_reject_area_km2:
+        plan = QueryPlan(Decision.CAPPED, max_rows=settings.cost_guard_candidate_cap)
+    else:
+        plan = QueryPlan(Decision.REJECTED)
+
+    if record:
+        _record(kind, plan)
+    if plan.decision is Decision.REJECTED:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=(
+                f"Область поиска ≈{area_km2:,.0f} км² превышает допустимые "
+                f"{settings.cost_guard_reject_area_km2:,.0f} км². "
+                "Уменьшите радиус или границы прямоугольника."
+            ),
+        )
+    return plan
+
+
+def plan_name_query(query: str, *, record: bool = True) -> QueryPlan:
+    """Стратегия поиска по имени: короткая строка совпадает почти со всем — count по оценке."""
+    if len(query.strip()) < settings.cost_guard_name_exact_min_length:
+        plan = QueryPlan(Decision.ESTIMATED_COUNT, count_mode=CountMode.ESTIMATED)
+    else:
+        plan = QueryPlan(Decision.EXACT)
+    if record:
+        _record("name", plan)
+    return plan
+
+
+def _record(kind: str, plan: QueryPlan) -> None:
+    metrics.inc("cost_guard_decisions_total", query=kind, decision=plan.decision.value)
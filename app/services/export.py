@@ -0,0 +1,147 @@
+"""Выгрузка справочника в Parquet для офлайн-аналитики.
+
+Таблицы читаются серверным курсором порциями по settings.export_batch_size,
+каждая порция записывается отдельной row group — память не зависит от
+размера таблицы. pyarrow — опциональная зависимость.
+"""
+
+import functools
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Literal, get_args
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.repositories.export import ExportRepository
+from app.utils.metrics import metrics
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - опциональная зависимость
+    pyarrow = None
+
+ExportTable = Literal[
+    "buildings",
+    "organizations",
+    "organization_phones",
+    "organization_activities",
+    "activity_paths",
+]
+EXPORT_TABLES: tuple[ExportTable, ...] = get_args(ExportTable)
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+
+def parquet_available() -> bool:
+    return pyarrow is not None
+
+
+@functools.cache
+def table_schema(table: ExportTable) -> "pyarrow.Schema":
+    """Arrow-схема выгружаемой таблицы (порядок колонок — как в ExportRepository)."""
+    pa = pyarrow
+    created_at = pa.field("created_at", pa.timestamp("us", tz="UTC"), nullable=False)
+    fields = {
+        "buildings": [
+            pa.field("id", pa.int32(), nullable=False),
+            pa.field("address", pa.string(), nullable=False),
+            pa.field("latitude", pa.float64(), nullable=False),
+            pa.field("longitude", pa.float64(), nullable=False),
+            created_at,
+        ],
+        "organizations": [
+            pa.field("id", pa.int32(), nullable=False),
+            pa.field("name", pa.string(), nullable=False),
+            pa.field("building_id", pa.int32(), nullable=False),
+            created_at,
+        ],
+        "organization_phones": [
+            pa.field("id", pa.int32(), nullable=False),
+            pa.field("organization_id", pa.int32(), nullable=False),
+            pa.field("phone_number", pa.string(), nullable=False),
+            created_at,
+        ],
+        "organization_activities": [
+            pa.field("organization_id", pa.int32(), nullable=False),
+            pa.field("activity_id", pa.int32(), nullable=False),
+        ],
+        "activity_paths": [
+            pa.field("id", pa.int32(), nullable=False),
+            pa.field("name", pa.string(), nullable=False),
+            pa.field("level", pa.int32(), nullable=False),
+            pa.field("parent_id", pa.int32()),
+            pa.field("root_id", pa.int32(), nullable=False),
+            pa.field("path_ids", pa.list_(pa.int32()), nullable=False),
+            pa.field("path", pa.list_(pa.string()), nullable=False),
+            created_at,
+        ],
+    }[table]
+    return pa.schema(fields)
+
+
+class ExportService:
+    """Запись таблиц справочника в Parquet-файлы."""
+
+    def __init__(self, db: Session):
+        self.repo = ExportRepository(db)
+
+    def write_table(
+        self, table: ExportTable, path: Path, *, since: datetime | None = None
+    ) -> int:
+        """Записать таблицу в path (атомарно). Возвращает число строк."""
+        if not parquet_available():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Parquet export requires pyarrow",
+            )
+        schema = table_schema(table)
+        stmt = self.repo.select_table(table, since=since)
+        tmp = path.with_name(f".{path.name}.tmp")
+        rows = 0
+        try:
+            with pyarrow.parquet.ParquetWriter(
+                tmp, schema, compression=settings.export_compression
+            ) as writer:
+                for chunk in self.repo.stream(stmt, batch_size=settings.export_batch_size):
+                    columns = [
+                        pyarrow.array(values, type=field.type)
+                        for values, field in zip(zip(*chunk), schema, strict=True)
+                    ]
+                    writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+                    rows += len(chunk)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        metrics.inc("export_rows_total", rows, table=table)
+        return rows
+
+    def export_all(
+        self,
+        directory: Path,
+        *,
+        tables: tuple[ExportTable, ...] = EXPORT_TABLES,
+        since: datetime | None = None,
+    ) -> dict[ExportTable, int]:
+        """Записать таблицы в directory/<table>.parquet. Возвращает число строк по таблицам."""
+        directory.mkdir(parents=True, exist_ok=True)
+        return {
+            table: self.write_table(table, directory / f"{table}.parquet", since=since)
+            for table in tables
+        }
+
+
+def export_directory(
+    directory: Path,
+    *,
+    tables: tuple[ExportTable, ...] = EXPORT_TABLES,
+    since: datetime | None = None,
+) -> dict[ExportTable, int]:
+    """Выгрузка в отдельной сессии REPEATABLE READ: все таблицы согласованы между собой."""
+    with SessionLocal() as db:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        return ExportService(db).export_all(directory, tables=tables, since=since)
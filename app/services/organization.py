@@ -1,21 +1,90 @@
 """Сервис организаций."""
 
+import functools
+from collections import namedtuple
+
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.config import settings
+from app.indexes.autocomplete import autocomplete_index
+from app.indexes.bitmap import bitmaps_available
 from app.models.organization import Organization
 from app.repositories.activity import ActivityRepository
-from app.repositories.organization import OrganizationRepository
+from app.repositories.organization import OrganizationFilters, OrganizationRepository
+from app.repositories.organization_bitmap import BitmapOrganizationRepository
+from app.repositories.organization_ngram import NgramOrganizationRepository
+from app.schemas.facet import FacetBucket, FacetRequest, SearchFacets
+from app.schemas.organization import (
+    OrganizationItem,
+    OrganizationList,
+    OrganizationProjection,
+    OrganizationRead,
+    OrganizationSearchItem,
+    OrganizationSearchParams,
+    OrganizationSearchResult,
+    OrganizationSuggestion,
+)
+from app.services.cost_guard import Decision, QueryPlan, plan_geo_query, plan_name_query
+from app.utils.geo import bbox_area_km2, build_bbox
+from app.utils.singleflight import coalesce
+
+
+@functools.cache
+def _repository_class(ngram: bool, bitmap: bool) -> type[OrganizationRepository]:
+    """Класс репозитория с выбранными движками (классы-наследники комбинируются)."""
+    bases: list[type[OrganizationRepository]] = []
+    if ngram:
+        bases.append(NgramOrganizationRepository)
+    if bitmap:
+        bases.append(BitmapOrganizationRepository)
+    if not bases:
+        return OrganizationRepository
+    if len(bases) == 1:
+        return bases[0]
+    return type("CombinedOrganizationRepository", tuple(bases), {})
+
+
+@functools.cache
+def _row_type(names: tuple[str, ...]) -> type[tuple]:
+    """Именованный кортеж строки с полями names (для плоских проекций)."""
+    return namedtuple("OrganizationRow", names)
+
+
+def project_organization(
+    org: Organization,
+    projection: OrganizationProjection,
+    schema: type[OrganizationItem] = OrganizationItem,
+    **values: object,
+) -> OrganizationItem | tuple:
+    """Элемент списка только с полями и связями проекции. values — поля не из ORM (distance).
+
+    Плоская проекция — кортеж значений колонок без валидации Pydantic: его
+    поля по имени читают render_msgpack и render_arrow.
+    """
+    names = ("id", *sorted((projection.fields | projection.expand) - {"id"}))
+    row = [values[name] if name in values else getattr(org, name) for name in names]
+    if projection.flat:
+        return _row_type(names)(*row)
+    return schema.model_validate(dict(zip(names, row, strict=True)))
+
+
+def _organization_repository(db: Session) -> OrganizationRepository:
+    """Репозиторий с движками из настроек: NAME_SEARCH_ENGINE и BITMAP_INDEX_ENABLED."""
+    bitmap = settings.bitmap_index_enabled and bitmaps_available()
+    return _repository_class(settings.name_search_engine == "ngram", bitmap)(db)
 
 
 class OrganizationService:
     """Бизнес-логика организаций."""
 
     def __init__(self, db: Session):
-        self.repo = OrganizationRepository(db)
+        self.db = db
+        self.repo = _organization_repository(db)
         self.activity_repo = ActivityRepository(db)
 
-    def get_by_id(self, org_id: int) -> Organization:
+    @coalesce("organizations.get_by_id")
+    def get_by_id(self, org_id: int) -> OrganizationRead:
         """Организация по ID. Поднимает 404, если не найдена."""
         org = self.repo.get_by_id(org_id)
         if not org:
@@ -23,47 +92,199 @@ class OrganizationService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Organization with id {org_id} not found",
             )
-        return org
+        return OrganizationRead.model_validate(org)
 
+    @coalesce("organizations.get_document")
+    def get_document(self, org_id: int) -> str:
+        """Готовый JSON организации (форма OrganizationRead). Поднимает 404, если не найдена."""
+        document = self.repo.get_document(org_id)
+        if document is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Organization with id {org_id} not found",
+            )
+        return document
+
+    @coalesce("organizations.get_by_building")
     def get_by_building(
-        self, building_id: int, *, limit: int, offset: int
-    ) -> tuple[list[Organization], int]:
+        self, building_id: int, *, limit: int, offset: int,
+        projection: OrganizationProjection | None = None,
+    ) -> tuple[list[OrganizationList] | list[OrganizationItem], int]:
         """Организации в указанном здании."""
-        return self.repo.get_by_building_id(building_id, limit=limit, offset=offset)
+        items, total = self._repository(projection).get_by_building_id(
+            building_id, limit=limit, offset=offset
+        )
+        return self._project(items, projection), total
 
+    @coalesce("organizations.get_by_activity")
     def get_by_activity(
-        self, activity_id: int, *, limit: int, offset: int
-    ) -> tuple[list[Organization], int]:
+        self, activity_id: int, *, limit: int, offset: int,
+        projection: OrganizationProjection | None = None,
+    ) -> tuple[list[OrganizationList] | list[OrganizationItem], int]:
         """Организации с конкретной активностью (без вложенных)."""
-        return self.repo.get_by_activity_id(activity_id, limit=limit, offset=offset)
+        items, total = self._repository(projection).get_by_activity_id(
+            activity_id, limit=limit, offset=offset
+        )
+        return self._project(items, projection), total
 
+    @coalesce("organizations.search_by_activity_recursive")
     def search_by_activity_recursive(
-        self, activity_id: int, *, limit: int, offset: int
-    ) -> tuple[list[Organization], int]:
+        self, activity_id: int, *, limit: int, offset: int,
+        projection: OrganizationProjection | None = None,
+    ) -> tuple[list[OrganizationList] | list[OrganizationItem], int]:
         """Поиск по активности с учётом всех дочерних уровней."""
-        activity_ids = self.activity_repo.get_descendant_ids(activity_id)
-        return self.repo.get_by_activity_ids(activity_ids, limit=limit, offset=offset)
+        items, total = self._repository(projection).get_by_activity_subtrees(
+            [activity_id], match_all=False, limit=limit, offset=offset
+        )
+        return self._project(items, projection), total
 
+    @coalesce("organizations.search_by_activities")
+    def search_by_activities(
+        self, activity_ids: list[int], *, match_all: bool, limit: int, offset: int,
+        projection: OrganizationProjection | None = None,
+    ) -> tuple[list[OrganizationList] | list[OrganizationItem], int]:
+        """Поиск по нескольким активностям (каждая с поддеревом): любая или все сразу."""
+        items, total = self._repository(projection).get_by_activity_subtrees(
+            list(dict.fromkeys(activity_ids)),
+            match_all=match_all, limit=limit, offset=offset,
+        )
+        return self._project(items, projection), total
+
+    @coalesce("organizations.search_by_name")
     def search_by_name(
-        self, query: str, *, limit: int, offset: int
-    ) -> tuple[list[Organization], int]:
+        self, query: str, *, limit: int, offset: int,
+        projection: OrganizationProjection | None = None,
+    ) -> tuple[list[OrganizationList] | list[OrganizationItem], int]:
         """Поиск по частичному совпадению названия (без учёта регистра)."""
-        return self.repo.search_by_name(query, limit=limit, offset=offset)
+        plan = plan_name_query(query)
+        items, total = self._repository(projection).search_by_name(
+            query, limit=limit, offset=offset,
+            count_mode=plan.count_mode, max_rows=plan.max_rows,
+        )
+        return self._project(items, projection), total
 
+    @coalesce("organizations.search_in_radius")
     def search_in_radius(
         self, lat: float, lng: float, radius: float,
         *, limit: int, offset: int,
-    ) -> tuple[list[Organization], int]:
-        """Организации в радиусе от точки (метры)."""
-        return self.repo.search_in_radius(lat, lng, radius, limit=limit, offset=offset)
+        projection: OrganizationProjection | None = None,
+    ) -> tuple[list[OrganizationList] | list[OrganizationItem], int]:
+        """Организации в радиусе от точки (метры). Стратегия — по площади bbox."""
+        plan = plan_geo_query("radius", bbox_area_km2(*build_bbox(lat, lng, radius)))
+        items, total = self._repository(projection).search_in_radius(
+            lat, lng, radius, limit=limit, offset=offset,
+            count_mode=plan.count_mode, max_rows=plan.max_rows,
+        )
+        return self._project(items, projection), total
 
+    @coalesce("organizations.search_in_rectangle")
     def search_in_rectangle(
         self,
         lat_min: float, lat_max: float,
         lng_min: float, lng_max: float,
         *, limit: int, offset: int,
-    ) -> tuple[list[Organization], int]:
-        """Организации в прямоугольной области."""
-        return self.repo.search_in_rectangle(
-            lat_min, lat_max, lng_min, lng_max, limit=limit, offset=offset
+        projection: OrganizationProjection | None = None,
+    ) -> tuple[list[OrganizationList] | list[OrganizationItem], int]:
+        """Организации в прямоугольной области. Стратегия — по площади области."""
+        plan = plan_geo_query(
+            "rectangle", bbox_area_km2(lat_min, lat_max, lng_min, lng_max)
+        )
+        items, total = self._repository(projection).search_in_rectangle(
+            lat_min, lat_max, lng_min, lng_max, limit=limit, offset=offset,
+            count_mode=plan.count_mode, max_rows=plan.max_rows,
         )
+        return self._project(items, projection), total
+
+    def autocomplete(self, prefix: str, *, limit: int) -> list[OrganizationSuggestion]:
+        """Подсказки по префиксу из индекса в памяти. Без count и без запроса к БД на горячем пути."""
+        autocomplete_index.ensure_fresh(self.repo.db)
+        return [
+            OrganizationSuggestion(id=org_id, name=name)
+            for org_id, name in autocomplete_index.lookup(prefix, limit=limit)
+        ]
+
+    @coalesce("organizations.search")
+    def search(
+        self, params: OrganizationSearchParams, *, limit: int, offset: int,
+        projection: OrganizationProjection | None = None,
+    ) -> tuple[list[OrganizationSearchResult] | list[OrganizationSearchItem], int]:
+        """Комбинированный поиск: все заданные фильтры объединяются через AND."""
+        filters = self._filters(params)
+        plan = self._plan_search(params)
+        rows, total = self._repository(projection).search(
+            filters, limit=limit, offset=offset,
+            order_by_distance=params.order == "distance",
+            count_mode=plan.count_mode, max_rows=plan.max_rows,
+        )
+        if projection is not None:
+            return [
+                project_organization(org, projection, OrganizationSearchItem, distance=distance)
+                for org, distance in rows
+            ], total
+        items = [
+            OrganizationSearchResult.model_validate(org).model_copy(
+                update={"distance": distance}
+            )
+            for org, distance in rows
+        ]
+        return items, total
+
+    @coalesce("organizations.get_facets")
+    def get_facets(
+        self, params: OrganizationSearchParams, request: FacetRequest
+    ) -> SearchFacets:
+        """Фасеты по тем же фильтрам, что и поиск. Счётчики активностей свёрнуты к предкам.
+
+        План (max_rows) — тот же, что у основного запроса, который уже учтён в метрике cost guard.
+        """
+        plan = self._plan_search(params, record=False)
+        rows = self.repo.facet_counts(
+            self._filters(params),
+            kinds=request.kinds, size=request.size,
+            order_by_distance=params.order == "distance", max_rows=plan.max_rows,
+        )
+        buckets: dict[str, list[FacetBucket]] = {kind: [] for kind in request.kinds}
+        for facet, bucket_id, name, count in rows:
+            buckets[facet].append(FacetBucket(id=bucket_id, name=name, count=count))
+        return SearchFacets(**buckets)
+
+    def _repository(self, projection: OrganizationProjection | None) -> OrganizationRepository:
+        """Репозиторий, загружающий только поля и связи проекции. None — объекты целиком."""
+        if projection is None:
+            return self.repo
+        return self.repo.with_projection(projection.fields, projection.expand)
+
+    @staticmethod
+    def _project(
+        items: list[Organization], projection: OrganizationProjection | None
+    ) -> list[OrganizationList] | list[OrganizationItem] | list[tuple]:
+        if projection is None:
+            return [OrganizationList.model_validate(org) for org in items]
+        return [project_organization(org, projection) for org in items]
+
+    def _filters(self, params: OrganizationSearchParams) -> OrganizationFilters:
+        """Фильтры репозитория из параметров поиска."""
+        activity_ids = (params.activity_id,) if params.activity_id is not None else None
+        point = (params.lat, params.lng) if params.lat is not None else None
+        return OrganizationFilters(
+            name=params.q,
+            activity_ids=activity_ids,
+            building_id=params.building_id,
+            point=point,
+            radius=params.radius,
+            rectangle=params.rectangle,
+        )
+
+    @staticmethod
+    def _plan_search(params: OrganizationSearchParams, *, record: bool = True) -> QueryPlan:
+        """Стратегия подсчёта: по самой узкой геообласти, иначе по строке поиска."""
+        areas = []
+        if params.radius is not None:
+            areas.append(bbox_area_km2(*build_bbox(params.lat, params.lng, params.radius)))
+        if params.rectangle is not None:
+            areas.append(bbox_area_km2(*params.rectangle))
+        if areas:
+            return plan_geo_query("search", min(areas), record=record)
+        if params.q is not None:
+            return plan_name_query(params.q, record=record)
+        return QueryPlan(Decision.EXACT)
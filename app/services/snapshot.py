@@ -0,0 +1,182 @@
+"""Снимки справочника: полная выгрузка в сжатый версионированный файл.
+
+Файл directory-<version>.json.gz содержит один JSON-объект с зданиями,
+деревом видов деятельности и организациями (документы organization_documents).
+Манифест последней версии — latest.json в том же каталоге. Файлы неизменяемы:
+новая версия пишется во временный файл и переименовывается, старые удаляются
+сверх settings.snapshot_keep.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.repositories.building import BuildingRepository
+from app.repositories.change_log import ChangeLogRepository
+from app.repositories.organization import OrganizationRepository
+from app.schemas.activity import ActivityTree
+from app.schemas.building import BuildingRead
+from app.schemas.snapshot import SnapshotManifest
+from app.services.activity import ActivityService
+from app.services.change_feed import encode_token
+from app.utils.metrics import metrics
+
+MANIFEST_NAME = "latest.json"
+VERSION_PATTERN = r"^\d{20}$"
+_FILE_RE = re.compile(r"^directory-(\d{20})\.json\.gz$")
+
+
+def snapshot_dir() -> Path:
+    return Path(settings.snapshot_dir)
+
+
+def snapshot_path(version: str, directory: Path | None = None) -> Path:
+    """Путь к файлу версии."""
+    return (directory or snapshot_dir()) / f"directory-{version}.json.gz"
+
+
+def latest_manifest(directory: Path | None = None) -> SnapshotManifest | None:
+    """Манифест последнего снимка или None, если снимков ещё нет."""
+    try:
+        raw = ((directory or snapshot_dir()) / MANIFEST_NAME).read_bytes()
+    except FileNotFoundError:
+        return None
+    return SnapshotManifest.model_validate_json(raw)
+
+
+def _count_nodes(nodes: list[ActivityTree]) -> int:
+    return sum(1 + _count_nodes(node.children) for node in nodes)
+
+
+def _replace_atomically(path: Path, write: Callable[[BinaryIO], object]) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as fh:
+        write(fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class SnapshotService:
+    """Сборка снимка в сессии db.
+
+    Для согласованности всех разделов сессия должна работать в REPEATABLE READ
+    (см. build_snapshot): тогда снимок и курсор since соответствуют одному
+    состоянию БД.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.buildings = BuildingRepository(db)
+        self.organizations = OrganizationRepository(db)
+        self.changes = ChangeLogRepository(db)
+
+    def build(self, directory: Path | None = None) -> SnapshotManifest:
+        """Записать новую версию и манифест, удалить лишние старые версии."""
+        directory = directory or snapshot_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        generated_at = datetime.now(UTC)
+        version = generated_at.strftime("%Y%m%d%H%M%S%f")
+        # Изменения транзакций с txid >= xmin могли не попасть в снимок:
+        # курсор (xmin, 0) отдаёт их все, повтор уже учтённых безопасен.
+        since = encode_token(self.changes.get_snapshot_xmin(), 0)
+        counts: dict[str, int] = {}
+
+        def write(fh: BinaryIO) -> None:
+            with gzip.GzipFile(fileobj=fh, mode="wb", mtime=0) as gz:
+                out = io.TextIOWrapper(gz, encoding="utf-8")
+                self._write_body(out, version, generated_at, since, counts)
+                out.flush()
+                out.detach()
+
+        path = snapshot_path(version, directory)
+        _replace_atomically(path, write)
+        with open(path, "rb") as fh:
+            sha256 = hashlib.file_digest(fh, "sha256").hexdigest()
+
+        manifest = SnapshotManifest(
+            version=version,
+            generated_at=generated_at,
+            url=f"/api/v1/snapshots/{version}",
+            size=path.stat().st_size,
+            sha256=sha256,
+            since=since,
+            **counts,
+        )
+        _replace_atomically(
+            directory / MANIFEST_NAME,
+            lambda fh: fh.write(manifest.model_dump_json().encode()),
+        )
+        self._prune(directory)
+        metrics.inc("snapshot_builds_total")
+        metrics.set_gauge("snapshot_size_bytes", manifest.size)
+        return manifest
+
+    def _write_body(
+        self,
+        out: TextIO,
+        version: str,
+        generated_at: datetime,
+        since: str,
+        counts: dict[str, int],
+    ) -> None:
+        def dump(value: str) -> str:
+            return json.dumps(value, ensure_ascii=False)
+
+        out.write(
+            f'{{"version":{dump(version)},"generated_at":{dump(generated_at.isoformat())},'
+            f'"since":{dump(since)},"buildings":['
+        )
+        counts["buildings"] = self._write_items(
+            out,
+            (
+                BuildingRead.model_validate(b).model_dump_json()
+                for b in self.buildings.iter_all(batch_size=settings.snapshot_batch_size)
+            ),
+        )
+        tree = ActivityService(self.db).get_tree()
+        counts["activities"] = _count_nodes(tree)
+        out.write('],"activities":[')
+        self._write_items(out, (node.model_dump_json() for node in tree))
+        out.write('],"organizations":[')
+        counts["organizations"] = self._write_items(
+            out, self.organizations.iter_documents(batch_size=settings.snapshot_batch_size)
+        )
+        out.write("]}")
+
+    @staticmethod
+    def _write_items(out: TextIO, items: Iterable[str]) -> int:
+        count = 0
+        for item in items:
+            if count:
+                out.write(",")
+            out.write(item)
+            count += 1
+        return count
+
+    @staticmethod
+    def _prune(directory: Path) -> None:
+        versions = sorted(
+            (m.group(1) for p in directory.iterdir() if (m := _FILE_RE.match(p.name))),
+            reverse=True,
+        )
+        for version in versions[settings.snapshot_keep:]:
+            snapshot_path(version, directory).unlink(missing_ok=True)
+
+
+def build_snapshot(directory: Path | None = None) -> SnapshotManifest:
+    """Собрать снимок в отдельной сессии REPEATABLE READ."""
+    with SessionLocal() as db:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        return SnapshotService(db).build(directory)
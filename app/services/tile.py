@@ -0,0 +1,54 @@
+"""Сервис тайлов точек зданий: рендеринг и кэш по версии данных."""
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.repositories.building import BuildingRepository
+from app.repositories.change_log import ChangeLogRepository
+from app.utils.cache import TTLCache
+from app.utils.geo import mercator_cell_bounds
+from app.utils.metrics import metrics
+from app.utils.singleflight import coalesce
+from app.utils.tiles import TilePoint, encode_tile, quantize
+
+# (z, x, y, версия данных) → тайл. Любое изменение справочника меняет версию,
+# поэтому запись не устаревает — только вытесняется по TTL и размеру.
+_tile_cache: TTLCache[bytes] = TTLCache(
+    "tiles", ttl=settings.tile_cache_ttl, maxsize=settings.tile_cache_size
+)
+
+
+class TileService:
+    """Бизнес-логика тайлов."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.buildings = BuildingRepository(db)
+        self.changes = ChangeLogRepository(db)
+
+    def get_tile(self, z: int, x: int, y: int) -> tuple[bytes, str]:
+        """Тайл z/x/y и его ETag. Версия данных — водяной знак журнала изменений."""
+        xmin, unsettled = self.changes.get_watermark()
+        version = f"{xmin}.{unsettled}"
+        key = (z, x, y, version)
+        found, tile = _tile_cache.get(key)
+        metrics.inc("tile_cache_total", result="hit" if found else "miss")
+        if not found:
+            tile = self._render(z, x, y, version)
+            _tile_cache.set(key, tile)
+        return tile, f'"{z}-{x}-{y}-{version}"'
+
+    @coalesce("tiles.render")
+    def _render(self, z: int, x: int, y: int, version: str) -> bytes:
+        """Здания тайла тем же прямоугольным условием, что и search_in_rectangle."""
+        extent = settings.tile_extent
+        rows = self.buildings.get_points_in_rectangle(*mercator_cell_bounds(x, y, x, y, 2**z))
+        points = [
+            TilePoint(
+                row.id,
+                *quantize(row.latitude, row.longitude, z, x, y, extent),
+                row.organization_count,
+            )
+            for row in rows
+        ]
+        return encode_tile(points, extent)
@@ -0,0 +1,179 @@
+"""Кэши в памяти процесса: TTL/LRU, stale-while-revalidate и общий реестр для сброса."""
+
+import itertools
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Generic, Protocol, TypeVar
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Clearable(Protocol):
+    def clear(self) -> None: ...
+
+
+_registry: list[Clearable] = []
+
+
+def register_cache(cache: Clearable) -> None:
+    """Зарегистрировать кэш для общего сброса (clear_caches)."""
+    _registry.append(cache)
+
+
+def clear_caches() -> None:
+    """Сбросить все зарегистрированные кэши процесса."""
+    for cache in _registry:
+        cache.clear()
+
+
+class TTLCache(Generic[T]):
+    """LRU-кэш с временем жизни записи. TTL задаётся на кэш или на отдельную запись."""
+
+    def __init__(self, name: str, *, ttl: float, maxsize: int = 10_000) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[T, float]] = OrderedDict()
+        register_cache(self)
+
+    def get(self, key: Hashable) -> tuple[bool, T | None]:
+        """(найдено, значение). Просроченная запись считается отсутствующей."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self._entries.pop(key, None)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def set(self, key: Hashable, value: T, *, ttl: float | None = None) -> None:
+        """Сохранить значение. При переполнении вытесняется самая старая запись."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+
+# Версии записей SWR-кэша: уникальны в пределах процесса, тег процесса — между воркерами.
+_versions = itertools.count(1)
+_PROCESS_TAG = secrets.token_hex(4)
+
+
+@dataclass
+class _Entry(Generic[T]):
+    value: T
+    stored_at: float
+    etag: str
+
+
+class SWRCache(Generic[T]):
+    """Кэш stale-while-revalidate.
+
+    Свежая запись (моложе ttl) отдаётся как есть. Устаревшая, но моложе
+    max_stale — отдаётся сразу, а одна фоновая задача обновляет её в
+    отдельной сессии БД. Старше max_stale или отсутствует — загружается
+    синхронно в сессии запроса. ttl <= 0 отключает кэш.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl: float,
+        max_stale: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, _Entry[T]] = {}
+        self._refreshing: set[Hashable] = set()
+        register_cache(self)
+
+    def get(
+        self, key: Hashable, loader: Callable[[Session], T], db: Session
+    ) -> tuple[T, float, str | None]:
+        """Значение по ключу, его возраст в секундах и ETag версии записи.
+
+        ETag меняется при каждой перезагрузке записи; None — кэш отключён.
+        """
+        if self.ttl <= 0:
+            return loader(db), 0.0, None
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age <= self.ttl:
+                self._record("hit")
+                return entry.value, age, entry.etag
+            if age <= self.max_stale:
+                self._record("stale")
+                self._schedule_refresh(key, loader)
+                return entry.value, age, entry.etag
+
+        self._record("miss")
+        value = loader(db)
+        entry = self._store(key, value)
+        return value, 0.0, entry.etag
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: Hashable, value: T) -> _Entry[T]:
+        etag = f'W/"{self.name}-{_PROCESS_TAG}-{next(_versions)}"'
+        entry = _Entry(value=value, stored_at=time.monotonic(), etag=etag)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[Session], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        _refresh_executor.submit(self._refresh, key, loader)
+
+    def _refresh(self, key: Hashable, loader: Callable[[Session], T]) -> None:
+        try:
+            with self._session_factory() as db:
+                value = loader(db)
+            self._store(key, value)
+        except Exception:
+            logger.exception("Background refresh of cache %s failed", self.name)
+            metrics.inc("swr_cache_refresh_errors_total", cache=self.name)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _record(self, result: str) -> None:
+        metrics.inc("swr_cache_requests_total", cache=self.name, result=result)
@@ -0,0 +1,196 @@
+"""Бинарные форматы списковых ответов: MessagePack и Arrow IPC stream.
+
+Формат выбирается по заголовку Accept. msgpack и pyarrow — опциональные
+зависимости: без них соответствующий тип не предлагается и клиент получает JSON.
+
+Строки страницы сериализуются по полям схемы элемента прямо из результатов
+запроса (ORM-объекты или уже готовые модели) — без построчной валидации Pydantic.
+Arrow строится поколоночно, метаданные страницы (count, next, previous, facets)
+кладутся в метаданные схемы потока.
+"""
+
+import functools
+import json
+import types
+import typing
+from collections.abc import Mapping
+from typing import Any, Literal
+
+from fastapi import Response
+from pydantic import BaseModel, create_model
+
+from app.schemas.pagination import PaginatedResponse
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - опциональная зависимость
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - опциональная зависимость
+    pyarrow = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+ResponseFormat = Literal["json", "msgpack", "arrow"]
+
+# Описание альтернативных типов ответа для OpenAPI списковых эндпоинтов.
+BINARY_LIST_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {"content": {MSGPACK: {}, ARROW_STREAM: {}}}
+}
+
+
+def available_formats() -> dict[str, ResponseFormat]:
+    """Доступные типы ответа в порядке предпочтения сервера."""
+    formats: dict[str, ResponseFormat] = {JSON: "json"}
+    if msgpack is not None:
+        formats[MSGPACK] = "msgpack"
+    if pyarrow is not None:
+        formats[ARROW_STREAM] = "arrow"
+    return formats
+
+
+def negotiate_format(accept: str) -> ResponseFormat:
+    """Формат по Accept: максимальный q, при равенстве — порядок сервера.
+
+    */*, application/* и неизвестные типы — JSON, как и раньше.
+    """
+    weights: dict[str, float] = {}
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[media_type] = q
+
+    best, best_q = "json", 0.0
+    for media_type, fmt in available_formats().items():
+        # JSON также принимается по маскам; бинарные форматы — только явно
+        q = weights.get(media_type, 0.0)
+        if fmt == "json":
+            q = max(q, weights.get("application/*", 0.0), weights.get("*/*", 0.0))
+        if q > best_q:
+            best, best_q = fmt, q
+    return best
+
+
+def _row(item: Any, fields: tuple[str, ...]) -> dict[str, Any]:
+    return {name: getattr(item, name, None) for name in fields}
+
+
+def _page_meta(page: PaginatedResponse) -> dict[str, Any]:
+    meta: dict[str, Any] = {"count": page.count, "next": page.next, "previous": page.previous}
+    facets = getattr(page, "facets", None)
+    if facets is not None:
+        meta["facets"] = facets.model_dump(exclude_none=True)
+    return meta
+
+
+def _headers(headers: Mapping[str, str] | None) -> dict[str, str]:
+    """Заголовки эндпоинта (ETag, Age) для готового Response и Vary: Accept."""
+    return {**(headers or {}), "Vary": "Accept"}
+
+
+def render_msgpack(
+    page: PaginatedResponse, schema: type[BaseModel],
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """Страница целиком в MessagePack: та же структура, что и в JSON."""
+    fields = tuple(schema.model_fields)
+    body = _page_meta(page) | {"results": [_row(item, fields) for item in page.results]}
+    return Response(
+        content=msgpack.packb(body, use_bin_type=True),
+        media_type=MSGPACK,
+        headers=_headers(headers),
+    )
+
+
+def _arrow_type(annotation: Any) -> "pyarrow.DataType":
+    if isinstance(annotation, types.UnionType) or typing.get_origin(annotation) is typing.Union:
+        (annotation,) = (a for a in typing.get_args(annotation) if a is not type(None))
+    return {
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        str: pyarrow.string(),
+        bool: pyarrow.bool_(),
+    }[annotation]
+
+
+@functools.cache
+def arrow_schema(schema: type[BaseModel]) -> "pyarrow.Schema":
+    """Arrow-схема по полям плоской Pydantic-модели элемента списка."""
+    return pyarrow.schema(
+        pyarrow.field(name, _arrow_type(field.annotation), nullable=not field.is_required())
+        for name, field in schema.model_fields.items()
+    )
+
+
+@functools.cache
+def sparse_schema(schema: type[BaseModel], fields: frozenset[str]) -> type[BaseModel]:
+    """Схема элемента только с полями fields (в порядке schema) — для ?fields=."""
+    if fields >= schema.model_fields.keys():
+        return schema
+    return create_model(
+        f"{schema.__name__}Sparse",
+        **{
+            name: (field.annotation, field)
+            for name, field in schema.model_fields.items()
+            if name in fields
+        },
+    )
+
+
+def arrow_table(items: list, schema: type[BaseModel]) -> "pyarrow.Table":
+    """Таблица Arrow из элементов списка: по одной колонке на поле схемы."""
+    target = arrow_schema(schema)
+    columns = [
+        pyarrow.array([getattr(item, name, None) for item in items], type=field.type)
+        for name, field in zip(target.names, target, strict=True)
+    ]
+    return pyarrow.Table.from_arrays(columns, schema=target)
+
+
+def render_arrow(
+    page: PaginatedResponse, schema: type[BaseModel],
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """Страница как Arrow IPC stream; count/next/previous/facets — в метаданных схемы."""
+    table = arrow_table(page.results, schema)
+    meta = {key: json.dumps(value, ensure_ascii=False) for key, value in _page_meta(page).items()}
+    table = table.replace_schema_metadata(meta)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(
+        content=sink.getvalue().to_pybytes(),
+        media_type=ARROW_STREAM,
+        headers=_headers(headers),
+    )
+
+
+def render_page(
+    page: PaginatedResponse, schema: type[BaseModel], fmt: ResponseFormat,
+    headers: Mapping[str, str] | None = None,
+) -> PaginatedResponse | Response:
+    """Страница в выбранном формате. JSON — модель как есть (сериализует FastAPI).
+
+    headers — заголовки, выставленные эндпоинтом на внедрённом Response: FastAPI
+    не переносит их на возвращённый Response, поэтому бинарный ответ копирует их сам.
+    """
+    if fmt == "msgpack":
+        return render_msgpack(page, schema, headers)
+    if fmt == "arrow":
+        return render_arrow(page, schema, headers)
+    return page
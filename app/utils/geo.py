@@ -40,6 +40,18 @@ def build_bbox(
     return lat_min, lat_max, lng_min, lng_max
 
 
+def bbox_area_km2(
+    lat_min: float, lat_max: float, lng_min: float, lng_max: float
+) -> float:
+    """Площадь сферического прямоугольника (км²). lng_min > lng_max — переход через антимеридиан."""
+    width = lng_max - lng_min if lng_min <= lng_max else 360.0 - (lng_min - lng_max)
+    width = min(max(width, 0.0), 360.0)
+    lat_min, lat_max = max(lat_min, -90.0), min(lat_max, 90.0)
+    band = abs(math.sin(math.radians(lat_max)) - math.sin(math.radians(lat_min)))
+    radius_km = EARTH_RADIUS_METERS / 1000
+    return radius_km**2 * band * math.radians(width)
+
+
 def bbox_filter(lat: float, lng: float, radius_meters: float) -> BooleanClauseList:
     """WHERE-условие для bbox-фильтра. При пересечении антимеридиана — OR по долготе."""
     lat_min, lat_max, lng_min, lng_max = build_bbox(lat, lng, radius_meters)
@@ -57,6 +69,16 @@ def bbox_filter(lat: float, lng: float, radius_meters: float) -> BooleanClauseLi
     return and_(lat_cond, lng_cond)
 
 
+def rectangle_filter(
+    lat_min: float, lat_max: float, lng_min: float, lng_max: float
+) -> BooleanClauseList:
+    """WHERE-условие: здание внутри прямоугольника координат."""
+    return and_(
+        Building.latitude.between(lat_min, lat_max),
+        Building.longitude.between(lng_min, lng_max),
+    )
+
+
 def haversine_distance(lat: float, lng: float) -> ColumnElement[float]:
     """SQL-выражение: расстояние Haversine (метры) от точки до Building.(lat, lng)."""
     lat_rad = func.radians(Building.latitude)
@@ -74,3 +96,48 @@ def haversine_distance(lat: float, lng: float) -> ColumnElement[float]:
         * func.power(func.sin(dlng / 2), 2)
     )
     return EARTH_RADIUS_METERS * 2 * func.asin(func.sqrt(a))
+
+
+# Сетка кластеров — тайлы Web Mercator: на масштабе zoom по каждой оси
+# 2**zoom * cells_per_tile ячеек. Сетка зависит только от масштаба, поэтому
+# ячейка одинакова при любом сдвиге карты.
+MERCATOR_MAX_LAT = 85.0511287798
+
+
+def mercator_xy(lat: float, lng: float) -> tuple[float, float]:
+    """Точка в нормированных координатах Web Mercator: x, y в [0, 1], y растёт к югу."""
+    lat = min(max(lat, -MERCATOR_MAX_LAT), MERCATOR_MAX_LAT)
+    x = (lng + 180.0) / 360.0
+    y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2
+    return x, y
+
+
+def mercator_cell(lat: float, lng: float, cells: int) -> tuple[int, int]:
+    """(x, y) ячейки сетки cells × cells, в которую попадает точка. y растёт к югу."""
+    fx, fy = mercator_xy(lat, lng)
+    x, y = math.floor(fx * cells), math.floor(fy * cells)
+    return min(max(x, 0), cells - 1), min(max(y, 0), cells - 1)
+
+
+def mercator_cell_bounds(
+    x_min: int, y_min: int, x_max: int, y_max: int, cells: int
+) -> tuple[float, float, float, float]:
+    """(lat_min, lat_max, lng_min, lng_max) блока ячеек. Крайние ряды доходят до полюсов."""
+
+    def lat_of(y: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / cells))))
+
+    lat_max = 90.0 if y_min == 0 else lat_of(y_min)
+    lat_min = -90.0 if y_max == cells - 1 else lat_of(y_max + 1)
+    return lat_min, lat_max, x_min / cells * 360.0 - 180.0, (x_max + 1) / cells * 360.0 - 180.0
+
+
+def mercator_cell_expr(cells: int) -> tuple[ColumnElement[int], ColumnElement[int]]:
+    """SQL-выражения (x, y) ячейки для Building.(latitude, longitude) — как mercator_cell."""
+    lat = func.least(func.greatest(Building.latitude, -MERCATOR_MAX_LAT), MERCATOR_MAX_LAT)
+    x = func.floor((Building.longitude + 180.0) / 360.0 * cells)
+    y = func.floor((1.0 - func.asinh(func.tan(func.radians(lat))) / math.pi) / 2.0 * cells)
+    return (
+        func.least(func.greatest(x, 0), cells - 1),
+        func.least(func.greatest(y, 0), cells - 1),
+    )
@@ -0,0 +1,66 @@
+"""Метрики приложения: счётчики и gauge в памяти процесса, экспорт в формате Prometheus."""
+
+import threading
+
+LabelSet = tuple[tuple[str, str], ...]
+
+
+class Metrics:
+    """Потокобезопасный реестр метрик. Значения живут в пределах одного процесса."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[LabelSet, float]] = {}
+        self._gauges: dict[str, dict[LabelSet, float]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Увеличить счётчик name{labels} на value."""
+        key = _label_set(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Установить текущее значение gauge name{labels}."""
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_set(labels)] = value
+
+    def get(self, name: str, **labels: str) -> float:
+        """Текущее значение метрики (0, если серии ещё нет)."""
+        key = _label_set(labels)
+        with self._lock:
+            for store in (self._counters, self._gauges):
+                if key in store.get(name, {}):
+                    return store[name][key]
+        return 0
+
+    def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus."""
+        lines: list[str] = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for labels, value in sorted(store[name].items()):
+                        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Сбросить все серии (для тестов)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+def _label_set(labels: dict[str, str]) -> LabelSet:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+metrics = Metrics()
@@ -1,10 +1,14 @@
 """Формирование пагинированного ответа в DRF-стиле (count, next, previous, results)."""
 
+from collections.abc import Mapping
 from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 
-from fastapi import Request
+from fastapi import Request, Response
+from pydantic import BaseModel
 
+from app.schemas.facet import FacetedPaginatedResponse, SearchFacets
 from app.schemas.pagination import PaginatedResponse
+from app.utils.formats import ResponseFormat, render_page
 
 
 def _build_url(base_url: str, limit: int, offset: int) -> str:
@@ -24,8 +28,18 @@ def build_paginated_response(
     limit: int,
     offset: int,
     request: Request,
-) -> PaginatedResponse:
-    """Собрать ответ с next/previous URL на основе текущего request.url."""
+    facets: SearchFacets | None = None,
+    *,
+    fmt: ResponseFormat = "json",
+    schema: type[BaseModel] | None = None,
+    headers: Mapping[str, str] | None = None,
+) -> PaginatedResponse | Response:
+    """Собрать ответ с next/previous URL на основе текущего request.url.
+
+    При переданных facets возвращается FacetedPaginatedResponse. Для fmt
+    msgpack/arrow — готовый бинарный Response, поля элементов берутся из schema,
+    заголовки — из headers (обычно response.headers эндпоинта).
+    """
     url = str(request.url)
 
     next_offset = offset + limit
@@ -42,9 +56,21 @@ def build_paginated_response(
         else None
     )
 
-    return PaginatedResponse(
-        count=total,
-        next=next_url,
-        previous=previous_url,
-        results=items,
-    )
+    if facets is not None:
+        page = FacetedPaginatedResponse(
+            count=total,
+            next=next_url,
+            previous=previous_url,
+            results=items,
+            facets=facets,
+        )
+    else:
+        page = PaginatedResponse(
+            count=total,
+            next=next_url,
+            previous=previous_url,
+            results=items,
+        )
+    if fmt != "json" and schema is not None:
+        return render_page(page, schema, fmt, headers)
+    return page
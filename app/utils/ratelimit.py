@@ -0,0 +1,131 @@
+"""Rate limiting по алгоритму token bucket с подключаемым хранилищем состояния.
+
+InMemoryRateLimitStore — состояние в памяти процесса (один воркер, тесты).
+PostgresRateLimitStore — общее состояние в UNLOGGED-таблице: списание
+токенов выполняется одним атомарным UPSERT, поэтому корректно при
+нескольких воркерах uvicorn.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+from sqlalchemy import Engine, text
+
+from app.config import settings
+from app.database import engine
+from app.utils.cache import register_cache
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Итог списания токенов."""
+
+    allowed: bool
+    limit: int
+    remaining: float
+    refill_rate: float
+
+    @property
+    def reset_after(self) -> float:
+        """Секунд до полного восстановления бакета."""
+        return max(self.limit - self.remaining, 0) / self.refill_rate
+
+    def retry_after(self, cost: int) -> float:
+        """Секунд до момента, когда хватит токенов на запрос стоимостью cost."""
+        return max(cost - self.remaining, 0) / self.refill_rate
+
+    def headers(self) -> dict[str, str]:
+        """Заголовки RateLimit-* (draft-ietf-httpapi-ratelimit-headers)."""
+        return {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(math.floor(self.remaining)),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+
+
+class RateLimitStore(Protocol):
+    def consume(
+        self, key: str, cost: int, *, capacity: int, refill_rate: float
+    ) -> RateLimitResult: ...
+
+
+class InMemoryRateLimitStore:
+    """Бакеты в памяти процесса. Не разделяются между воркерами."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+        register_cache(self)
+
+    def consume(
+        self, key: str, cost: int, *, capacity: int, refill_rate: float
+    ) -> RateLimitResult:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+        return RateLimitResult(allowed, capacity, tokens, refill_rate)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+_REFILLED = (
+    "LEAST(:capacity, b.tokens"
+    " + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate)"
+)
+
+_CONSUME_SQL = text(f"""
+    INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at)
+    VALUES (
+        :key,
+        CASE WHEN :cost <= :capacity THEN :capacity - :cost ELSE :capacity END,
+        :cost <= :capacity,
+        clock_timestamp()
+    )
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = CASE WHEN {_REFILLED} >= :cost
+                      THEN {_REFILLED} - :cost ELSE {_REFILLED} END,
+        allowed = {_REFILLED} >= :cost,
+        updated_at = clock_timestamp()
+    RETURNING tokens, allowed
+""")
+
+
+class PostgresRateLimitStore:
+    """Бакеты в таблице rate_limit_buckets. Строка блокируется на время UPSERT."""
+
+    def __init__(self, bind: Engine = engine) -> None:
+        self._engine = bind
+
+    def consume(
+        self, key: str, cost: int, *, capacity: int, refill_rate: float
+    ) -> RateLimitResult:
+        with self._engine.begin() as conn:
+            tokens, allowed = conn.execute(
+                _CONSUME_SQL,
+                {"key": key, "cost": cost, "capacity": capacity, "rate": refill_rate},
+            ).one()
+        return RateLimitResult(allowed, capacity, tokens, refill_rate)
+
+
+_store: RateLimitStore | None = None
+
+
+def get_rate_limit_store() -> RateLimitStore:
+    """Хранилище, выбранное в settings.rate_limit_backend (создаётся один раз)."""
+    global _store
+    if _store is None:
+        if settings.rate_limit_backend == "postgres":
+            _store = PostgresRateLimitStore()
+        else:
+            _store = InMemoryRateLimitStore()
+    return _store
@@ -0,0 +1,179 @@
+"""Single-flight: объединение одинаковых конкурентных вызовов в одно выполнение.
+
+Первый вызывающий с данным ключом (лидер) выполняет функцию, остальные
+ждут его результата. Работает и для потоков (threadpool FastAPI), и для
+корутин — ожидание идёт через общий concurrent.futures.Future.
+
+Объединяются только вызовы с одинаковым statement_timeout сессии: ошибка
+бюджета лидера (57014) не достаётся запросам с бюджетом больше. Ведомый ждёт
+не дольше своего бюджета, затем получает SingleFlightTimeout.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from app.config import settings
+from app.database import STATEMENT_TIMEOUT_KEY
+from app.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Ведомый не дождался результата лидера за свой бюджет времени."""
+
+
+class SingleFlight:
+    """Группа вызовов, объединяемых по ключу."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(
+        self, key: Hashable, fn: Callable[[], T], *,
+        name: str = "", timeout: float | None = None,
+    ) -> T:
+        """Выполнить fn или дождаться результата уже идущего вызова с тем же ключом.
+
+        timeout — сколько секунд ведомый ждёт лидера (None — без ограничения).
+        """
+        future, leader = self._join(key)
+        if not leader:
+            metrics.inc("singleflight_coalesced_total", call=name)
+            try:
+                return future.result(timeout=timeout)
+            except concurrent.futures.TimeoutError:
+                raise _follower_timeout(name, timeout) from None
+        metrics.inc("singleflight_executions_total", call=name)
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._forget(key)
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[[], Awaitable[T]], *,
+        name: str = "", timeout: float | None = None,
+    ) -> T:
+        """Асинхронный вариант do: ожидание без блокировки event loop."""
+        future, leader = self._join(key)
+        if not leader:
+            metrics.inc("singleflight_coalesced_total", call=name)
+            # shield: отмена ожидания по таймауту не должна отменять общий Future лидера
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)), timeout
+                )
+            except asyncio.TimeoutError:
+                raise _follower_timeout(name, timeout) from None
+        metrics.inc("singleflight_executions_total", call=name)
+        try:
+            result = await fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._forget(key)
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+
+_group = SingleFlight()
+
+
+def _follower_timeout(name: str, timeout: float | None) -> SingleFlightTimeout:
+    metrics.inc("singleflight_timeouts_total", call=name)
+    return SingleFlightTimeout(f"{name}: no result within {timeout}s")
+
+
+def _statement_timeout_ms(service: Any) -> int | None:
+    """statement_timeout сессии сервиса (атрибут db), если задан."""
+    db = getattr(service, "db", None)
+    return db.info.get(STATEMENT_TIMEOUT_KEY) if db is not None else None
+
+
+def normalize_args(args: tuple, kwargs: dict) -> Hashable:
+    """Ключ из аргументов: строки без учёта регистра, kwargs в порядке имён."""
+    return (
+        tuple(_normalize(a) for a in args),
+        tuple(sorted((k, _normalize(v)) for k, v in kwargs.items())),
+    )
+
+
+def _normalize(value: Any) -> Hashable:
+    if isinstance(value, str):
+        return value.casefold()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+def coalesce(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Декоратор метода сервиса: одинаковые конкурентные вызовы выполняются один раз.
+
+    self в ключ не входит — вызовы из разных запросов (сессий) объединяются,
+    если у их сессий (self.db) одинаковый statement_timeout. Результат
+    передаётся между сессиями и потоками, поэтому метод должен возвращать
+    DTO (Pydantic-схемы, bytes), а не ORM-объекты.
+    """
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(self, *args, **kwargs):  # noqa: ANN001
+                if not settings.singleflight_enabled:
+                    return await fn(self, *args, **kwargs)
+                timeout_ms = _statement_timeout_ms(self)
+                key = (name, timeout_ms, normalize_args(args, kwargs))
+                return await _group.do_async(
+                    key, lambda: fn(self, *args, **kwargs),
+                    name=name, timeout=_seconds(timeout_ms),
+                )
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):  # noqa: ANN001
+            if not settings.singleflight_enabled:
+                return fn(self, *args, **kwargs)
+            timeout_ms = _statement_timeout_ms(self)
+            key = (name, timeout_ms, normalize_args(args, kwargs))
+            return _group.do(
+                key, lambda: fn(self, *args, **kwargs),
+                name=name, timeout=_seconds(timeout_ms),
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def _seconds(timeout_ms: int | None) -> float | None:
+    return timeout_ms / 1000 if timeout_ms is not None else None
@@ -0,0 +1,99 @@
+"""Бинарный формат тайла точек зданий.
+
+Точки квантуются в сетку extent × extent внутри тайла Web Mercator (как в MVT)
+и кодируются разностями от предыдущей точки, целые числа — varint (LEB128):
+
+    b"DT" | версия: u8 | extent: varint | число точек: varint
+    затем для каждой точки (по возрастанию id):
+        id - id_предыдущей: varint
+        x - x_предыдущей, y - y_предыдущей: zigzag varint
+        число организаций: varint
+
+Координаты пикселя тайла: x — к востоку, y — к югу, от 0 до extent - 1.
+"""
+
+import math
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from app.utils.geo import mercator_xy
+
+MAGIC = b"DT"
+VERSION = 1
+MEDIA_TYPE = "application/vnd.directory.tile"
+
+
+class TilePoint(NamedTuple):
+    id: int
+    x: int
+    y: int
+    organization_count: int
+
+
+def _varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def quantize(lat: float, lng: float, z: int, x: int, y: int, extent: int) -> tuple[int, int]:
+    """Пиксель (px, py) точки в тайле z/x/y с сеткой extent × extent."""
+    fx, fy = mercator_xy(lat, lng)
+    scale = 2**z
+    px = math.floor((fx * scale - x) * extent)
+    py = math.floor((fy * scale - y) * extent)
+    return min(max(px, 0), extent - 1), min(max(py, 0), extent - 1)
+
+
+def encode_tile(points: Iterable[TilePoint], extent: int) -> bytes:
+    """Закодировать точки. Порядок — по возрастанию id (разности id неотрицательны)."""
+    points = sorted(points)
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _varint(extent, out)
+    _varint(len(points), out)
+    prev_id = prev_x = prev_y = 0
+    for point in points:
+        _varint(point.id - prev_id, out)
+        _varint(_zigzag(point.x - prev_x), out)
+        _varint(_zigzag(point.y - prev_y), out)
+        _varint(point.organization_count, out)
+        prev_id, prev_x, prev_y = point.id, point.x, point.y
+    return bytes(out)
+
+
+def decode_tile(data: bytes) -> tuple[int, list[TilePoint]]:
+    """Обратное encode_tile: (extent, точки)."""
+    if data[:2] != MAGIC or data[2] != VERSION:
+        raise ValueError("Not a building tile")
+    pos = 3
+
+    def read() -> int:
+        nonlocal pos
+        value = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def read_signed() -> int:
+        value = read()
+        return (value >> 1) ^ -(value & 1)
+
+    extent, count = read(), read()
+    points: list[TilePoint] = []
+    point_id = px = py = 0
+    for _ in range(count):
+        point_id += read()
+        px += read_signed()
+        py += read_signed()
+        points.append(TilePoint(point_id, px, py, read()))
+    return extent, points
@@ -0,0 +1,31 @@
+"""Выгрузка справочника в Parquet: python export.py DIR [--since ISO-8601] [--table NAME]."""
+
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from app.services.export import EXPORT_TABLES, export_directory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Выгрузка справочника в Parquet")
+    parser.add_argument("directory", type=Path, help="Каталог для <table>.parquet")
+    parser.add_argument(
+        "--since", type=datetime.fromisoformat,
+        help="Только строки с created_at >= since (например, 2026-10-01T00:00:00+00:00)",
+    )
+    parser.add_argument(
+        "--table", action="append", choices=EXPORT_TABLES, dest="tables",
+        help="Таблица (можно указать несколько раз; по умолчанию все)",
+    )
+    args = parser.parse_args()
+
+    counts = export_directory(
+        args.directory, tables=tuple(args.tables or EXPORT_TABLES), since=args.since
+    )
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Сборка снимков справочника: python snapshots.py [--watch]."""
+
+import argparse
+import logging
+import time
+
+from app.config import settings
+from app.services.snapshot import build_snapshot
+
+logger = logging.getLogger("snapshots")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сборка полного снимка справочника")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Собирать снимок каждые SNAPSHOT_INTERVAL секунд",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    while True:
+        try:
+            manifest = build_snapshot()
+            print(f"Snapshot {manifest.version}: {manifest.size} bytes, since={manifest.since}")
+        except Exception:
+            if not args.watch:
+                raise
+            logger.exception("Snapshot build failed")
+        if not args.watch:
+            break
+        time.sleep(settings.snapshot_interval)
+
+
+if __name__ == "__main__":
+    main()
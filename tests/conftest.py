@@ -29,6 +29,7 @@ from app.models.organization import (  # noqa: E402
     OrganizationPhone,
     organization_activities,
 )
+from app.utils.cache import clear_caches  # noqa: E402
 
 TEST_DATABASE_URL = os.environ["DATABASE_URL"]
 
@@ -177,7 +178,9 @@ def db_session(setup_database):
     """
     Provide a transactional database session that is rolled back
     after each test — ensures complete isolation between tests.
+    In-process caches are cleared so no test sees another test's data.
     """
+    clear_caches()
     connection = engine.connect()
     transaction = connection.begin()
     session = TestingSessionLocal(bind=connection)
@@ -189,6 +192,7 @@ def db_session(setup_database):
     session.close()
     transaction.rollback()
     connection.close()
+    clear_caches()
 
 
 @pytest.fixture()
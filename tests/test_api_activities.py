@@ -1,7 +1,14 @@
 """Tests for the activities API endpoints."""
 
+from sqlalchemy import event
+
 
 class TestGetActivities:
+    def test_age_header_reports_cache_age(self, client, api_headers):
+        response = client.get("/api/v1/activities/", headers=api_headers)
+        assert response.status_code == 200
+        assert int(response.headers["Age"]) >= 0
+
     def test_returns_tree_structure(self, client, api_headers, seed):
         response = client.get("/api/v1/activities/", headers=api_headers)
         assert response.status_code == 200
@@ -48,3 +55,61 @@ class TestGetActivities:
             return total
 
         assert count_nodes(response.json()) == seed["activity_count"]
+
+
+class TestActivitySubtreeAndPath:
+    def test_subtree(self, client, api_headers, seed):
+        cars = seed["activities"]["cars"]
+        response = client.get(f"/api/v1/activities/{cars.id}/subtree", headers=api_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == cars.id
+
+        def ids(node):
+            return {node["id"]} | {i for child in node["children"] for i in ids(child)}
+
+        assert ids(data) == seed["activity_descendant_ids"][cars.id]
+        assert "ETag" in response.headers
+
+    def test_path(self, client, api_headers, seed):
+        acts = seed["activities"]
+        response = client.get(
+            f"/api/v1/activities/{acts['parts'].id}/path", headers=api_headers
+        )
+        assert [a["id"] for a in response.json()] == [
+            acts["cars"].id, acts["passenger"].id, acts["parts"].id,
+        ]
+
+    def test_unknown_activity_returns_404(self, client, api_headers):
+        for suffix in ("subtree", "path"):
+            response = client.get(f"/api/v1/activities/999/{suffix}", headers=api_headers)
+            assert response.status_code == 404
+
+    def test_lookup_with_path(self, client, api_headers, seed):
+        acts = seed["activities"]
+        response = client.get(
+            "/api/v1/activities/lookup", params={"name": "легковые"}, headers=api_headers
+        )
+        assert response.status_code == 200
+        (match,) = response.json()
+        assert match["id"] == acts["passenger"].id
+        assert [a["id"] for a in match["path"]] == [acts["cars"].id, acts["passenger"].id]
+
+    def test_lookup_no_match(self, client, api_headers):
+        response = client.get(
+            "/api/v1/activities/lookup", params={"name": "нет такого"}, headers=api_headers
+        )
+        assert response.json() == []
+
+    def test_served_from_index_without_queries(self, client, api_headers, db_session, seed):
+        client.get("/api/v1/activities/", headers=api_headers)
+        statements = []
+        event.listen(
+            db_session.connection(), "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        parts = seed["activities"]["parts"]
+        client.get(f"/api/v1/activities/{parts.id}/subtree", headers=api_headers)
+        client.get(f"/api/v1/activities/{parts.id}/path", headers=api_headers)
+        client.get("/api/v1/activities/lookup", params={"name": "Запчасти"}, headers=api_headers)
+        assert not [sql for sql in statements if "activities" in sql]
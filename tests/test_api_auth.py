@@ -1,5 +1,13 @@
 """Tests for API key authentication."""
 
+from app.services.api_key import (
+    ApiKeyService,
+    _principal_cache,
+    _unknown_key_cache,
+    hash_api_key,
+)
+from app.utils.metrics import metrics
+
 
 class TestAuthentication:
     def test_no_api_key_returns_401(self, client):
@@ -18,3 +26,63 @@ class TestAuthentication:
     def test_correct_api_key_succeeds(self, client, api_headers):
         response = client.get("/api/v1/buildings/", headers=api_headers)
         assert response.status_code == 200
+
+
+class TestHashedApiKeys:
+    def test_issued_key_is_accepted(self, client, db_session):
+        _, raw_key = ApiKeyService(db_session).issue("partner", ["read"])
+        response = client.get("/api/v1/buildings/", headers={"X-API-Key": raw_key})
+        assert response.status_code == 200
+
+    def test_only_hash_is_stored(self, db_session):
+        api_key, raw_key = ApiKeyService(db_session).issue("partner", ["read"])
+        assert api_key.key_hash == hash_api_key(raw_key)
+        assert raw_key not in api_key.key_hash
+
+    def test_principal_has_scopes(self, db_session):
+        service = ApiKeyService(db_session)
+        _, raw_key = service.issue("partner", ["read", "export"])
+        principal = service.authenticate(raw_key)
+        assert principal.has_scope("export")
+        assert not principal.has_scope("admin")
+
+    def test_read_requires_read_scope(self, client, db_session):
+        _, raw_key = ApiKeyService(db_session).issue("analytics", ["export"])
+        response = client.get("/api/v1/buildings/", headers={"X-API-Key": raw_key})
+        assert response.status_code == 403
+        assert "read" in response.json()["detail"]
+
+    def test_verification_is_cached(self, client, db_session):
+        _, raw_key = ApiKeyService(db_session).issue("partner", ["read"])
+        headers = {"X-API-Key": raw_key}
+        client.get("/api/v1/buildings/", headers=headers)
+        hits = metrics.get("api_key_cache_total", result="hit")
+        client.get("/api/v1/buildings/", headers=headers)
+        assert metrics.get("api_key_cache_total", result="hit") == hits + 1
+
+    def test_unknown_key_is_negatively_cached(self, client):
+        headers = {"X-API-Key": "dk_unknown"}
+        assert client.get("/api/v1/buildings/", headers=headers).status_code == 403
+        hits = metrics.get("api_key_cache_total", result="hit")
+        assert client.get("/api/v1/buildings/", headers=headers).status_code == 403
+        assert metrics.get("api_key_cache_total", result="hit") == hits + 1
+
+    def test_unknown_keys_do_not_evict_valid(self, db_session, monkeypatch):
+        monkeypatch.setattr(_unknown_key_cache, "maxsize", 2)
+        monkeypatch.setattr(_principal_cache, "maxsize", 2)
+        service = ApiKeyService(db_session)
+        _, raw_key = service.issue("partner", ["read"])
+        assert service.authenticate(raw_key) is not None
+        for i in range(5):
+            assert service.authenticate(f"dk_unknown_{i}") is None
+        hits = metrics.get("api_key_cache_total", result="hit")
+        assert service.authenticate(raw_key) is not None
+        assert metrics.get("api_key_cache_total", result="hit") == hits + 1
+
+    def test_revoked_key_is_rejected(self, client, db_session):
+        service = ApiKeyService(db_session)
+        api_key, raw_key = service.issue("partner", ["read"])
+        headers = {"X-API-Key": raw_key}
+        assert client.get("/api/v1/buildings/", headers=headers).status_code == 200
+        assert service.revoke(api_key.id)
+        assert client.get("/api/v1/buildings/", headers=headers).status_code == 403
@@ -0,0 +1,129 @@
+"""Tests for POST /api/v1/batch."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.api_key import ApiKeyService
+from app.services.batch import BatchService
+
+URL = "/api/v1/batch"
+
+
+@pytest.fixture(autouse=True)
+def serial_batches(monkeypatch):
+    """Sub-requests share the single test session, so run them one at a time."""
+    monkeypatch.setattr(settings, "batch_concurrency", 1)
+
+
+class TestBatch:
+    def test_results_match_individual_calls(self, client, api_headers, seed):
+        org = seed["orgs"][0]
+        building = seed["buildings"][0]
+        urls = [
+            "/api/v1/activities/",
+            f"/api/v1/organizations/{org.id}",
+            f"/api/v1/organizations/by-building/{building.id}?fields=name",
+        ]
+        response = client.post(
+            URL, json={"requests": [{"url": url} for url in urls]}, headers=api_headers
+        )
+        assert response.status_code == 200
+        results = response.json()["responses"]
+        assert [r["status"] for r in results] == [200, 200, 200]
+        for url, result in zip(urls, results, strict=True):
+            assert result["body"] == client.get(url, headers=api_headers).json()
+
+    def test_per_item_status_and_ids(self, client, api_headers):
+        response = client.post(
+            URL,
+            json={
+                "requests": [
+                    {"id": "missing", "url": "/api/v1/organizations/999"},
+                    {"id": "bad", "url": "/api/v1/organizations/search/name"},
+                    {"id": "tree", "url": "/api/v1/activities/"},
+                ]
+            },
+            headers=api_headers,
+        )
+        results = response.json()["responses"]
+        assert [(r["id"], r["status"]) for r in results] == [
+            ("missing", 404), ("bad", 422), ("tree", 200),
+        ]
+        assert "detail" in results[0]["body"]
+
+    def test_requires_api_key(self, client):
+        response = client.post(URL, json={"requests": [{"url": "/api/v1/activities/"}]})
+        assert response.status_code == 401
+
+    def test_key_validated_once(self, client, db_session, monkeypatch):
+        _, raw_key = ApiKeyService(db_session).issue("dashboard", ["*"])
+        calls = []
+        authenticate = ApiKeyService.authenticate
+
+        def counting(self, key):
+            calls.append(key)
+            return authenticate(self, key)
+
+        monkeypatch.setattr(ApiKeyService, "authenticate", counting)
+        response = client.post(
+            URL,
+            json={"requests": [{"url": "/api/v1/activities/"}] * 3},
+            headers={"X-API-Key": raw_key},
+        )
+        assert [r["status"] for r in response.json()["responses"]] == [200] * 3
+        assert len(calls) == 1
+
+    def test_session_released_before_dispatch(self, client, db_session, monkeypatch):
+        _, raw_key = ApiKeyService(db_session).issue("dashboard", ["*"])
+        in_transaction = []
+
+        async def dispatch(self, item):
+            in_transaction.append(db_session.in_transaction())
+            return 200, b"{}"
+
+        monkeypatch.setattr(BatchService, "dispatch", dispatch)
+        response = client.post(
+            URL,
+            json={"requests": [{"url": "/api/v1/activities/"}] * 2},
+            headers={"X-API-Key": raw_key},
+        )
+        assert response.status_code == 200
+        assert in_transaction == [False, False]
+
+    def test_only_api_paths(self, client, api_headers):
+        response = client.post(
+            URL, json={"requests": [{"url": "/metrics"}]}, headers=api_headers
+        )
+        assert response.status_code == 422
+
+    def test_nested_batch_rejected(self, client, api_headers):
+        response = client.post(
+            URL, json={"requests": [{"url": "/api/v1/batch"}]}, headers=api_headers
+        )
+        assert response.json()["responses"][0]["status"] == 422
+
+    def test_too_many_requests_returns_422(self, client, api_headers):
+        items = [{"url": "/api/v1/activities/"}] * (settings.batch_max_requests + 1)
+        response = client.post(URL, json={"requests": items}, headers=api_headers)
+        assert response.status_code == 422
+
+    def test_concurrency_is_limited(self, client, api_headers, monkeypatch):
+        monkeypatch.setattr(settings, "batch_concurrency", 2)
+        in_flight = peak = 0
+
+        async def dispatch(self, item):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return 200, b"{}"
+
+        monkeypatch.setattr(BatchService, "dispatch", dispatch)
+        response = client.post(
+            URL, json={"requests": [{"url": "/api/v1/activities/"}] * 6}, headers=api_headers
+        )
+        assert [r["status"] for r in response.json()["responses"]] == [200] * 6
+        assert peak == 2
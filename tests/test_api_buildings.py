@@ -1,5 +1,7 @@
 """Tests for the buildings API endpoints."""
 
+import pytest
+
 REQUIRED_FIELDS = {"id", "address", "latitude", "longitude"}
 
 
@@ -15,6 +17,20 @@ class TestGetBuildings:
         assert data["count"] == seed["building_count"]
         assert len(data["results"]) == seed["building_count"]
 
+    def test_first_page_cached_with_age_header(self, client, api_headers, seed):
+        first = client.get("/api/v1/buildings/", headers=api_headers)
+        second = client.get("/api/v1/buildings/", headers=api_headers)
+        assert "Age" in first.headers
+        assert "Age" in second.headers
+        assert second.json() == first.json()
+
+    def test_deep_page_bypasses_cache(self, client, api_headers):
+        response = client.get(
+            "/api/v1/buildings/", params={"limit": 1, "offset": 50}, headers=api_headers
+        )
+        assert response.status_code == 200
+        assert "Age" not in response.headers
+
     def test_buildings_have_required_fields(self, client, api_headers, seed):
         response = client.get("/api/v1/buildings/", headers=api_headers)
         results = response.json()["results"]
@@ -100,3 +116,68 @@ class TestGetBuildings:
         data = response.json()
         assert data["next"] is None
         assert data["previous"] is None
+
+
+class TestBuildingOrganizationCounts:
+    def test_hidden_by_default(self, client, api_headers):
+        data = client.get("/api/v1/buildings/", headers=api_headers).json()
+        assert all(set(item) == REQUIRED_FIELDS for item in data["results"])
+
+    def test_with_counts(self, client, api_headers):
+        data = client.get(
+            "/api/v1/buildings/", params={"with_counts": True}, headers=api_headers
+        ).json()
+        assert {b["id"]: b["organization_count"] for b in data["results"]} == {1: 2, 2: 1, 3: 1}
+
+    def test_order_by_count_desc(self, client, api_headers):
+        params = {"with_counts": True, "order": "-organization_count", "limit": 1}
+        data = client.get("/api/v1/buildings/", params=params, headers=api_headers).json()
+        assert data["results"][0]["id"] == 1
+        assert "order=-organization_count" in data["next"]
+
+    def test_invalid_order(self, client, api_headers):
+        response = client.get("/api/v1/buildings/", params={"order": "address"}, headers=api_headers)
+        assert response.status_code == 422
+
+
+class TestBuildingClusters:
+    URL = "/api/v1/buildings/clusters"
+    WORLD = {"lat_min": -80, "lat_max": 80, "lng_min": -179, "lng_max": 179}
+
+    def test_low_zoom_groups_nearby_buildings(self, client, api_headers):
+        response = client.get(self.URL, params=self.WORLD | {"zoom": 3}, headers=api_headers)
+        assert response.status_code == 200
+        clusters = sorted(response.json(), key=lambda c: c["longitude"])
+        assert [(c["building_count"], c["organization_count"]) for c in clusters] == [
+            (2, 3),
+            (1, 1),
+        ]
+        moscow = clusters[0]
+        assert moscow["latitude"] == pytest.approx((55.7558 + 55.7601) / 2)
+        assert moscow["longitude"] == pytest.approx((37.6173 + 37.6186) / 2)
+
+    def test_high_zoom_separates_buildings(self, client, api_headers):
+        response = client.get(self.URL, params=self.WORLD | {"zoom": 18}, headers=api_headers)
+        assert sorted(c["building_count"] for c in response.json()) == [1, 1, 1]
+
+    def test_cell_stable_across_pans(self, client, api_headers):
+        # Область захватывает только здание 1, но ячейка считается целиком
+        around_first = {"lat_min": 55.75, "lat_max": 55.756, "lng_min": 37.6, "lng_max": 37.618}
+        shifted = {"lat_min": 55.0, "lat_max": 56.5, "lng_min": 37.0, "lng_max": 39.0}
+        a = client.get(self.URL, params=around_first | {"zoom": 5}, headers=api_headers).json()
+        b = client.get(self.URL, params=shifted | {"zoom": 5}, headers=api_headers).json()
+        assert a == b
+        assert a[0]["building_count"] == 2
+
+    def test_cache_control(self, client, api_headers):
+        response = client.get(self.URL, params=self.WORLD | {"zoom": 1}, headers=api_headers)
+        assert response.headers["cache-control"].startswith("public, max-age=")
+
+    def test_invalid_rectangle(self, client, api_headers):
+        params = self.WORLD | {"lat_min": 60, "lat_max": 50, "zoom": 3}
+        response = client.get(self.URL, params=params, headers=api_headers)
+        assert response.status_code == 422
+
+    def test_zoom_out_of_range(self, client, api_headers):
+        response = client.get(self.URL, params=self.WORLD | {"zoom": 99}, headers=api_headers)
+        assert response.status_code == 422
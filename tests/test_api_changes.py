@@ -0,0 +1,162 @@
+"""Tests for the change feed endpoint."""
+
+from datetime import UTC, datetime
+
+from sqlalchemy import delete, func, select, update
+
+from app.models import (
+    Activity,
+    Building,
+    ChangeLog,
+    Organization,
+    OrganizationPhone,
+    organization_activities,
+)
+
+URL = "/api/v1/organizations/changes"
+
+
+def _drain(client, headers, since=None):
+    """Все изменения после since и курсор на конец ленты."""
+    params = {"limit": 1000}
+    if since is not None:
+        params["since"] = since
+    response = client.get(URL, params=params, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["has_more"] is False
+    return data["changes"], data["next_since"]
+
+
+def _logged(db_session, after_id):
+    """Записи change_log после after_id как (entity, entity_id, operation)."""
+    rows = db_session.execute(
+        select(ChangeLog.entity, ChangeLog.entity_id, ChangeLog.operation)
+        .where(ChangeLog.id > after_id)
+        .order_by(ChangeLog.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+class TestChangeFeed:
+    def test_seed_inserts_are_created(self, client, api_headers, seed):
+        changes, _ = _drain(client, api_headers)
+        created = {(c["entity"], c["id"]) for c in changes if c["operation"] == "created"}
+        assert {("organization", o.id) for o in seed["orgs"]} <= created
+        assert {("building", b.id) for b in seed["buildings"]} <= created
+        assert ("activity", seed["activities"]["food"].id) in created
+
+    def test_update_after_cursor(self, client, api_headers, db_session, seed):
+        _, since = _drain(client, api_headers)
+        building = seed["buildings"][0]
+        db_session.execute(
+            update(Building).where(Building.id == building.id).values(address="Новый адрес")
+        )
+        db_session.flush()
+
+        changes, next_since = _drain(client, api_headers, since)
+        assert [(c["entity"], c["id"], c["operation"]) for c in changes] == [
+            ("building", building.id, "updated")
+        ]
+        assert _drain(client, api_headers, next_since)[0] == []
+
+    def test_delete_is_logged(self, client, api_headers, db_session, seed):
+        _, since = _drain(client, api_headers)
+        org = seed["orgs"][3]
+        db_session.execute(delete(Organization).where(Organization.id == org.id))
+        db_session.flush()
+
+        changes, _ = _drain(client, api_headers, since)
+        assert ("organization", org.id, "deleted") in {
+            (c["entity"], c["id"], c["operation"]) for c in changes
+        }
+
+    def test_phone_change_updates_organization(self, client, api_headers, db_session, seed):
+        _, since = _drain(client, api_headers)
+        org = seed["orgs"][0]
+        db_session.execute(
+            delete(OrganizationPhone).where(OrganizationPhone.organization_id == org.id)
+        )
+        db_session.flush()
+
+        changes, _ = _drain(client, api_headers, since)
+        assert {(c["entity"], c["id"], c["operation"]) for c in changes} == {
+            ("organization", org.id, "updated")
+        }
+
+    def test_activity_link_change_updates_organization(
+        self, client, api_headers, db_session, seed
+    ):
+        _, since = _drain(client, api_headers)
+        org = seed["orgs"][1]
+        db_session.execute(
+            delete(organization_activities).where(
+                organization_activities.c.organization_id == org.id
+            )
+        )
+        db_session.flush()
+
+        changes, _ = _drain(client, api_headers, since)
+        assert ("organization", org.id, "updated") in {
+            (c["entity"], c["id"], c["operation"]) for c in changes
+        }
+
+    def test_keyset_paging(self, client, api_headers, seed):
+        everything, _ = _drain(client, api_headers)
+        collected, since = [], None
+        while True:
+            params = {"limit": 3} | ({"since": since} if since else {})
+            data = client.get(URL, params=params, headers=api_headers).json()
+            collected.extend(data["changes"])
+            since = data["next_since"]
+            if not data["has_more"]:
+                break
+            assert len(data["changes"]) == 3
+        assert collected == everything
+
+    def test_invalid_since(self, client, api_headers):
+        response = client.get(URL, params={"since": "abc"}, headers=api_headers)
+        assert response.status_code == 422
+
+    def test_updated_at_set_by_trigger(self, db_session, seed):
+        org = seed["orgs"][0]
+        db_session.execute(
+            update(Organization)
+            .where(Organization.id == org.id)
+            .values(name="Новое имя", updated_at=datetime(2000, 1, 1, tzinfo=UTC))
+        )
+        db_session.flush()
+        db_session.refresh(org)
+        assert org.updated_at == db_session.scalar(select(func.now()))
+
+    def test_organization_insert_logs_once(self, db_session, seed):
+        building = seed["buildings"][2]
+        last_id = db_session.scalar(select(func.max(ChangeLog.id)))
+        db_session.execute(
+            update(Building)
+            .where(Building.id == building.id)
+            .values(updated_at=datetime(2000, 1, 1, tzinfo=UTC))
+        )
+        db_session.flush()
+        assert _logged(db_session, last_id) == []
+
+        org = Organization(id=10, name="Новая", building_id=building.id)
+        db_session.add(org)
+        db_session.flush()
+
+        assert _logged(db_session, last_id) == [("organization", org.id, "created")]
+        db_session.refresh(building)
+        assert building.organization_count == 2
+        assert building.updated_at == datetime(2000, 1, 1, tzinfo=UTC)
+
+    def test_ancestor_refresh_not_logged(self, db_session, seed):
+        last_id = db_session.scalar(select(func.max(ChangeLog.id)))
+        parts = seed["activities"]["parts"]
+        db_session.execute(
+            update(Activity)
+            .where(Activity.id == parts.id)
+            .values(parent_id=seed["activities"]["trucks"].id)
+        )
+        db_session.flush()
+
+        assert _logged(db_session, last_id) == [("activity", parts.id, "updated")]
@@ -1,5 +1,9 @@
 """Tests for the organizations API endpoints."""
 
+import pytest
+
+from app.utils.metrics import metrics
+
 
 class TestGetOrganizationById:
     """Detail endpoint — no pagination, returns full OrganizationRead."""
@@ -219,6 +223,16 @@ class TestSearchInRadius:
         assert response.status_code == 200
         assert response.json()["count"] <= seed["orgs_in_building"][b.id]
 
+    def test_oversized_radius_rejected_by_cost_guard(self, client, api_headers):
+        response = client.get(
+            "/api/v1/organizations/search/radius",
+            params={"lat": 55.75, "lng": 37.61, "radius": 40_075_000},
+            headers=api_headers,
+        )
+        assert response.status_code == 422
+        metrics_text = client.get("/metrics").text
+        assert 'cost_guard_decisions_total{decision="rejected",query="radius"}' in metrics_text
+
     def test_missing_params_returns_422(self, client, api_headers):
         response = client.get(
             "/api/v1/organizations/search/radius",
@@ -400,3 +414,325 @@ class TestPagination:
         if seed["org_count"] <= 20:
             assert data["next"] is None
         assert data["previous"] is None
+
+
+class TestCombinedSearch:
+    URL = "/api/v1/organizations/search"
+
+    def test_name_and_activity_are_intersected(self, client, api_headers, seed):
+        food = seed["activities"]["food"]
+        response = client.get(
+            self.URL, params={"q": "мол", "activity_id": food.id}, headers=api_headers
+        )
+        assert response.status_code == 200
+        ids = {o["id"] for o in response.json()["results"]}
+        assert ids == {2}
+
+    def test_activity_includes_subtree(self, client, api_headers, seed):
+        cars = seed["activities"]["cars"]
+        response = client.get(self.URL, params={"activity_id": cars.id}, headers=api_headers)
+        ids = {o["id"] for o in response.json()["results"]}
+        assert ids == seed["recursive_org_ids"][cars.id]
+
+    def test_activity_with_radius(self, client, api_headers, seed):
+        b = seed["moscow_buildings"][0]
+        food = seed["activities"]["food"]
+        response = client.get(
+            self.URL,
+            params={"activity_id": food.id, "lat": b.latitude, "lng": b.longitude, "radius": 2000},
+            headers=api_headers,
+        )
+        data = response.json()
+        assert {o["id"] for o in data["results"]} == {1, 2}
+        assert all(o["distance"] is not None and o["distance"] <= 2000 for o in data["results"])
+
+    def test_order_by_distance(self, client, api_headers, seed):
+        b = seed["buildings"][1]
+        response = client.get(
+            self.URL,
+            params={
+                "q": "ООО", "lat": b.latitude, "lng": b.longitude, "order": "distance",
+            },
+            headers=api_headers,
+        )
+        results = response.json()["results"]
+        distances = [o["distance"] for o in results]
+        assert distances == sorted(distances)
+        assert results[0]["building_id"] == b.id
+        assert len(results) == seed["org_count"]
+
+    def test_distance_null_without_point(self, client, api_headers, seed):
+        response = client.get(self.URL, params={"building_id": 1}, headers=api_headers)
+        results = response.json()["results"]
+        assert len(results) == seed["orgs_in_building"][1]
+        assert all(o["distance"] is None for o in results)
+
+    def test_rectangle_and_building(self, client, api_headers):
+        response = client.get(
+            self.URL,
+            params={
+                "building_id": 3,
+                "lat_min": 55.5, "lat_max": 56, "lng_min": 37, "lng_max": 38,
+            },
+            headers=api_headers,
+        )
+        assert response.json()["count"] == 0
+
+    def test_without_filters_returns_422(self, client, api_headers):
+        response = client.get(self.URL, headers=api_headers)
+        assert response.status_code == 422
+
+    def test_partial_rectangle_returns_422(self, client, api_headers):
+        response = client.get(
+            self.URL, params={"lat_min": 55, "lat_max": 56}, headers=api_headers
+        )
+        assert response.status_code == 422
+
+    def test_radius_without_point_returns_422(self, client, api_headers):
+        response = client.get(self.URL, params={"radius": 100}, headers=api_headers)
+        assert response.status_code == 422
+
+    def test_distance_order_without_point_returns_422(self, client, api_headers):
+        response = client.get(
+            self.URL, params={"q": "ООО", "order": "distance"}, headers=api_headers
+        )
+        assert response.status_code == 422
+
+
+class TestSearchFacets:
+    def test_facets_absent_unless_requested(self, client, api_headers):
+        response = client.get(
+            "/api/v1/organizations/search/name", params={"q": "ООО"}, headers=api_headers
+        )
+        assert "facets" not in response.json()
+
+    def test_activity_counts_roll_up_to_ancestors(self, client, api_headers, seed):
+        response = client.get(
+            "/api/v1/organizations/search/name",
+            params={"q": "ООО", "facets": "activity"},
+            headers=api_headers,
+        )
+        assert response.status_code == 200
+        facets = response.json()["facets"]
+        assert "building" not in facets
+        counts = {b["id"]: b["count"] for b in facets["activity"]}
+        expected = {
+            act_id: len(org_ids)
+            for act_id, org_ids in seed["recursive_org_ids"].items()
+            if org_ids
+        }
+        assert counts == expected
+        assert [b["count"] for b in facets["activity"]] == sorted(counts.values(), reverse=True)
+
+    def test_building_counts_follow_filters(self, client, api_headers, seed):
+        food = seed["activities"]["food"]
+        response = client.get(
+            f"/api/v1/organizations/search/activity/{food.id}",
+            params={"facets": "building"},
+            headers=api_headers,
+        )
+        buckets = response.json()["facets"]["building"]
+        assert {b["id"]: b["count"] for b in buckets} == {1: 2, 3: 1}
+        assert buckets[0]["name"] == seed["buildings"][0].address
+
+    def test_facet_size_caps_groups(self, client, api_headers):
+        response = client.get(
+            "/api/v1/organizations/search",
+            params={"q": "ООО", "facets": "activity,building", "facet_size": 1},
+            headers=api_headers,
+        )
+        facets = response.json()["facets"]
+        assert len(facets["activity"]) == 1
+        assert len(facets["building"]) == 1
+
+    def test_cost_guard_decision_recorded_once(self, client, api_headers):
+        def decisions():
+            return {
+                query: metrics.get(
+                    "cost_guard_decisions_total", query=query, decision="estimated_count"
+                )
+                for query in ("name", "search")
+            }
+
+        before = decisions()
+        response = client.get(
+            "/api/v1/organizations/search/name",
+            params={"q": "О", "facets": "activity"},
+            headers=api_headers,
+        )
+        assert response.status_code == 200
+        after = decisions()
+        assert after["name"] == before["name"] + 1
+        assert after["search"] == before["search"]
+
+    def test_unknown_facet_returns_422(self, client, api_headers):
+        response = client.get(
+            "/api/v1/organizations/search/name",
+            params={"q": "ООО", "facets": "phone"},
+            headers=api_headers,
+        )
+        assert response.status_code == 422
+
+
+class TestAutocomplete:
+    def test_returns_matches_without_count(self, client, api_headers):
+        response = client.get(
+            "/api/v1/organizations/autocomplete", params={"prefix": "мол"}, headers=api_headers
+        )
+        assert response.status_code == 200
+        assert response.json() == [{"id": 2, "name": 'ООО "Молочный мир"'}]
+
+    def test_limit(self, client, api_headers):
+        response = client.get(
+            "/api/v1/organizations/autocomplete",
+            params={"prefix": "ООО", "limit": 3},
+            headers=api_headers,
+        )
+        assert len(response.json()) == 3
+
+    def test_empty_prefix_returns_422(self, client, api_headers):
+        response = client.get(
+            "/api/v1/organizations/autocomplete", params={"prefix": ""}, headers=api_headers
+        )
+        assert response.status_code == 422
+
+
+class TestSearchByMultipleActivities:
+    URL = "/api/v1/organizations/search/activity"
+
+    def test_any_is_union_of_subtrees(self, client, api_headers, seed):
+        food, cars = seed["activities"]["food"], seed["activities"]["cars"]
+        response = client.get(
+            self.URL,
+            params={"activity_id": [food.id, cars.id], "mode": "any"},
+            headers=api_headers,
+        )
+        assert response.status_code == 200
+        expected = seed["recursive_org_ids"][food.id] | seed["recursive_org_ids"][cars.id]
+        data = response.json()
+        assert data["count"] == len(expected)
+        assert [o["id"] for o in data["results"]] == sorted(expected)
+
+    def test_all_is_intersection(self, client, api_headers, seed):
+        meat, dairy = seed["activities"]["meat"], seed["activities"]["dairy"]
+        response = client.get(
+            self.URL,
+            params={"activity_id": [meat.id, dairy.id], "mode": "all"},
+            headers=api_headers,
+        )
+        assert {o["id"] for o in response.json()["results"]} == (
+            seed["recursive_org_ids"][meat.id] & seed["recursive_org_ids"][dairy.id]
+        )
+
+    def test_all_uses_subtrees(self, client, api_headers, seed):
+        food, dairy = seed["activities"]["food"], seed["activities"]["dairy"]
+        response = client.get(
+            self.URL,
+            params={"activity_id": [food.id, dairy.id], "mode": "all"},
+            headers=api_headers,
+        )
+        assert {o["id"] for o in response.json()["results"]} == seed["recursive_org_ids"][dairy.id]
+
+    def test_all_with_unknown_activity_is_empty(self, client, api_headers, seed):
+        food = seed["activities"]["food"]
+        response = client.get(
+            self.URL,
+            params={"activity_id": [food.id, 999], "mode": "all"},
+            headers=api_headers,
+        )
+        assert response.json()["count"] == 0
+
+    def test_default_mode_is_any(self, client, api_headers, seed):
+        meat, parts = seed["activities"]["meat"], seed["activities"]["parts"]
+        response = client.get(
+            self.URL, params={"activity_id": [meat.id, parts.id]}, headers=api_headers
+        )
+        expected = seed["recursive_org_ids"][meat.id] | seed["recursive_org_ids"][parts.id]
+        assert response.json()["count"] == len(expected)
+
+    def test_missing_ids_returns_422(self, client, api_headers):
+        response = client.get(self.URL, headers=api_headers)
+        assert response.status_code == 422
+
+    def test_invalid_mode_returns_422(self, client, api_headers):
+        response = client.get(
+            self.URL, params={"activity_id": 1, "mode": "xor"}, headers=api_headers
+        )
+        assert response.status_code == 422
+
+
+class TestSparseFieldsets:
+    """fields= and expand= on organization list endpoints."""
+
+    def _by_building(self, client, api_headers, seed, **params):
+        building_id = seed["buildings"][0].id
+        return client.get(
+            f"/api/v1/organizations/by-building/{building_id}",
+            params=params,
+            headers=api_headers,
+        )
+
+    def test_default_shape_unchanged(self, client, api_headers, seed):
+        response = self._by_building(client, api_headers, seed)
+        assert all(set(o) == {"id", "name", "building_id"} for o in response.json()["results"])
+
+    def test_fields_limits_keys_and_keeps_id(self, client, api_headers, seed):
+        response = self._by_building(client, api_headers, seed, fields="name")
+        results = response.json()["results"]
+        assert results
+        assert all(set(o) == {"id", "name"} for o in results)
+
+    def test_expand_embeds_relationships(self, client, api_headers, seed):
+        response = self._by_building(
+            client, api_headers, seed, fields="id", expand="building,phones,activities"
+        )
+        results = {o["id"]: o for o in response.json()["results"]}
+        org = seed["orgs"][0]
+        item = results[org.id]
+        assert set(item) == {"id", "building", "phones", "activities"}
+        assert item["building"]["id"] == org.building_id
+        assert {p["phone_number"] for p in item["phones"]} == {
+            p.phone_number for p in seed["phones"] if p.organization_id == org.id
+        }
+        assert {a["id"] for a in item["activities"]} == {
+            act_id for org_id, act_id in seed["links"] if org_id == org.id
+        }
+
+    def test_search_distance_field(self, client, api_headers, seed):
+        b = seed["buildings"][0]
+        response = client.get(
+            "/api/v1/organizations/search",
+            params={"q": "ООО", "lat": b.latitude, "lng": b.longitude, "fields": "distance"},
+            headers=api_headers,
+        )
+        results = response.json()["results"]
+        assert results
+        assert all(set(o) == {"id", "distance"} for o in results)
+
+    def test_unknown_field_returns_422(self, client, api_headers, seed):
+        response = self._by_building(client, api_headers, seed, fields="name,distance")
+        assert response.status_code == 422
+
+    def test_unknown_expand_returns_422(self, client, api_headers, seed):
+        response = self._by_building(client, api_headers, seed, expand="owner")
+        assert response.status_code == 422
+
+    def test_expand_with_binary_format_returns_406(self, client, api_headers, seed):
+        building_id = seed["buildings"][0].id
+        response = client.get(
+            f"/api/v1/organizations/by-building/{building_id}",
+            params={"expand": "phones"},
+            headers={**api_headers, "Accept": "application/msgpack"},
+        )
+        assert response.status_code == 406
+
+    def test_fields_in_binary_format(self, client, api_headers, seed):
+        msgpack = pytest.importorskip("msgpack")
+        building_id = seed["buildings"][0].id
+        response = client.get(
+            f"/api/v1/organizations/by-building/{building_id}",
+            params={"fields": "building_id"},
+            headers={**api_headers, "Accept": "application/msgpack"},
+        )
+        body = msgpack.unpackb(response.content)
+        assert all(set(o) == {"id", "building_id"} for o in body["results"])
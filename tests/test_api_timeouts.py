@@ -0,0 +1,62 @@
+"""Tests for statement timeouts and X-Request-Timeout propagation."""
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.services.organization import OrganizationService
+
+
+def _current_timeout(db_session) -> int:
+    """Действующий statement_timeout в миллисекундах."""
+    return int(
+        db_session.execute(
+            text("SELECT setting FROM pg_settings WHERE name = 'statement_timeout'")
+        ).scalar()
+    )
+
+
+class TestStatementTimeout:
+    def test_route_default_budget_applied(self, client, api_headers, db_session):
+        response = client.get("/api/v1/buildings/", headers=api_headers)
+        assert response.status_code == 200
+        assert _current_timeout(db_session) == settings.statement_timeout_ms
+
+    def test_search_route_has_own_budget(self, client, api_headers, db_session):
+        response = client.get(
+            "/api/v1/organizations/search/name",
+            params={"q": "ООО"},
+            headers=api_headers,
+        )
+        assert response.status_code == 200
+        assert _current_timeout(db_session) == settings.statement_timeout_search_ms
+
+    def test_header_overrides_budget(self, client, api_headers, db_session):
+        headers = {**api_headers, "X-Request-Timeout": "250"}
+        response = client.get("/api/v1/buildings/", headers=headers)
+        assert response.status_code == 200
+        assert _current_timeout(db_session) == 250
+
+    def test_header_capped_by_config(self, client, api_headers, db_session):
+        headers = {**api_headers, "X-Request-Timeout": str(10 * settings.statement_timeout_max_ms)}
+        client.get("/api/v1/buildings/", headers=headers)
+        assert _current_timeout(db_session) == settings.statement_timeout_max_ms
+
+    def test_invalid_header_returns_422(self, client, api_headers):
+        headers = {**api_headers, "X-Request-Timeout": "0"}
+        response = client.get("/api/v1/buildings/", headers=headers)
+        assert response.status_code == 422
+
+    def test_cancelled_query_returns_504_with_retry_after(
+        self, client, api_headers, monkeypatch
+    ):
+        def slow_search(self, query, *, limit, offset, projection=None):
+            self.repo.db.execute(text("SELECT pg_sleep(1)"))
+            return [], 0
+
+        monkeypatch.setattr(OrganizationService, "search_by_name", slow_search)
+        headers = {**api_headers, "X-Request-Timeout": "50"}
+        response = client.get(
+            "/api/v1/organizations/search/name", params={"q": "x"}, headers=headers
+        )
+        assert response.status_code == 504
+        assert response.headers["Retry-After"] == str(settings.statement_timeout_retry_after)
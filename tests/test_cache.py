@@ -0,0 +1,71 @@
+"""Tests for the stale-while-revalidate cache."""
+
+import threading
+import time
+from contextlib import nullcontext
+
+from app.utils.cache import SWRCache
+
+
+def _make_cache(**kwargs) -> SWRCache:
+    return SWRCache("test", session_factory=lambda: nullcontext("background"), **kwargs)
+
+
+class TestSWRCache:
+    def test_fresh_entry_served_from_cache(self):
+        cache = _make_cache(ttl=60, max_stale=120)
+        calls = []
+        loader = lambda db: calls.append(db) or len(calls)  # noqa: E731
+        assert cache.get("k", loader, "request")[0] == 1
+        value, age, _ = cache.get("k", loader, "request")
+        assert value == 1
+        assert age >= 0
+        assert calls == ["request"]
+
+    def test_stale_entry_served_while_refreshing_in_background(self):
+        cache = _make_cache(ttl=0.01, max_stale=60)
+        refreshed = threading.Event()
+        calls = []
+
+        def loader(db):
+            calls.append(db)
+            if db == "background":
+                refreshed.set()
+            return len(calls)
+
+        cache.get("k", loader, "request")
+        time.sleep(0.02)
+        value, age, _ = cache.get("k", loader, "request")
+        assert value == 1
+        assert age > 0.01
+        assert refreshed.wait(timeout=5)
+        time.sleep(0.01)
+        assert cache.get("k", loader, "request")[0] == 2
+        assert calls == ["request", "background"]
+
+    def test_too_stale_entry_loaded_synchronously(self):
+        cache = _make_cache(ttl=0.01, max_stale=0.02)
+        calls = []
+        loader = lambda db: calls.append(db) or len(calls)  # noqa: E731
+        cache.get("k", loader, "request")
+        time.sleep(0.03)
+        value, age, _ = cache.get("k", loader, "request")
+        assert value == 2
+        assert age == 0.0
+        assert calls == ["request", "request"]
+
+    def test_zero_ttl_disables_cache(self):
+        cache = _make_cache(ttl=0, max_stale=0)
+        calls = []
+        loader = lambda db: calls.append(db) or len(calls)  # noqa: E731
+        cache.get("k", loader, "request")
+        cache.get("k", loader, "request")
+        assert len(calls) == 2
+
+    def test_clear_drops_entries(self):
+        cache = _make_cache(ttl=60, max_stale=120)
+        calls = []
+        loader = lambda db: calls.append(db) or len(calls)  # noqa: E731
+        cache.get("k", loader, "request")
+        cache.clear()
+        assert cache.get("k", loader, "request")[0] == 2
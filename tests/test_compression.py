@@ -0,0 +1,58 @@
+"""Tests for response compression."""
+
+import pytest
+
+from app.config import settings
+from app.middleware.compression import available_encoders, negotiate_encoding
+from app.utils.metrics import metrics
+
+
+@pytest.fixture()
+def compress_everything(monkeypatch):
+    monkeypatch.setattr(settings, "compression_min_size", 0)
+
+
+class TestNegotiation:
+    ENCODERS = {"zstd": None, "br": None, "gzip": None}
+
+    def test_server_preference_on_equal_q(self):
+        assert negotiate_encoding("gzip, br, zstd", self.ENCODERS) == "zstd"
+
+    def test_client_q_values_respected(self):
+        assert negotiate_encoding("gzip;q=1.0, br;q=0.5", self.ENCODERS) == "gzip"
+
+    def test_q_zero_excludes(self):
+        assert negotiate_encoding("gzip;q=0", self.ENCODERS) is None
+
+    def test_wildcard(self):
+        assert negotiate_encoding("*", {"gzip": None}) == "gzip"
+
+    def test_identity_only(self):
+        assert negotiate_encoding("identity", self.ENCODERS) is None
+
+
+class TestCompressionMiddleware:
+    @pytest.mark.parametrize("encoding", list(available_encoders()))
+    def test_response_compressed(self, client, api_headers, compress_everything, encoding):
+        response = client.get(
+            "/api/v1/organizations/search/name",
+            params={"q": "ООО"},
+            headers={**api_headers, "Accept-Encoding": encoding},
+        )
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert response.json()["count"] > 0
+
+    def test_small_body_not_compressed(self, client, api_headers):
+        response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+    def test_cached_body_compressed_once(self, client, api_headers, compress_everything):
+        headers = {**api_headers, "Accept-Encoding": "gzip"}
+        first = client.get("/api/v1/activities/", headers=headers)
+        hits = metrics.get("compression_cache_total", result="hit")
+        second = client.get("/api/v1/activities/", headers=headers)
+        assert first.headers["ETag"] == second.headers["ETag"]
+        assert metrics.get("compression_cache_total", result="hit") == hits + 1
+        assert second.json() == first.json()
@@ -0,0 +1,95 @@
+"""Tests for the Parquet export."""
+
+import io
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.config import settings
+from app.models import Building
+from app.services.api_key import ApiKeyService
+from app.services.export import EXPORT_TABLES, ExportService
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+class TestExportService:
+    def test_all_tables(self, db_session, seed, tmp_path):
+        counts = ExportService(db_session).export_all(tmp_path)
+        assert counts == {
+            "buildings": 3,
+            "organizations": 4,
+            "organization_phones": len(seed["phones"]),
+            "organization_activities": 6,
+            "activity_paths": 7,
+        }
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+            f"{t}.parquet" for t in EXPORT_TABLES
+        )
+
+    def test_activity_paths(self, db_session, seed, tmp_path):
+        ExportService(db_session).write_table("activity_paths", tmp_path / "a.parquet")
+        rows = {r["name"]: r for r in pq.read_table(tmp_path / "a.parquet").to_pylist()}
+        parts = rows["Запчасти"]
+        assert parts["path"] == ["Автомобили", "Легковые", "Запчасти"]
+        assert parts["path_ids"][-1] == parts["id"]
+        assert parts["root_id"] == seed["activities"]["cars"].id
+        assert rows["Еда"]["path"] == ["Еда"] and rows["Еда"]["parent_id"] is None
+
+    def test_row_groups_follow_batch_size(self, db_session, seed, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "export_batch_size", 2)
+        path = tmp_path / "links.parquet"
+        assert ExportService(db_session).write_table("organization_activities", path) == 6
+        assert pq.ParquetFile(path).num_row_groups == 3
+
+    def test_incremental_since(self, db_session, seed, tmp_path):
+        old = datetime(2020, 1, 1, tzinfo=UTC)
+        db_session.execute(
+            update(Building).where(Building.id != seed["buildings"][0].id).values(created_at=old)
+        )
+        db_session.flush()
+        since = db_session.scalar(select(func.now())) - timedelta(seconds=1)
+        path = tmp_path / "b.parquet"
+        assert ExportService(db_session).write_table("buildings", path, since=since) == 1
+        assert pq.read_table(path).column("id").to_pylist() == [seed["buildings"][0].id]
+
+    def test_failure_removes_temp_file(self, db_session, seed, tmp_path, monkeypatch):
+        service = ExportService(db_session)
+
+        def broken_stream(stmt, *, batch_size):
+            yield from ()
+            raise RuntimeError("stream failed")
+
+        monkeypatch.setattr(service.repo, "stream", broken_stream)
+        with pytest.raises(RuntimeError):
+            service.write_table("buildings", tmp_path / "b.parquet")
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestExportApi:
+    def test_download(self, client, api_headers):
+        response = client.get("/api/v1/admin/export/organizations", headers=api_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.parquet"
+        assert response.headers["x-row-count"] == "4"
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.column_names == ["id", "name", "building_id", "created_at"]
+
+    def test_unknown_table(self, client, api_headers):
+        response = client.get("/api/v1/admin/export/api_keys", headers=api_headers)
+        assert response.status_code == 422
+
+    def test_requires_export_scope(self, client, db_session):
+        _, raw_key = ApiKeyService(db_session).issue("reader", ["read"])
+        response = client.get(
+            "/api/v1/admin/export/buildings", headers={"X-API-Key": raw_key}
+        )
+        assert response.status_code == 403
+
+    def test_export_scope_allowed(self, client, db_session):
+        _, raw_key = ApiKeyService(db_session).issue("analytics", ["export"])
+        response = client.get(
+            "/api/v1/admin/export/buildings", headers={"X-API-Key": raw_key}
+        )
+        assert response.status_code == 200
@@ -0,0 +1,115 @@
+"""Tests for binary list formats (MessagePack, Arrow IPC)."""
+
+import json
+
+import pytest
+
+from app.schemas.organization import OrganizationItem, OrganizationSearchItem
+from app.utils import formats
+from app.utils.formats import ARROW_STREAM, MSGPACK, negotiate_format
+
+requires_msgpack = pytest.mark.skipif(formats.msgpack is None, reason="msgpack not installed")
+requires_arrow = pytest.mark.skipif(formats.pyarrow is None, reason="pyarrow not installed")
+
+
+class TestNegotiateFormat:
+    def test_default_is_json(self):
+        assert negotiate_format("") == "json"
+        assert negotiate_format("*/*") == "json"
+        assert negotiate_format("text/html") == "json"
+
+    @requires_msgpack
+    def test_explicit_msgpack(self):
+        assert negotiate_format(MSGPACK) == "msgpack"
+
+    @requires_arrow
+    def test_highest_q_wins(self):
+        accept = f"application/json;q=0.5, {MSGPACK};q=0.8, {ARROW_STREAM}"
+        assert negotiate_format(accept) == "arrow"
+
+    @requires_msgpack
+    def test_wildcard_does_not_select_binary(self):
+        assert negotiate_format(f"*/*, {MSGPACK};q=0.1") == "json"
+
+
+class TestJsonResponse:
+    def test_vary_accept(self, client, api_headers):
+        response = client.get("/api/v1/buildings/", headers=api_headers)
+        assert response.headers["content-type"] == "application/json"
+        assert "Accept" in response.headers["vary"]
+
+
+@requires_msgpack
+class TestMsgpackResponse:
+    def test_buildings(self, client, api_headers, seed):
+        response = client.get("/api/v1/buildings/", headers=api_headers | {"Accept": MSGPACK})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == MSGPACK
+        data = formats.msgpack.unpackb(response.content)
+        assert data["count"] == 3
+        assert data["results"][0] == {
+            "id": seed["buildings"][0].id,
+            "address": seed["buildings"][0].address,
+            "latitude": seed["buildings"][0].latitude,
+            "longitude": seed["buildings"][0].longitude,
+        }
+
+    def test_keeps_cache_headers(self, client, api_headers):
+        as_json = client.get("/api/v1/buildings/", headers=api_headers)
+        packed = client.get("/api/v1/buildings/", headers=api_headers | {"Accept": MSGPACK})
+        assert packed.headers["etag"] == as_json.headers["etag"]
+        assert "age" in packed.headers
+        assert "Accept" in packed.headers["vary"]
+
+    def test_matches_json(self, client, api_headers):
+        url = "/api/v1/organizations/search/name?q=ООО&limit=2&facets=activity"
+        as_json = client.get(url, headers=api_headers).json()
+        packed = client.get(url, headers=api_headers | {"Accept": MSGPACK})
+        assert formats.msgpack.unpackb(packed.content) == as_json
+
+
+@requires_arrow
+class TestArrowResponse:
+    def _read(self, response):
+        return formats.pyarrow.ipc.open_stream(response.content).read_all()
+
+    def test_columns_and_metadata(self, client, api_headers, seed):
+        response = client.get(
+            "/api/v1/organizations/by-building/1?limit=1",
+            headers=api_headers | {"Accept": ARROW_STREAM},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == ARROW_STREAM
+        table = self._read(response)
+        assert table.column_names == ["id", "name", "building_id"]
+        assert table.column("id").to_pylist() == [1]
+        assert json.loads(table.schema.metadata[b"count"]) == 2
+        assert json.loads(table.schema.metadata[b"next"]).endswith("offset=1")
+
+    def test_nullable_distance(self, client, api_headers):
+        response = client.get(
+            "/api/v1/organizations/search?activity_id=1",
+            headers=api_headers | {"Accept": ARROW_STREAM},
+        )
+        table = self._read(response)
+        assert str(table.schema.field("distance").type) == "double"
+        assert table.column("distance").null_count == table.num_rows == 3
+
+    def test_rows_skip_pydantic(self, client, api_headers, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("per-row model_validate on a binary path")
+
+        monkeypatch.setattr(OrganizationItem, "model_validate", fail)
+        monkeypatch.setattr(OrganizationSearchItem, "model_validate", fail)
+        for url in (
+            "/api/v1/organizations/by-building/1",
+            "/api/v1/organizations/search?q=ООО&lat=55.75&lng=37.61&radius=100000",
+        ):
+            response = client.get(url, headers=api_headers | {"Accept": ARROW_STREAM})
+            assert response.status_code == 200, url
+            assert self._read(response).num_rows > 0
+
+    def test_float_coordinates(self, client, api_headers, seed):
+        response = client.get("/api/v1/buildings/", headers=api_headers | {"Accept": ARROW_STREAM})
+        table = self._read(response)
+        assert table.column("latitude").to_pylist() == [b.latitude for b in seed["buildings"]]
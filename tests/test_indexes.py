@@ -0,0 +1,308 @@
+"""Tests for in-process search indexes."""
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.config import settings
+from app.indexes.activity import ActivityIndex
+from app.indexes.autocomplete import AutocompleteIndex, index_keys, normalize
+from app.indexes.bitmap import BitmapIndex, bitmaps_available
+from app.indexes.ngram import NgramIndex, ngrams
+from app.models.activity import Activity
+from app.models.organization import Organization, organization_activities
+from app.repositories.organization import OrganizationRepository
+from app.repositories.organization_bitmap import BitmapOrganizationRepository
+from app.repositories.organization_ngram import NgramOrganizationRepository
+from app.services.organization import OrganizationService
+from app.utils.metrics import metrics
+
+requires_bitmaps = pytest.mark.skipif(not bitmaps_available(), reason="pyroaring not installed")
+
+
+class TestActivityIndex:
+    @staticmethod
+    def _index():
+        return ActivityIndex([
+            Activity(id=3, name="Молочная продукция", parent_id=1, level=2),
+            Activity(id=1, name="Еда", parent_id=None, level=1),
+            Activity(id=2, name="Запчасти", parent_id=1, level=2),
+            Activity(id=4, name="Автомобили", parent_id=None, level=1),
+            Activity(id=5, name="Запчасти", parent_id=4, level=2),
+            Activity(id=6, name="Шины", parent_id=5, level=3),
+        ])
+
+    def test_tree_ordered_by_id(self):
+        tree = self._index().tree()
+        assert [root.id for root in tree] == [1, 4]
+        assert [child.id for child in tree[0].children] == [2, 3]
+
+    def test_path_from_root(self):
+        index = self._index()
+        assert [a.id for a in index.path(6)] == [4, 5, 6]
+        assert index.path(99) is None
+
+    def test_descendant_ids(self):
+        index = self._index()
+        assert index.descendant_ids(4) == [4, 5, 6]
+        assert index.descendant_ids(4, include_self=False) == [5, 6]
+        assert index.descendant_ids(99) == []
+
+    def test_lookup_returns_every_branch_with_path(self):
+        matches = self._index().lookup("  ЗАПЧАСТИ ", limit=10)
+        assert [[a.id for a in m.path] for m in matches] == [[1, 2], [4, 5]]
+        assert len(self._index().lookup("запчасти", limit=1)) == 1
+        assert self._index().lookup("запч", limit=10) == []
+
+
+class TestAutocompleteIndex:
+    def test_normalize_folds_case_yo_and_quotes(self):
+        assert normalize('ООО  «Ёлка»') == "ооо елка"
+        assert normalize('ООО "Мясной двор"') == "ооо мясной двор"
+
+    def test_keys_start_at_every_word(self):
+        assert index_keys('ООО "Молочный мир"') == [
+            "ооо молочный мир", "молочный мир", "мир",
+        ]
+
+    def test_lookup_by_word_prefix(self, db_session):
+        index = AutocompleteIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        assert [org_id for org_id, _ in index.lookup("МОЛ", limit=10)] == [2]
+        assert [org_id for org_id, _ in index.lookup('"мир', limit=10)] == [2]
+
+    def test_lookup_respects_limit_and_dedupes(self, db_session, seed):
+        index = AutocompleteIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        assert len(index.lookup("ооо", limit=2)) == 2
+        ids = [org_id for org_id, _ in index.lookup("ооо", limit=10)]
+        assert sorted(ids) == sorted(o.id for o in seed["orgs"])
+
+    def test_new_organizations_merged_incrementally(self, db_session):
+        index = AutocompleteIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        before = metrics.get("index_refresh_total", index="autocomplete", kind="delta")
+
+        db_session.add(Organization(id=10, name='ИП "Молоко"', building_id=1))
+        db_session.flush()
+        index.ensure_fresh(db_session)
+
+        assert metrics.get("index_refresh_total", index="autocomplete", kind="delta") == before + 1
+        assert {org_id for org_id, _ in index.lookup("мол", limit=10)} == {2, 10}
+
+    def test_rename_triggers_rebuild(self, db_session):
+        index = AutocompleteIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        before = metrics.get("index_refresh_total", index="autocomplete", kind="rebuild")
+
+        db_session.execute(
+            update(Organization).where(Organization.id == 1).values(name="Зебра Уникальная")
+        )
+        index.ensure_fresh(db_session)
+
+        assert metrics.get("index_refresh_total", index="autocomplete", kind="rebuild") == before + 1
+        assert index.lookup("зебра", limit=10) == [(1, "Зебра Уникальная")]
+        assert index.lookup("рога", limit=10) == []
+
+    def test_delete_triggers_rebuild(self, db_session):
+        index = AutocompleteIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        db_session.delete(db_session.get(Organization, 4))
+        db_session.add(Organization(id=11, name="Сырная лавка", building_id=1))
+        db_session.flush()
+        index.ensure_fresh(db_session)
+        assert index.lookup("мясной", limit=10) == []
+        assert index.lookup("сыр", limit=10) == [(11, "Сырная лавка")]
+
+    def test_reports_memory_usage(self, db_session):
+        index = AutocompleteIndex(refresh_interval=0)
+        empty = index.memory_usage()
+        index.ensure_fresh(db_session)
+        assert index.memory_usage() > empty
+
+
+class TestNgramIndex:
+    def test_ngrams(self):
+        assert ngrams("молоко") == {"мол", "оло", "лок", "око"}
+        assert ngrams("мо") == set()
+
+    def test_substring_search_is_case_insensitive(self, db_session):
+        index = NgramIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        assert index.search("МОЛОЧН") == [2]
+        assert index.search("двор") == [4]
+
+    def test_candidates_are_verified(self, db_session):
+        index = NgramIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        # единственная триграмма «ооо» есть во всех названиях, подстроки нет ни в одном
+        assert index.search("ооооо") == []
+
+    def test_short_query_scans_all_names(self, db_session, seed):
+        index = NgramIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        assert index.search("оо") == sorted(o.id for o in seed["orgs"])
+
+    def test_new_organizations_appended(self, db_session):
+        index = NgramIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        db_session.add(Organization(id=12, name="Молочная ферма", building_id=2))
+        db_session.flush()
+        index.ensure_fresh(db_session)
+        assert index.search("молочн") == [2, 12]
+
+    def test_delta_does_not_mutate_current_snapshot(self, db_session):
+        index = NgramIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        snapshot = index._snapshot
+        postings = {gram: list(ids) for gram, ids in snapshot.postings.items()}
+        db_session.add(Organization(id=13, name="Молочная ферма", building_id=2))
+        db_session.flush()
+        index.ensure_fresh(db_session)
+
+        assert index._snapshot is not snapshot
+        assert {gram: list(ids) for gram, ids in snapshot.postings.items()} == postings
+        assert 13 not in snapshot.folded and 13 not in snapshot.ids
+
+    def test_rename_triggers_rebuild(self, db_session):
+        index = NgramIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        db_session.execute(
+            update(Organization).where(Organization.id == 2).values(name="Сырная лавка")
+        )
+        index.ensure_fresh(db_session)
+        assert index.search("молочн") == []
+        assert index.search("сырн") == [2]
+
+    def test_reports_memory_usage(self, db_session):
+        index = NgramIndex(refresh_interval=0)
+        empty = index.memory_usage()
+        index.ensure_fresh(db_session)
+        assert index.memory_usage() > empty
+
+
+class TestNgramOrganizationRepository:
+    @pytest.mark.parametrize("query", ["ООО", "мол", "о", "КОПЫТ", "нет такого"])
+    def test_matches_database_engine(self, db_session, query):
+        db_items, db_total = OrganizationRepository(db_session).search_by_name(
+            query, limit=100, offset=0
+        )
+        items, total = NgramOrganizationRepository(db_session).search_by_name(
+            query, limit=100, offset=0
+        )
+        assert total == db_total
+        assert [o.id for o in items] == sorted(o.id for o in db_items)
+
+    def test_pages_over_sorted_ids(self, db_session, seed):
+        items, total = NgramOrganizationRepository(db_session).search_by_name(
+            "ООО", limit=2, offset=2
+        )
+        assert total == seed["org_count"]
+        assert [o.id for o in items] == sorted(o.id for o in seed["orgs"])[2:4]
+
+    def test_selected_by_config(self, client, api_headers, monkeypatch):
+        monkeypatch.setattr(settings, "name_search_engine", "ngram")
+        response = client.get(
+            "/api/v1/organizations/search/name", params={"q": "мир"}, headers=api_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["count"] == 1
+        assert response.json()["results"][0]["id"] == 2
+
+
+@requires_bitmaps
+class TestBitmapIndex:
+    def test_activity_bitmaps_roll_up_subtree(self, db_session, seed):
+        index = BitmapIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        for act_id, org_ids in seed["recursive_org_ids"].items():
+            assert set(index.select(activity_ids=[act_id])) == org_ids
+
+    def test_and_or_with_building(self, db_session, seed):
+        index = BitmapIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        meat, dairy = seed["activities"]["meat"].id, seed["activities"]["dairy"].id
+        assert list(index.select(activity_ids=[meat, dairy], match_all=True)) == [1]
+        assert list(index.select(activity_ids=[meat, dairy], building_id=3)) == [4]
+        assert len(index.select(building_id=1)) == seed["orgs_in_building"][1]
+
+    def test_link_change_triggers_rebuild(self, db_session, seed):
+        index = BitmapIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        parts = seed["activities"]["parts"].id
+        db_session.execute(
+            organization_activities.insert().values(organization_id=4, activity_id=parts)
+        )
+        index.ensure_fresh(db_session)
+        assert set(index.select(activity_ids=[parts])) == {3, 4}
+
+    def test_membership_swap_triggers_rebuild(self, db_session, seed):
+        index = BitmapIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        # org 3 и org 4 меняются зданиями и видами деятельности: набор пар
+        # (здание, поддеревья), число организаций и max id не меняются
+        acts = seed["activities"]
+        db_session.execute(update(Organization).where(Organization.id == 3).values(building_id=3))
+        db_session.execute(update(Organization).where(Organization.id == 4).values(building_id=2))
+        db_session.execute(
+            delete(organization_activities).where(
+                organization_activities.c.organization_id.in_([3, 4])
+            )
+        )
+        db_session.execute(
+            organization_activities.insert(),
+            [
+                {"organization_id": 3, "activity_id": acts["meat"].id},
+                {"organization_id": 4, "activity_id": acts["passenger"].id},
+                {"organization_id": 4, "activity_id": acts["parts"].id},
+            ],
+        )
+        index.ensure_fresh(db_session)
+        assert list(index.select(building_id=2)) == [4]
+        assert list(index.select(activity_ids=[acts["meat"].id], building_id=3)) == [3]
+
+    def test_reports_memory_usage(self, db_session):
+        index = BitmapIndex(refresh_interval=0)
+        index.ensure_fresh(db_session)
+        assert index.memory_usage() > 0
+
+
+@requires_bitmaps
+class TestBitmapOrganizationRepository:
+    def test_matches_database_engine(self, db_session, seed):
+        db_repo = OrganizationRepository(db_session)
+        bitmap_repo = BitmapOrganizationRepository(db_session)
+        for act_id in seed["activities"].values():
+            for match_all in (False, True):
+                expected = db_repo.get_by_activity_subtrees(
+                    [act_id.id, 2], match_all=match_all, limit=100, offset=0
+                )
+                actual = bitmap_repo.get_by_activity_subtrees(
+                    [act_id.id, 2], match_all=match_all, limit=100, offset=0
+                )
+                assert [o.id for o in actual[0]] == [o.id for o in expected[0]]
+                assert actual[1] == expected[1]
+
+    def test_pages_over_sorted_ids(self, db_session):
+        items, total = BitmapOrganizationRepository(db_session).get_by_building_id(
+            1, limit=1, offset=1
+        )
+        assert total == 2
+        assert [o.id for o in items] == [2]
+
+    def test_selected_by_config(self, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "bitmap_index_enabled", True)
+        monkeypatch.setattr(settings, "name_search_engine", "ngram")
+        repo = OrganizationService(db_session).repo
+        assert isinstance(repo, BitmapOrganizationRepository)
+        assert isinstance(repo, NgramOrganizationRepository)
+
+    def test_combined_search_served_from_bitmaps(self, client, api_headers, monkeypatch, seed):
+        monkeypatch.setattr(settings, "bitmap_index_enabled", True)
+        food = seed["activities"]["food"].id
+        response = client.get(
+            "/api/v1/organizations/search",
+            params={"activity_id": food, "building_id": 1},
+            headers=api_headers,
+        )
+        assert [o["id"] for o in response.json()["results"]] == [1, 2]
+        assert response.json()["count"] == 2
@@ -0,0 +1,82 @@
+"""Tests for per-API-key rate limiting."""
+
+import uuid
+
+import pytest
+from sqlalchemy import delete
+
+from app.config import settings
+from app.database import engine
+from app.models.rate_limit import RateLimitBucket
+from app.utils import formats
+from app.utils.formats import MSGPACK
+from app.utils.ratelimit import InMemoryRateLimitStore, PostgresRateLimitStore
+
+
+class TestRateLimitApi:
+    def test_headers_present(self, client, api_headers):
+        response = client.get("/api/v1/buildings/", headers=api_headers)
+        assert response.status_code == 200
+        assert response.headers["RateLimit-Limit"] == str(settings.rate_limit_capacity)
+        assert int(response.headers["RateLimit-Remaining"]) < settings.rate_limit_capacity
+
+    def test_headers_on_endpoints_returning_response(self, client, api_headers):
+        for url in ("/api/v1/organizations/1", "/api/v1/tiles/12/0/0"):
+            response = client.get(url, headers=api_headers)
+            assert response.status_code == 200, url
+            assert response.headers["RateLimit-Limit"] == str(settings.rate_limit_capacity), url
+
+    @pytest.mark.skipif(formats.msgpack is None, reason="msgpack not installed")
+    def test_headers_on_binary_format(self, client, api_headers):
+        response = client.get("/api/v1/buildings/", headers=api_headers | {"Accept": MSGPACK})
+        assert response.headers["content-type"] == MSGPACK
+        assert response.headers["RateLimit-Limit"] == str(settings.rate_limit_capacity)
+
+    def test_exhausted_bucket_returns_429(self, client, api_headers, monkeypatch):
+        monkeypatch.setattr(settings, "rate_limit_capacity", 2)
+        monkeypatch.setattr(settings, "rate_limit_refill_per_second", 0.01)
+        assert client.get("/api/v1/buildings/", headers=api_headers).status_code == 200
+        assert client.get("/api/v1/buildings/", headers=api_headers).status_code == 200
+        response = client.get("/api/v1/buildings/", headers=api_headers)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert response.headers["RateLimit-Remaining"] == "0"
+
+    def test_geo_search_costs_more(self, client, api_headers):
+        cheap = client.get("/api/v1/buildings/", headers=api_headers)
+        geo = client.get(
+            "/api/v1/organizations/search/radius",
+            params={"lat": 55.75, "lng": 37.61, "radius": 100},
+            headers=api_headers,
+        )
+        spent = int(cheap.headers["RateLimit-Remaining"]) - int(geo.headers["RateLimit-Remaining"])
+        assert spent >= settings.rate_limit_route_costs["search_organizations_in_radius"] - 1
+
+
+@pytest.fixture()
+def bucket_key():
+    """Unique bucket key; the Postgres store commits, so its row is deleted afterwards."""
+    key = f"test:{uuid.uuid4()}"
+    yield key
+    with engine.begin() as conn:
+        conn.execute(delete(RateLimitBucket).where(RateLimitBucket.key == key))
+
+
+class TestRateLimitStores:
+    def _exercise(self, store, key):
+        first = store.consume(key, 3, capacity=5, refill_rate=0.001)
+        second = store.consume(key, 3, capacity=5, refill_rate=0.001)
+        assert first.allowed
+        assert round(first.remaining) == 2
+        assert not second.allowed
+        assert second.retry_after(3) > 0
+
+    def test_in_memory_store(self, bucket_key):
+        self._exercise(InMemoryRateLimitStore(), bucket_key)
+
+    def test_postgres_store(self, bucket_key):
+        self._exercise(PostgresRateLimitStore(), bucket_key)
+
+    def test_cost_above_capacity_never_allowed(self, bucket_key):
+        result = PostgresRateLimitStore().consume(bucket_key, 10, capacity=5, refill_rate=1)
+        assert not result.allowed
@@ -1,8 +1,18 @@
 """Unit tests for the repository layer."""
 
+import json
+
+import pytest
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import InvalidRequestError
+
+from app.models.activity import Activity
+from app.models.building import Building
+from app.models.organization import Organization, OrganizationPhone, organization_activities
 from app.repositories.activity import ActivityRepository
 from app.repositories.building import BuildingRepository
 from app.repositories.organization import OrganizationRepository
+from app.schemas.organization import OrganizationRead
 
 # Large limit to fetch all items in repo tests
 ALL = dict(limit=100, offset=0)
@@ -89,6 +99,166 @@ class TestOrganizationRepository:
         items, total = repo.search_in_rectangle(0.0, 0.1, 0.0, 0.1, **ALL)
         assert total == 0
 
+    def test_capped_pages_come_from_first_ids(self, db_session, seed):
+        # UPDATE переносит строку в конец heap: без ORDER BY она выпала бы из кандидатов.
+        db_session.execute(
+            update(Organization).where(Organization.id == 1).values(name="ООО Первая")
+        )
+        db_session.flush()
+        repo = OrganizationRepository(db_session)
+        pages = [
+            repo.search_by_name("ООО", limit=1, offset=offset, max_rows=3)
+            for offset in range(4)
+        ]
+        assert [[o.id for o in items] for items, _ in pages] == [[1], [2], [3], []]
+        assert {total for _, total in pages} == {3}
+
+    def test_pages_follow_id_order(self, db_session, seed):
+        db_session.execute(
+            update(Organization).where(Organization.id == 1).values(name="ООО Первая")
+        )
+        db_session.flush()
+        repo = OrganizationRepository(db_session)
+        pages = [repo.get_by_building_id(1, limit=1, offset=offset) for offset in range(2)]
+        assert [[o.id for o in items] for items, _ in pages] == [[1], [2]]
+
+
+class TestOrganizationProjection:
+    @staticmethod
+    def _capture(db_session) -> list[str]:
+        statements: list[str] = []
+        event.listen(
+            db_session.connection(), "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        return statements
+
+    def test_select_list_has_only_requested_columns(self, db_session, seed):
+        building_id = seed["buildings"][0].id
+        db_session.expunge_all()
+        statements = self._capture(db_session)
+        repo = OrganizationRepository(db_session).with_projection(["name"], [])
+        items, _ = repo.get_by_building_id(building_id, **ALL)
+
+        page_sql = statements[0]
+        assert "organizations.name" in page_sql
+        assert "organizations.building_id" not in page_sql.split("WHERE")[0]
+        assert all(org.name for org in items)
+        with pytest.raises(InvalidRequestError):
+            items[0].building_id
+
+    def test_expanded_relationships_load_in_one_query_each(self, db_session, seed):
+        db_session.expunge_all()
+        statements = self._capture(db_session)
+        repo = OrganizationRepository(db_session).with_projection([], ["building", "phones"])
+        items, total = repo.search_by_name("ООО", **ALL)
+
+        assert total == len(seed["orgs"])
+        assert sum("FROM organization_phones" in sql for sql in statements) == 1
+        assert sum("FROM buildings" in sql for sql in statements) == 1
+        assert {org.building.id for org in items} == {b.id for b in seed["buildings"]}
+        assert sum(len(org.phones) for org in items) == len(seed["phones"])
+
+
+class TestActivityIdArrays:
+    """organizations.activity_ids / ancestor_activity_ids are maintained by triggers."""
+
+    @staticmethod
+    def _arrays(db_session, org_id):
+        return db_session.execute(
+            select(Organization.activity_ids, Organization.ancestor_activity_ids)
+            .where(Organization.id == org_id)
+        ).one()
+
+    def test_arrays_filled_on_link_insert(self, db_session, seed):
+        direct, ancestors = self._arrays(db_session, 3)
+        # org3 → passenger(6), parts(7); parts → passenger → cars(4)
+        assert direct == [6, 7]
+        assert ancestors == [4, 6, 7]
+
+    def test_link_delete_updates_arrays(self, db_session):
+        db_session.execute(
+            delete(organization_activities).where(
+                organization_activities.c.organization_id == 1,
+                organization_activities.c.activity_id == 2,
+            )
+        )
+        assert self._arrays(db_session, 1) == ([3], [1, 3])
+
+    def test_reparenting_activity_updates_ancestors(self, db_session):
+        # dairy(3) переносится из «Еды»(1) в «Автомобили»(4); org2 → dairy
+        db_session.execute(update(Activity).where(Activity.id == 3).values(parent_id=4))
+        assert self._arrays(db_session, 2) == ([3], [3, 4])
+
+    def test_subtree_search_all(self, db_session, seed):
+        repo = OrganizationRepository(db_session)
+        meat, dairy = seed["activities"]["meat"].id, seed["activities"]["dairy"].id
+        items, total = repo.get_by_activity_subtrees([meat, dairy], match_all=True, **ALL)
+        assert [o.id for o in items] == [1]
+
+
+class TestOrganizationDocuments:
+    """organization_documents is refreshed by triggers when source rows change."""
+
+    @staticmethod
+    def _document(db_session, org_id):
+        return json.loads(OrganizationRepository(db_session).get_document(org_id))
+
+    def test_document_matches_read_schema(self, db_session, seed):
+        for org in seed["orgs"]:
+            expected = OrganizationRead.model_validate(
+                OrganizationRepository(db_session).get_by_id(org.id)
+            ).model_dump()
+            document = self._document(db_session, org.id)
+            document["phones"].sort(key=lambda p: p["id"])
+            expected["phones"].sort(key=lambda p: p["id"])
+            expected["activities"].sort(key=lambda a: a["id"])
+            assert document == expected
+
+    def test_refreshed_on_phone_insert(self, db_session):
+        db_session.add(OrganizationPhone(organization_id=4, phone_number="1-111-111"))
+        db_session.flush()
+        phones = self._document(db_session, 4)["phones"]
+        assert [p["phone_number"] for p in phones] == ["1-111-111"]
+
+    def test_refreshed_on_building_and_activity_update(self, db_session):
+        db_session.execute(update(Building).where(Building.id == 1).values(address="Новый адрес"))
+        db_session.execute(update(Activity).where(Activity.id == 3).values(name="Молоко"))
+        document = self._document(db_session, 2)
+        assert document["building"]["address"] == "Новый адрес"
+        assert document["activities"][0]["name"] == "Молоко"
+
+    def test_removed_with_organization(self, db_session):
+        db_session.execute(delete(Organization).where(Organization.id == 3))
+        assert OrganizationRepository(db_session).get_document(3) is None
+
+
+class TestBuildingOrganizationCount:
+    """buildings.organization_count is maintained by a trigger on organizations."""
+
+    @staticmethod
+    def _counts(db_session):
+        return dict(db_session.execute(select(Building.id, Building.organization_count)).all())
+
+    def test_seeded_counts(self, db_session, seed):
+        assert self._counts(db_session) == {1: 2, 2: 1, 3: 1}
+
+    def test_insert_move_delete(self, db_session, seed):
+        db_session.add(Organization(id=5, name='ООО "Новая"', building_id=3))
+        db_session.flush()
+        assert self._counts(db_session) == {1: 2, 2: 1, 3: 2}
+
+        db_session.execute(update(Organization).where(Organization.id == 5).values(building_id=2))
+        assert self._counts(db_session) == {1: 2, 2: 2, 3: 1}
+
+        db_session.execute(update(Organization).where(Organization.id == 5).values(name="Другая"))
+        db_session.execute(delete(Organization).where(Organization.id == 5))
+        assert self._counts(db_session) == {1: 2, 2: 1, 3: 1}
+
+    def test_order_by_count(self, db_session, seed):
+        items, _ = BuildingRepository(db_session).get_all(**ALL, order="-organization_count")
+        assert [b.id for b in items] == [1, 3, 2]
+
 
 class TestActivityRepository:
     def test_get_all(self, db_session, seed):
@@ -3,9 +3,13 @@
 import pytest
 from fastapi import HTTPException
 
+from app.config import settings
+from app.schemas.facet import FacetRequest
+from app.schemas.organization import OrganizationSearchParams
 from app.services.activity import ActivityService
 from app.services.building import BuildingService
 from app.services.organization import OrganizationService
+from app.utils.metrics import metrics
 
 # Large limit to fetch all items in service/repo tests
 ALL = dict(limit=100, offset=0)
@@ -126,3 +130,63 @@ class TestBuildingService:
         items, total = service.get_all(**ALL)
         assert total == seed["building_count"]
         assert len(items) == total
+
+
+class TestCostGuard:
+    def test_small_radius_runs_exact(self, db_session, seed):
+        service = OrganizationService(db_session)
+        b = seed["moscow_buildings"][0]
+        items, total = service.search_in_radius(b.latitude, b.longitude, 1000, **ALL)
+        assert total == len(items)
+
+    def test_estimated_count_keeps_exact_total_on_last_page(
+        self, db_session, seed, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "cost_guard_exact_area_km2", 0)
+        service = OrganizationService(db_session)
+        items, total = service.search_in_rectangle(54, 56, 37, 83, **ALL)
+        assert total == len(items) == seed["org_count"]
+
+    def test_capped_limits_candidates(self, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "cost_guard_exact_area_km2", 0)
+        monkeypatch.setattr(settings, "cost_guard_estimate_area_km2", 0)
+        monkeypatch.setattr(settings, "cost_guard_candidate_cap", 2)
+        service = OrganizationService(db_session)
+        items, total = service.search_in_rectangle(54, 56, 37, 83, **ALL)
+        assert total == 2
+        assert len(items) == 2
+        items, _ = service.search_in_rectangle(54, 56, 37, 83, limit=10, offset=2)
+        assert items == []
+
+    def test_capped_facets_follow_search_order(self, db_session, seed, monkeypatch):
+        monkeypatch.setattr(settings, "cost_guard_exact_area_km2", 0)
+        monkeypatch.setattr(settings, "cost_guard_estimate_area_km2", 0)
+        monkeypatch.setattr(settings, "cost_guard_candidate_cap", 1)
+        far = seed["buildings"][2]
+        params = OrganizationSearchParams(
+            lat=far.latitude, lng=far.longitude, radius=3_500_000, order="distance"
+        )
+        service = OrganizationService(db_session)
+        items, _ = service.search(params, **ALL)
+        facets = service.get_facets(params, FacetRequest(kinds={"building"}, size=10))
+        assert [bucket.id for bucket in facets.building] == [far.id]
+        assert [item.id for item in items] == [seed["orgs"][3].id]
+
+    def test_oversized_area_rejected(self, db_session):
+        service = OrganizationService(db_session)
+        with pytest.raises(HTTPException) as exc_info:
+            service.search_in_radius(55.75, 37.61, 40_075_000, **ALL)
+        assert exc_info.value.status_code == 422
+        assert "км²" in exc_info.value.detail
+
+    def test_short_name_query_uses_estimate(self, db_session, seed):
+        service = OrganizationService(db_session)
+        before = metrics.get(
+            "cost_guard_decisions_total", query="name", decision="estimated_count"
+        )
+        items, total = service.search_by_name("О", **ALL)
+        assert total == len(items) == seed["org_count"]
+        after = metrics.get(
+            "cost_guard_decisions_total", query="name", decision="estimated_count"
+        )
+        assert after == before + 1
@@ -0,0 +1,167 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.database import STATEMENT_TIMEOUT_KEY
+from app.schemas.organization import OrganizationList, OrganizationProjection, OrganizationRead
+from app.services.organization import OrganizationService
+from app.utils.metrics import metrics
+from app.utils.singleflight import SingleFlight, SingleFlightTimeout, coalesce, normalize_args
+
+
+class TestSingleFlight:
+    def test_concurrent_threads_share_one_execution(self):
+        group = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "result"
+
+        before = metrics.get("singleflight_coalesced_total", call="test.threads")
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [
+                pool.submit(group.do, "key", slow, name="test.threads") for _ in range(5)
+            ]
+            while metrics.get("singleflight_coalesced_total", call="test.threads") < before + 4:
+                time.sleep(0.01)
+            release.set()
+            results = [f.result(timeout=5) for f in futures]
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+
+    def test_sequential_calls_execute_again(self):
+        group = SingleFlight()
+        calls = []
+        group.do("key", lambda: calls.append(1))
+        group.do("key", lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_exception_propagates_to_caller(self):
+        group = SingleFlight()
+
+        def boom():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            group.do("key", boom)
+
+    def test_follower_waits_at_most_its_timeout(self):
+        group = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(timeout=5)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            leader = pool.submit(group.do, "key", slow)
+            started.wait(timeout=5)
+            with pytest.raises(SingleFlightTimeout):
+                group.do("key", slow, timeout=0.05)
+            release.set()
+            assert leader.result(timeout=5) == "result"
+
+    def test_async_follower_timeout_keeps_leader_result(self):
+        group = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.1)
+            return 42
+
+        async def run():
+            leader = asyncio.ensure_future(group.do_async("key", slow))
+            await asyncio.sleep(0)
+            with pytest.raises(SingleFlightTimeout):
+                await group.do_async("key", slow, timeout=0.01)
+            return await leader
+
+        assert asyncio.run(run()) == 42
+
+    def test_async_callers_share_one_execution(self):
+        group = SingleFlight()
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        async def run():
+            return await asyncio.gather(
+                *(group.do_async("key", slow, name="test.async") for _ in range(5))
+            )
+
+        assert asyncio.run(run()) == [42] * 5
+        assert len(calls) == 1
+
+
+class TestCoalesceDecorator:
+    def test_key_ignores_case_and_kwarg_order(self):
+        a = normalize_args(("Молоко",), {"limit": 10, "offset": 0})
+        b = normalize_args(("мОЛОКО",), {"offset": 0, "limit": 10})
+        assert a == b
+
+    def test_key_includes_projection(self):
+        names = OrganizationProjection(fields=frozenset({"id", "name"}))
+        expanded = OrganizationProjection(fields=frozenset({"id"}), expand=frozenset({"phones"}))
+        same = OrganizationProjection(fields=frozenset({"name", "id"}))
+        assert normalize_args((1,), {"projection": names}) != normalize_args(
+            (1,), {"projection": expanded}
+        )
+        assert normalize_args((1,), {"projection": names}) == normalize_args(
+            (1,), {"projection": same}
+        )
+
+    def test_decorated_method_returns_result(self):
+        class Service:
+            @coalesce("test.service")
+            def get(self, value, *, limit):
+                return value * limit
+
+        assert Service().get(2, limit=3) == 6
+
+    def test_different_statement_timeouts_not_coalesced(self):
+        release = threading.Event()
+        calls = []
+
+        class Session:
+            def __init__(self, timeout_ms):
+                self.info = {STATEMENT_TIMEOUT_KEY: timeout_ms}
+
+        class Service:
+            def __init__(self, timeout_ms):
+                self.db = Session(timeout_ms)
+
+            @coalesce("test.budget")
+            def get(self):
+                calls.append(self.db.info[STATEMENT_TIMEOUT_KEY])
+                release.wait(timeout=5)
+                return len(calls)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            short = pool.submit(Service(1000).get)
+            long = pool.submit(Service(5000).get)
+            while len(calls) < 2:
+                time.sleep(0.01)
+            release.set()
+            short.result(timeout=5)
+            long.result(timeout=5)
+
+        assert sorted(calls) == [1000, 5000]
+
+    def test_coalesced_methods_return_dtos(self, db_session, seed):
+        service = OrganizationService(db_session)
+        org = seed["orgs"][0]
+        assert isinstance(service.get_by_id(org.id), OrganizationRead)
+        items, _ = service.get_by_building(org.building_id, limit=10, offset=0)
+        assert items and all(isinstance(item, OrganizationList) for item in items)
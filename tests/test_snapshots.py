@@ -0,0 +1,88 @@
+"""Tests for directory snapshots."""
+
+import gzip
+import hashlib
+import json
+
+import pytest
+
+from app.config import settings
+from app.services.snapshot import SnapshotService, latest_manifest
+
+
+@pytest.fixture()
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "snapshot_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture()
+def manifest(db_session, snapshot_dir):
+    return SnapshotService(db_session).build()
+
+
+class TestSnapshotBuild:
+    def test_file_contains_directory(self, manifest, snapshot_dir, seed):
+        path = snapshot_dir / f"directory-{manifest.version}.json.gz"
+        data = json.loads(gzip.decompress(path.read_bytes()))
+
+        assert data["version"] == manifest.version
+        assert data["since"] == manifest.since
+        assert [b["id"] for b in data["buildings"]] == [b.id for b in seed["buildings"]]
+        assert {a["name"] for a in data["activities"]} == {"Еда", "Автомобили"}
+        orgs = {o["id"]: o for o in data["organizations"]}
+        assert set(orgs) == {o.id for o in seed["orgs"]}
+        first = orgs[seed["orgs"][0].id]
+        assert first["phones"] and first["activities"] and first["building"]
+
+    def test_manifest_counts_and_checksum(self, manifest, snapshot_dir):
+        assert (manifest.buildings, manifest.activities, manifest.organizations) == (3, 7, 4)
+        content = (snapshot_dir / f"directory-{manifest.version}.json.gz").read_bytes()
+        assert manifest.size == len(content)
+        assert manifest.sha256 == hashlib.sha256(content).hexdigest()
+        assert latest_manifest() == manifest
+
+    def test_old_versions_pruned(self, db_session, snapshot_dir, monkeypatch):
+        monkeypatch.setattr(settings, "snapshot_keep", 2)
+        versions = [SnapshotService(db_session).build().version for _ in range(3)]
+        files = sorted(p.name for p in snapshot_dir.glob("directory-*.json.gz"))
+        assert files == [f"directory-{v}.json.gz" for v in versions[1:]]
+
+
+class TestSnapshotApi:
+    def test_no_snapshot_yet(self, client, api_headers, snapshot_dir):
+        response = client.get("/api/v1/snapshots/latest", headers=api_headers)
+        assert response.status_code == 404
+
+    def test_latest_and_download(self, client, api_headers, manifest):
+        latest = client.get("/api/v1/snapshots/latest", headers=api_headers).json()
+        assert latest["version"] == manifest.version
+
+        response = client.get(latest["url"], headers=api_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["etag"] == f'"{manifest.version}"'
+        assert "content-encoding" not in response.headers
+        assert hashlib.sha256(response.content).hexdigest() == manifest.sha256
+
+    def test_range_request(self, client, api_headers, manifest):
+        response = client.get(
+            manifest.url, headers=api_headers | {"Range": "bytes=10-19"}
+        )
+        assert response.status_code == 206
+        assert len(response.content) == 10
+
+    def test_not_modified(self, client, api_headers, manifest):
+        response = client.get(
+            manifest.url,
+            headers=api_headers | {"If-None-Match": f'"{manifest.version}"'},
+        )
+        assert response.status_code == 304
+
+    def test_unknown_version(self, client, api_headers, snapshot_dir):
+        response = client.get("/api/v1/snapshots/" + "1" * 20, headers=api_headers)
+        assert response.status_code == 404
+
+    def test_invalid_version(self, client, api_headers, snapshot_dir):
+        response = client.get("/api/v1/snapshots/..%2Fsecret", headers=api_headers)
+        assert response.status_code in (404, 422)
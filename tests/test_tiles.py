@@ -0,0 +1,124 @@
+"""Tests for binary building tiles."""
+
+from sqlalchemy import delete, insert, text, update
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import Building, ChangeLog, RateLimitBucket
+from app.repositories.change_log import ChangeLogRepository
+from app.utils.geo import mercator_cell
+from app.utils.metrics import metrics
+from app.utils.tiles import MEDIA_TYPE, TilePoint, decode_tile, encode_tile, quantize
+
+
+def _tile_url(lat, lng, z):
+    x, y = mercator_cell(lat, lng, 2**z)
+    return f"/api/v1/tiles/{z}/{x}/{y}"
+
+
+class TestTileFormat:
+    def test_roundtrip(self):
+        points = [TilePoint(7, 10, 4000, 0), TilePoint(3, 4095, 0, 12), TilePoint(1000, 0, 5, 1)]
+        extent, decoded = decode_tile(encode_tile(points, 4096))
+        assert extent == 4096
+        assert decoded == sorted(points)
+
+    def test_compact(self):
+        points = [TilePoint(i, i % 64, i % 64, 1) for i in range(1, 1001)]
+        assert len(encode_tile(points, 4096)) < 5 * len(points)
+
+    def test_quantize_inside_tile(self):
+        lat, lng, z = 55.7558, 37.6173, 12
+        x, y = mercator_cell(lat, lng, 2**z)
+        px, py = quantize(lat, lng, z, x, y, 4096)
+        assert 0 <= px < 4096 and 0 <= py < 4096
+
+
+class TestTileApi:
+    def test_buildings_in_tile(self, client, api_headers, seed):
+        first = seed["buildings"][0]
+        response = client.get(_tile_url(first.latitude, first.longitude, 12), headers=api_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == MEDIA_TYPE
+        _, points = decode_tile(response.content)
+        by_id = {p.id: p for p in points}
+        assert set(by_id) == {1, 2}
+        assert by_id[1].organization_count == 2
+        assert by_id[2].organization_count == 1
+
+    def test_cached_until_data_changes(self, client, api_headers, db_session, seed):
+        url = _tile_url(seed["buildings"][2].latitude, seed["buildings"][2].longitude, 14)
+        first = client.get(url, headers=api_headers)
+        before = metrics.get("tile_cache_total", result="hit")
+        again = client.get(url, headers=api_headers)
+        assert metrics.get("tile_cache_total", result="hit") == before + 1
+        assert again.headers["etag"] == first.headers["etag"]
+
+        db_session.execute(update(Building).where(Building.id == 3).values(address="Новый адрес"))
+        db_session.flush()
+        changed = client.get(url, headers=api_headers)
+        assert changed.headers["etag"] != first.headers["etag"]
+
+    def test_not_modified(self, client, api_headers, seed):
+        url = _tile_url(seed["buildings"][0].latitude, seed["buildings"][0].longitude, 12)
+        etag = client.get(url, headers=api_headers).headers["etag"]
+        response = client.get(url, headers=api_headers | {"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_empty_tile(self, client, api_headers):
+        response = client.get("/api/v1/tiles/12/0/0", headers=api_headers)
+        assert decode_tile(response.content)[1] == []
+
+    def test_out_of_grid(self, client, api_headers):
+        response = client.get("/api/v1/tiles/12/4096/0", headers=api_headers)
+        assert response.status_code == 404
+
+    def test_zoom_below_min(self, client, api_headers):
+        response = client.get("/api/v1/tiles/2/1/1", headers=api_headers)
+        assert response.status_code == 422
+
+
+class TestDataVersion:
+    def _watermark(self):
+        with Session(engine) as session:
+            return ChangeLogRepository(session).get_watermark()
+
+    def _log(self, conn):
+        return conn.execute(
+            insert(ChangeLog)
+            .values(entity="building", entity_id=1, operation="updated")
+            .returning(ChangeLog.id)
+        ).scalar_one()
+
+    def test_late_commit_of_lower_id_changes_version(self, setup_database):
+        pinned, early, late = engine.connect(), engine.connect(), engine.connect()
+        ids = []
+        try:
+            # Старая транзакция держит xmin: коммит early его не сдвинет
+            pinned.begin()
+            pinned.execute(text("SELECT pg_current_xact_id()"))
+            early.begin()
+            ids.append(self._log(early))
+            with late.begin():
+                ids.append(self._log(late))
+            before = self._watermark()
+            early.commit()
+            assert ids[0] < ids[1]
+            assert self._watermark() != before
+        finally:
+            pinned.rollback()
+            for conn in (pinned, early, late):
+                conn.close()
+            with engine.begin() as conn:
+                conn.execute(delete(ChangeLog).where(ChangeLog.id.in_(ids)))
+
+    def test_unrelated_write_keeps_version(self, setup_database):
+        key = "test:tile-version"
+        before = self._watermark()
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(RateLimitBucket).values(key=key, tokens=1, allowed=True))
+            assert self._watermark() == before
+        finally:
+            with engine.begin() as conn:
+                conn.execute(delete(RateLimitBucket).where(RateLimitBucket.key == key))